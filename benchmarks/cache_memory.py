@@ -0,0 +1,110 @@
+"""Benchmark the memory used by the user cache
+
+Builds the user cache of `SlackClient` for a synthetic workspace, once with regular pydantic models and once with
+compact records (`COMPACT_CACHE` setting), and reports the memory used by each and the cost of a lookup.
+
+Usage: python benchmarks/cache_memory.py [--users N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import time
+import tracemalloc
+from collections.abc import Iterator, MutableMapping
+from typing import Any, Callable
+
+from machine.clients.compact_cache import USER_CODEC, CompactMap
+from machine.models import User
+
+TIMEZONES = [("Europe/Amsterdam", "Central European Time", 3600), ("America/New_York", "Eastern Time", -18000)]
+
+
+def _user_response(i: int) -> dict[str, Any]:
+    tz, tz_label, tz_offset = TIMEZONES[i % len(TIMEZONES)]
+    avatar = f"https://avatars.slack-edge.com/2023-0{i % 9 + 1}-01/{i}00000_{i:012x}"
+    return {
+        "id": f"U{i:08d}",
+        "team_id": "T0123456",
+        "name": f"user{i}",
+        "deleted": False,
+        "color": "9f69e7",
+        "real_name": f"User {i}",
+        "tz": tz,
+        "tz_label": tz_label,
+        "tz_offset": tz_offset,
+        "is_admin": False,
+        "is_owner": False,
+        "is_primary_owner": False,
+        "is_restricted": False,
+        "is_ultra_restricted": False,
+        "is_bot": False,
+        "is_app_user": False,
+        "updated": 1700000000 + i,
+        "has_2fa": False,
+        "locale": "en-US",
+        "profile": {
+            "avatar_hash": f"{i:012x}",
+            "status_text": "",
+            "status_emoji": "",
+            "status_expiration": 0,
+            "real_name": f"User {i}",
+            "display_name": f"user{i}",
+            "real_name_normalized": f"User {i}",
+            "display_name_normalized": f"user{i}",
+            "email": f"user{i}@example.com",
+            "image_original": f"{avatar}_original.jpg",
+            **{f"image_{size}": f"{avatar}_{size}.jpg" for size in [24, 32, 48, 72, 192, 512]},
+            "team": "T0123456",
+        },
+    }
+
+
+def _measure(build: Callable[[], MutableMapping[str, User]]) -> tuple[MutableMapping[str, User], int]:
+    gc.collect()
+    tracemalloc.start()
+    cache = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cache, size
+
+
+def _lookup_us(cache: MutableMapping[str, User], keys: list[str]) -> float:
+    start = time.perf_counter()
+    for key in keys:
+        cache[key].profile.display_name  # noqa: B018
+    return (time.perf_counter() - start) / len(keys) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50_000, help="number of users in the workspace")
+    args = parser.parse_args()
+
+    def fetched_users() -> Iterator[User]:
+        # Responses are created while measuring, so the strings in the cache are counted as well
+        for i in range(args.users):
+            yield User.model_validate(_user_response(i))
+
+    def build_models() -> MutableMapping[str, User]:
+        return {user.id: user for user in fetched_users()}
+
+    def build_compact() -> MutableMapping[str, User]:
+        cache = CompactMap(USER_CODEC)
+        for user in fetched_users():
+            cache[user.id] = user
+        return cache
+
+    models, models_size = _measure(build_models)
+    compact, compact_size = _measure(build_compact)
+    keys = list(models)[:: max(1, args.users // 10_000)]
+
+    print(f"{'cache':<10} {'memory (MB)':>12} {'per user (B)':>13} {'lookup (us)':>12}")
+    for name, cache, size in [("models", models, models_size), ("compact", compact, compact_size)]:
+        print(f"{name:<10} {size / 1e6:>12.1f} {size / args.users:>13.0f} {_lookup_us(cache, keys):>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
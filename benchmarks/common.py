@@ -0,0 +1,70 @@
+"""Shared fakes and measurement helpers for the benchmarks"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Awaitable
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, Callable
+
+from slack_sdk.socket_mode.response import SocketModeResponse
+
+BOT_ID = "UBOT"
+BOT_NAME = "bot"
+USER_ID = "U1"
+CHANNEL_ID = "C1"
+
+
+class FakeSlackClient:
+    """Stand-in for `machine.clients.slack.SlackClient` with a populated user and channel cache, no network access"""
+
+    def __init__(self, user_count: int = 100, channel_count: int = 100):
+        self.users = {f"U{i}": SimpleNamespace(id=f"U{i}", name=f"user{i}") for i in range(1, user_count + 1)}
+        self.channels = {f"C{i}": SimpleNamespace(id=f"C{i}", name=f"channel{i}") for i in range(1, channel_count + 1)}
+        self.bot_info = {"user_id": BOT_ID, "name": BOT_NAME}
+        self.cache_event_types: frozenset[str] = frozenset()
+
+    async def ensure_cached(self, user_id: str | None = None, channel_id: str | None = None) -> None:
+        pass
+
+
+class FakeSocketModeClient:
+    """Stand-in for the Socket Mode client, that counts acknowledgements instead of sending them"""
+
+    def __init__(self) -> None:
+        self.responses = 0
+
+    async def send_socket_mode_response(self, response: SocketModeResponse) -> None:
+        self.responses += 1
+
+
+async def noop_handler(payload: Any, **kwargs: Any) -> None:
+    pass
+
+
+@dataclass
+class Result:
+    events_per_second: float
+    p50_us: float
+    p99_us: float
+
+
+async def measure(fn: Callable[[], Awaitable[Any]], iterations: int, warmup: int = 20) -> Result:
+    """Call `fn` repeatedly and measure the latency of each call"""
+    for _ in range(warmup):
+        await fn()
+    latencies = []
+    perf_counter = time.perf_counter
+    start = perf_counter()
+    for _ in range(iterations):
+        call_start = perf_counter()
+        await fn()
+        latencies.append(perf_counter() - call_start)
+    total = perf_counter() - start
+    latencies.sort()
+    return Result(
+        events_per_second=iterations / total,
+        p50_us=latencies[len(latencies) // 2] * 1e6,
+        p99_us=latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1e6,
+    )
@@ -0,0 +1,297 @@
+"""Benchmark the dispatch path of incoming requests
+
+Feeds synthetic Socket Mode requests through the message, generic event, slash command and interactive handlers, with
+a fake Slack client and no-op plugin handlers, so only the cost of Slack Machine itself is measured. Scenarios vary the
+number of registered handlers, the complexity of the regexes and the size of the payload, and report events per
+second and p50/p99 latency per event.
+
+Usage: python benchmarks/dispatch_path.py [--iterations N] [--filter SUBSTRING] [--json PATH]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import re
+from collections.abc import Awaitable, Iterator
+from dataclasses import asdict
+from inspect import Signature
+from typing import Any, Callable
+
+from common import (
+    BOT_ID,
+    BOT_NAME,
+    CHANNEL_ID,
+    USER_ID,
+    FakeSlackClient,
+    FakeSocketModeClient,
+    Result,
+    measure,
+    noop_handler,
+)
+from slack_sdk.socket_mode.request import SocketModeRequest
+
+from machine.handlers import (
+    create_generic_event_handler,
+    create_interactive_handler,
+    create_message_handler,
+    create_slash_command_handler,
+)
+from machine.models.core import BlockActionHandler, CommandHandler, MessageHandler, ModalHandler, RegisteredActions
+from machine.utils.logging import configure_logging
+
+HANDLER_COUNTS = [10, 100, 1000]
+PAYLOAD_SIZES = {"small": 0, "large": 100}
+REGEXES: dict[str, Callable[[int], str]] = {
+    "literal": lambda i: rf"^deploy{i}\s+(?P<service>\S+)",
+    "alternation": lambda i: rf"(?:please\s+)?(?:deploy|ship|release)\s+svc{i}\b(?:\s+to\s+(?P<env>prod|staging))?",
+    "no-literal": lambda i: rf"^(?P<word>\w{{{i % 20 + 3}}})\s+(?P<number>\d+)$",
+}
+SIGNATURE = Signature.from_callable(noop_handler)
+FILLER = " lorem ipsum dolor sit amet"
+
+Scenario = tuple[str, Callable[[], Awaitable[Any]]]
+
+
+def _message_handler(regex: str) -> MessageHandler:
+    return MessageHandler(
+        class_=None,  # type: ignore[arg-type]
+        class_name="benchmarks.FakePlugin",
+        function=noop_handler,
+        function_signature=SIGNATURE,
+        regex=re.compile(regex, re.IGNORECASE),
+        handle_message_changed=False,
+    )
+
+
+def _events_api_request(event: dict[str, Any]) -> SocketModeRequest:
+    return SocketModeRequest(type="events_api", envelope_id="x", payload={"event": event})
+
+
+def message_scenarios(slack_client: Any) -> Iterator[Scenario]:
+    settings = {"LOG_HANDLED_MESSAGES": False}
+    for count in HANDLER_COUNTS:
+        for regex_name, regex in REGEXES.items():
+            handlers = {f"handler-{i}": _message_handler(regex(i)) for i in range(count)}
+            actions = RegisteredActions(listen_to=handlers)
+            handler = create_message_handler(actions, settings, BOT_ID, BOT_NAME, slack_client)
+            for size_name, size in PAYLOAD_SIZES.items():
+                text = f"please ship svc{count // 2} to prod" + FILLER * size
+                request = _events_api_request({
+                    "type": "message",
+                    "text": text,
+                    "channel_type": "channel",
+                    "channel": CHANNEL_ID,
+                    "user": USER_ID,
+                })
+
+                async def run(handler: Any = handler, request: SocketModeRequest = request) -> None:
+                    # copy the event, because the message handler modifies it
+                    await handler(dict(request.payload["event"]))
+
+                yield f"message handlers={count} regex={regex_name} payload={size_name}", run
+
+
+def event_scenarios() -> Iterator[Scenario]:
+    for count in [1, 10, 100]:
+        actions = RegisteredActions(process={"some_event": {f"handler-{i}": noop_handler for i in range(count)}})
+        handler = create_generic_event_handler(actions)
+        for size_name, size in PAYLOAD_SIZES.items():
+            event = {"type": "some_event", **{f"field{i}": FILLER for i in range(size)}}
+            request = _events_api_request(event)
+
+            async def run(handler: Any = handler, request: SocketModeRequest = request) -> None:
+                await handler(request.payload["event"])
+
+            yield f"event handlers={count} payload={size_name}", run
+
+
+def command_scenarios(slack_client: Any) -> Iterator[Scenario]:
+    socket_mode_client: Any = FakeSocketModeClient()
+    for count in HANDLER_COUNTS:
+        commands = {
+            f"/command{i}": CommandHandler(
+                class_=None,  # type: ignore[arg-type]
+                class_name="benchmarks.FakePlugin",
+                function=noop_handler,
+                function_signature=SIGNATURE,
+                command=f"/command{i}",
+                is_generator=False,
+            )
+            for i in range(count)
+        }
+        handler = create_slash_command_handler(RegisteredActions(command=commands), slack_client)
+        for size_name, size in PAYLOAD_SIZES.items():
+            payload = {
+                "command": f"/command{count // 2}",
+                "text": "do something" + FILLER * size,
+                "user_id": USER_ID,
+                "channel_id": CHANNEL_ID,
+                "response_url": "https://hooks.slack.com/commands/1234",
+                "trigger_id": "1234567890.123456",
+            }
+            request = SocketModeRequest(type="slash_commands", envelope_id="x", payload=payload)
+
+            async def run(handler: Any = handler, request: SocketModeRequest = request) -> None:
+                await handler(socket_mode_client, request)
+
+            yield f"command handlers={count} payload={size_name}", run
+
+
+def _block_action_handler(i: int) -> BlockActionHandler:
+    # half of the handlers use exact ids, the other half regexes
+    action_id: re.Pattern[str] | str = f"action_{i}" if i % 2 == 0 else re.compile(rf"action_{i}(_\d+)?$")
+    return BlockActionHandler(
+        class_=None,  # type: ignore[arg-type]
+        class_name="benchmarks.FakePlugin",
+        function=noop_handler,
+        function_signature=SIGNATURE,
+        action_id_matcher=action_id,
+        block_id_matcher=None,
+    )
+
+
+def _block_actions_payload(action_ids: list[str], blocks: int) -> dict[str, Any]:
+    user = {"id": USER_ID, "username": "user1", "name": "user1", "team_id": "T1"}
+    text = {"type": "plain_text", "text": "Click me", "emoji": True}
+    return {
+        "type": "block_actions",
+        "user": user,
+        "api_app_id": "A1",
+        "token": "verification_token",
+        "container": {"type": "message", "message_ts": "1.0", "channel_id": CHANNEL_ID, "is_ephemeral": False},
+        "channel": {"id": CHANNEL_ID, "name": "channel1"},
+        "message": {
+            "type": "message",
+            "user": BOT_ID,
+            "ts": "1.0",
+            "bot_id": "B1",
+            "app_id": "A1",
+            "team": "T1",
+            "text": "Pick one",
+            "blocks": [
+                {"type": "section", "block_id": f"block_{i}", "text": {"type": "mrkdwn", "text": FILLER}}
+                for i in range(blocks)
+            ],
+        },
+        "state": {"values": {}},
+        "trigger_id": "1.0",
+        "team": {"id": "T1", "domain": "workspace"},
+        "enterprise": None,
+        "is_enterprise_install": False,
+        "actions": [
+            {"type": "button", "action_id": action_id, "block_id": "block_0", "action_ts": "1.0", "text": text}
+            for action_id in action_ids
+        ],
+        "response_url": "https://hooks.slack.com/actions/1234",
+    }
+
+
+def _view_submission_payload(callback_id: str, blocks: int) -> dict[str, Any]:
+    user = {"id": USER_ID, "username": "user1", "name": "user1", "team_id": "T1"}
+    title = {"type": "plain_text", "text": "My App", "emoji": True}
+    return {
+        "type": "view_submission",
+        "team": {"id": "T1", "domain": "workspace"},
+        "user": user,
+        "api_app_id": "A1",
+        "token": "verification_token",
+        "trigger_id": "1.0",
+        "enterprise": None,
+        "is_enterprise_install": False,
+        "response_urls": [],
+        "view": {
+            "id": "V1",
+            "team_id": "T1",
+            "type": "modal",
+            "blocks": [
+                {"type": "section", "block_id": f"block_{i}", "text": {"type": "mrkdwn", "text": FILLER}}
+                for i in range(blocks)
+            ],
+            "private_metadata": "",
+            "callback_id": callback_id,
+            "state": {"values": {}},
+            "hash": "1.0",
+            "title": title,
+            "clear_on_close": False,
+            "notify_on_close": False,
+            "close": None,
+            "submit": None,
+            "previous_view_id": None,
+            "root_view_id": "V1",
+            "app_id": "A1",
+            "external_id": "",
+            "app_installed_team_id": "T1",
+            "bot_id": "B1",
+        },
+    }
+
+
+def interactive_scenarios(slack_client: Any) -> Iterator[Scenario]:
+    socket_mode_client: Any = FakeSocketModeClient()
+    for count in HANDLER_COUNTS:
+        block_actions = {f"handler-{i}": _block_action_handler(i) for i in range(count)}
+        modals = {
+            f"handler-{i}": ModalHandler(
+                class_=None,  # type: ignore[arg-type]
+                class_name="benchmarks.FakePlugin",
+                function=noop_handler,
+                function_signature=SIGNATURE,
+                callback_id_matcher=f"modal_{i}",
+                is_generator=False,
+            )
+            for i in range(count)
+        }
+        actions = RegisteredActions(block_actions=block_actions, modal=modals)
+        handler = create_interactive_handler(actions, slack_client)
+        # even handlers match exact action ids, odd handlers use a regex
+        exact = count // 2 - count // 2 % 2
+        for size_name, size in PAYLOAD_SIZES.items():
+            requests = {
+                "block_actions": _block_actions_payload([f"action_{exact}"], size),
+                "block_actions(regex)": _block_actions_payload([f"action_{exact + 1}_1"], size),
+                "block_actions(unhandled)": _block_actions_payload(["other_action"], size),
+                "view_submission": _view_submission_payload(f"modal_{count // 2}", size),
+            }
+            for request_name, payload in requests.items():
+                request = SocketModeRequest(type="interactive", envelope_id="x", payload=payload)
+
+                async def run(handler: Any = handler, request: SocketModeRequest = request) -> None:
+                    await handler(socket_mode_client, request)
+
+                yield f"{request_name} handlers={count} payload={size_name}", run
+
+
+def all_scenarios() -> Iterator[Scenario]:
+    slack_client = FakeSlackClient()
+    yield from message_scenarios(slack_client)
+    yield from event_scenarios()
+    yield from command_scenarios(slack_client)
+    yield from interactive_scenarios(slack_client)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=500, help="number of events per scenario")
+    parser.add_argument("--filter", default="", help="only run scenarios containing this string")
+    parser.add_argument("--json", dest="json_path", help="also write the results to this file, for comparison")
+    args = parser.parse_args()
+    # Same logging setup as a bot in production, so the cost of (filtered) debug logging is included
+    configure_logging({"LOGLEVEL": "INFO"})
+
+    results: dict[str, Result] = {}
+    print(f"{'scenario':<60} {'events/s':>10} {'p50 (us)':>10} {'p99 (us)':>10}")
+    for name, run in all_scenarios():
+        if args.filter not in name:
+            continue
+        result = await measure(run, args.iterations)
+        results[name] = result
+        print(f"{name:<60} {result.events_per_second:>10.0f} {result.p50_us:>10.1f} {result.p99_us:>10.1f}")
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({name: asdict(result) for name, result in results.items()}, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
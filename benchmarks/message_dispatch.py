@@ -0,0 +1,83 @@
+"""Benchmark the cost of dispatching a single message as the number of message handlers grows
+
+Compares dispatching through the MessageHandlerIndex with running every handler's regex (the behaviour before the
+index was introduced).
+
+Usage: python benchmarks/message_dispatch.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import time
+from inspect import Signature
+from typing import Any
+
+from common import FakeSlackClient, noop_handler
+
+from machine.handlers.message_handler import generate_message_matcher, handle_message
+from machine.models.core import MessageHandler, MessageHandlerIndex, RegisteredActions
+
+HANDLER_COUNTS = [10, 100, 300, 1000]
+ITERATIONS = 200
+MESSAGES = [
+    "hi there, how is everyone doing?",
+    "<@UBOT> image me a very cute cat",
+    "can someone review PR 4312 before the release?",
+    "deploy service-42 to production please",
+]
+
+
+def _gen_handlers(count: int) -> dict[str, MessageHandler]:
+    handlers = {}
+    for i in range(count):
+        regex = re.compile(rf"^command{i}\s+(?P<arg>\w+)$", re.IGNORECASE)
+        handlers[f"handler-{i}"] = MessageHandler(
+            class_=None,  # type: ignore[arg-type]
+            class_name="benchmarks.FakePlugin",
+            function=noop_handler,
+            function_signature=Signature.from_callable(noop_handler),
+            regex=regex,
+            handle_message_changed=False,
+        )
+    return handlers
+
+
+class FullScanIndex(MessageHandlerIndex):
+    """Index that considers every handler a candidate, to measure the cost without prefiltering"""
+
+    def candidates(self, text: str) -> list[MessageHandler]:
+        return list(self.values())
+
+
+def _gen_event(text: str) -> dict[str, Any]:
+    return {"type": "message", "text": text, "channel_type": "channel", "channel": "C1", "user": "U1"}
+
+
+async def _time_per_message(actions: RegisteredActions) -> float:
+    slack_client: Any = FakeSlackClient()
+    matcher = generate_message_matcher({})
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        for text in MESSAGES:
+            await handle_message(_gen_event(text), "bot", "UBOT", actions, matcher, slack_client, False)
+    return (time.perf_counter() - start) / (ITERATIONS * len(MESSAGES))
+
+
+async def _run(count: int) -> tuple[float, float]:
+    handlers = _gen_handlers(count)
+    indexed = await _time_per_message(RegisteredActions(listen_to=handlers))
+    full_scan = await _time_per_message(RegisteredActions(listen_to=FullScanIndex(handlers)))
+    return indexed, full_scan
+
+
+async def main() -> None:
+    print(f"{'handlers':>10} {'indexed (us/msg)':>18} {'full scan (us/msg)':>20}")
+    for count in HANDLER_COUNTS:
+        indexed, full_scan = await _run(count)
+        print(f"{count:>10} {indexed * 1e6:>18.1f} {full_scan * 1e6:>20.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
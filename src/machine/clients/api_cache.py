@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Mapping
+from typing import Any, Callable
+
+import aiohttp
+from slack_sdk.web.async_client import AsyncWebClient
+from slack_sdk.web.async_slack_response import AsyncSlackResponse
+
+from machine.utils.single_flight import SingleFlight
+
+# Number of seconds responses of idempotent read methods are cached by default
+DEFAULT_TTLS: dict[str, float] = {
+    "users.info": 300,
+    "users.lookupByEmail": 300,
+    "conversations.info": 300,
+    "bots.info": 3600,
+    "team.info": 3600,
+}
+
+CacheKey = tuple[str, tuple[tuple[str, Any], ...]]
+
+
+class ResponseCache:
+    """Read-through cache for Web API responses
+
+    Responses are cached per method and parameters, for a time that is configured per method. Concurrent identical
+    requests are coalesced into a single request. Failed requests are not cached. When the cache holds more than
+    `max_size` responses, the least recently used ones are evicted.
+    """
+
+    def __init__(
+        self, ttls: Mapping[str, float], max_size: int = 10_000, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("Maximum size must be at least 1")
+        self._ttls = dict(ttls)
+        self._max_size = max_size
+        self._clock = clock
+        self._responses: OrderedDict[CacheKey, tuple[float, AsyncSlackResponse]] = OrderedDict()
+        self._requests: SingleFlight[CacheKey, AsyncSlackResponse] = SingleFlight()
+        # Latest request in flight per key. Requests that were invalidated while in flight are removed, so their
+        # (possibly outdated) responses are not cached.
+        self._loading: dict[CacheKey, object] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def caches(self, api_method: str) -> bool:
+        """Whether responses of the method are cached"""
+        return api_method in self._ttls
+
+    async def get(
+        self, api_method: str, params: Mapping[str, Any], request: Callable[[], Awaitable[AsyncSlackResponse]]
+    ) -> AsyncSlackResponse:
+        """Get a response from the cache, or request it if it's not cached or has expired
+
+        Args:
+            api_method: name of the Web API method, eg. `users.info`
+            params: parameters of the request
+            request: function that performs the request
+
+        Returns:
+            the (cached) response
+        """
+        key = _cache_key(api_method, params)
+        cached = self._responses.get(key)
+        if cached is not None:
+            expires_at, response = cached
+            if expires_at > self._clock():
+                self._responses.move_to_end(key)
+                self.hits += 1
+                return response
+            del self._responses[key]
+        self.misses += 1
+        return await self._requests.do(key, lambda: self._request(key, request))
+
+    async def _request(self, key: CacheKey, request: Callable[[], Awaitable[AsyncSlackResponse]]) -> AsyncSlackResponse:
+        token = self._loading[key] = object()
+        try:
+            response = await request()
+        except BaseException:
+            if self._loading.get(key) is token:
+                del self._loading[key]
+            raise
+        if self._loading.get(key) is token:
+            del self._loading[key]
+            self._responses[key] = (self._clock() + self._ttls[key[0]], response)
+            if len(self._responses) > self._max_size:
+                self._responses.popitem(last=False)
+        return response
+
+    def invalidate(self, api_method: str, **params: Any) -> None:
+        """Remove cached responses of a method
+
+        Responses of matching requests that are still in flight are not cached, and the next call starts a new request
+        instead of waiting for them.
+
+        Args:
+            api_method: name of the Web API method, eg. `users.info`
+            params: only remove responses of requests with these parameters
+        """
+        expected = {(name, _freeze(value)) for name, value in params.items()}
+        stale = [key for key in self._responses if key[0] == api_method and expected.issubset(key[1])]
+        for key in stale:
+            del self._responses[key]
+        loading = [key for key in self._loading if key[0] == api_method and expected.issubset(key[1])]
+        for key in loading:
+            self._forget(key)
+
+    def _forget(self, key: CacheKey) -> None:
+        del self._loading[key]
+        self._requests.forget(key)
+
+    def clear(self) -> None:
+        """Remove all cached responses"""
+        self._responses.clear()
+        for key in list(self._loading):
+            self._forget(key)
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+
+class CachingAsyncWebClient(AsyncWebClient):
+    """Web client that caches the responses of idempotent read methods
+
+    Only requests without a body or files are cached, so calls that change anything in Slack are never affected.
+    Cached responses are shared between callers, and should not be modified.
+    """
+
+    def __init__(self, *args: Any, cache: ResponseCache, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.cache = cache
+
+    async def api_call(
+        self,
+        api_method: str,
+        *,
+        http_verb: str = "POST",
+        files: dict | None = None,
+        data: dict | aiohttp.FormData | None = None,
+        params: dict | None = None,
+        json: dict | None = None,
+        headers: dict | None = None,
+        auth: dict | None = None,
+    ) -> AsyncSlackResponse:
+        def request() -> Awaitable[AsyncSlackResponse]:
+            return super(CachingAsyncWebClient, self).api_call(
+                api_method,
+                http_verb=http_verb,
+                files=files,
+                data=data,
+                params=params,
+                json=json,
+                headers=headers,
+                auth=auth,
+            )
+
+        if not self.cache.caches(api_method) or files or data or json or headers or auth:
+            return await request()
+        return await self.cache.get(api_method, params or {}, request)
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((name, _freeze(item)) for name, item in value.items()))
+    return value
+
+
+def _cache_key(api_method: str, params: Mapping[str, Any]) -> CacheKey:
+    return api_method, tuple(sorted((name, _freeze(value)) for name, value in params.items() if value is not None))
+
+
+def create_web_client(settings: Mapping[str, Any]) -> AsyncWebClient:
+    """Create the web client configured in the settings
+
+    Uses the `SLACK_BOT_TOKEN`, `WEB_API_CACHE`, `WEB_API_CACHE_TTLS` and `WEB_API_CACHE_SIZE` settings. If
+    `WEB_API_CACHE` is not enabled, responses are not cached.
+    """
+    if not settings.get("WEB_API_CACHE", False):
+        return AsyncWebClient(token=settings["SLACK_BOT_TOKEN"])
+    ttls = {**DEFAULT_TTLS, **settings.get("WEB_API_CACHE_TTLS", {})}
+    # A TTL of 0 disables caching for a method
+    ttls = {api_method: float(ttl) for api_method, ttl in ttls.items() if ttl}
+    cache = ResponseCache(ttls, max_size=int(settings.get("WEB_API_CACHE_SIZE", 10_000)))
+    return CachingAsyncWebClient(token=settings["SLACK_BOT_TOKEN"], cache=cache)
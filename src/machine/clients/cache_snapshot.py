@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+import uuid
+import zlib
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, cast
+
+from structlog.stdlib import get_logger
+
+from machine.models import Channel, User
+from machine.storage import MachineBaseStorage
+
+logger = get_logger(__name__)
+
+SNAPSHOT_VERSION = 1
+STORAGE_KEY = "machine.slack_cache_snapshot"
+# Storage backends limit the size of values, eg. DynamoDB items can be at most 400 KB, and DynamoDB stores values
+# base64 encoded. So snapshots are stored in chunks that stay well below that.
+CHUNK_SIZE = 256 * 1024
+
+
+@dataclass
+class CacheSnapshot:
+    """Contents of the user and channel caches at a point in time
+
+    Attributes:
+        users: users as returned by the Slack API
+        channels: channels as returned by the Slack API
+        created_at: unix timestamp of the moment the snapshot was taken
+    """
+
+    users: list[dict[str, Any]] = field(default_factory=list)
+    channels: list[dict[str, Any]] = field(default_factory=list)
+    created_at: float = field(default_factory=time.time)
+
+    @classmethod
+    def from_caches(cls, users: Iterable[User], channels: Iterable[Channel]) -> CacheSnapshot:
+        return cls(
+            users=[user.model_dump(mode="json", exclude_none=True) for user in users],
+            channels=[channel.model_dump(mode="json", exclude_none=True) for channel in channels],
+        )
+
+    def encode(self) -> bytes:
+        """Serialize the snapshot to compressed JSON"""
+        data = {
+            "version": SNAPSHOT_VERSION,
+            "created_at": self.created_at,
+            "users": self.users,
+            "channels": self.channels,
+        }
+        return zlib.compress(json.dumps(data, separators=(",", ":")).encode("utf-8"))
+
+    @classmethod
+    def decode(cls, raw: bytes) -> CacheSnapshot | None:
+        """Deserialize a snapshot
+
+        Args:
+            raw: snapshot as produced by [`encode`][machine.clients.cache_snapshot.CacheSnapshot.encode]
+
+        Returns:
+            the snapshot, or `None` if it is corrupt or was written by an incompatible version of Slack Machine
+        """
+        try:
+            data = json.loads(zlib.decompress(raw))
+        except (zlib.error, ValueError):
+            logger.warning("Cache snapshot is corrupt, ignoring it")
+            return None
+        if not isinstance(data, dict) or data.get("version") != SNAPSHOT_VERSION:
+            logger.warning("Cache snapshot has an unsupported format, ignoring it")
+            return None
+        return cls(users=data["users"], channels=data["channels"], created_at=data["created_at"])
+
+
+class CacheSnapshotStore(ABC):
+    """Place where a snapshot of the user and channel caches is kept between restarts"""
+
+    @abstractmethod
+    async def load(self) -> CacheSnapshot | None:
+        """Load the snapshot
+
+        Returns:
+            the snapshot, or `None` if there is no (usable) snapshot
+        """
+        ...
+
+    @abstractmethod
+    async def save(self, snapshot: CacheSnapshot) -> None:
+        """Save the snapshot, replacing any previous snapshot
+
+        Args:
+            snapshot: the snapshot to save
+        """
+        ...
+
+
+class StorageCacheSnapshotStore(CacheSnapshotStore):
+    """Keeps the snapshot in the storage backend of Slack Machine, so it can be shared by several instances
+
+    Snapshots of large workspaces don't fit in a single value of every storage backend, so the snapshot is split in
+    chunks of at most `chunk_size` bytes, that are stored under their own keys. A small manifest, stored under `key`,
+    points to the chunks of the latest snapshot. The chunks of the previous snapshot are removed after the manifest has
+    been replaced.
+    """
+
+    def __init__(self, storage: MachineBaseStorage, key: str = STORAGE_KEY, chunk_size: int = CHUNK_SIZE):
+        if chunk_size < 1:
+            raise ValueError("Chunk size must be at least 1")
+        self._storage = storage
+        self._key = key
+        self._chunk_size = chunk_size
+
+    async def _load_manifest(self) -> dict[str, Any] | None:
+        raw = await self._storage.get(self._key)
+        if not raw:
+            return None
+        try:
+            manifest = json.loads(raw)
+        except ValueError:
+            manifest = None
+        if (
+            not isinstance(manifest, dict)
+            or not isinstance(manifest.get("generation"), str)
+            or not isinstance(manifest.get("chunks"), int)
+        ):
+            logger.warning("Cache snapshot manifest has an unsupported format, ignoring it")
+            return None
+        return manifest
+
+    def _chunk_keys(self, manifest: Mapping[str, Any]) -> list[str]:
+        return [f"{self._key}:{manifest['generation']}:{index}" for index in range(manifest["chunks"])]
+
+    async def load(self) -> CacheSnapshot | None:
+        manifest = await self._load_manifest()
+        if manifest is None:
+            return None
+        chunk_keys = self._chunk_keys(manifest)
+        chunks = await self._storage.get_many(chunk_keys)
+        raw_chunks = [chunks.get(chunk_key) for chunk_key in chunk_keys]
+        if any(chunk is None for chunk in raw_chunks):
+            # Another instance might have replaced the snapshot while it was being loaded
+            logger.warning("Cache snapshot is incomplete, ignoring it")
+            return None
+        return CacheSnapshot.decode(b"".join(cast(list[bytes], raw_chunks)))
+
+    async def save(self, snapshot: CacheSnapshot) -> None:
+        raw = snapshot.encode()
+        previous = await self._load_manifest()
+        manifest = {"generation": uuid.uuid4().hex, "chunks": max(1, -(-len(raw) // self._chunk_size))}
+        chunk_keys = self._chunk_keys(manifest)
+        await self._storage.set_many({
+            chunk_key: raw[index * self._chunk_size : (index + 1) * self._chunk_size]
+            for index, chunk_key in enumerate(chunk_keys)
+        })
+        await self._storage.set(self._key, json.dumps(manifest).encode("utf-8"))
+        if previous is not None:
+            await self._storage.delete_many(self._chunk_keys(previous))
+
+
+class FileCacheSnapshotStore(CacheSnapshotStore):
+    """Keeps the snapshot in a local file"""
+
+    def __init__(self, path: str | os.PathLike[str]):
+        self._path = Path(path)
+
+    async def load(self) -> CacheSnapshot | None:
+        try:
+            raw = await asyncio.to_thread(self._path.read_bytes)
+        except FileNotFoundError:
+            return None
+        return CacheSnapshot.decode(raw)
+
+    async def save(self, snapshot: CacheSnapshot) -> None:
+        await asyncio.to_thread(self._write, snapshot.encode())
+
+    def _write(self, raw: bytes) -> None:
+        # Write to a temporary file first, so a crash while writing never leaves a truncated snapshot behind
+        tmp_path = self._path.with_name(f"{self._path.name}.tmp")
+        tmp_path.write_bytes(raw)
+        os.replace(tmp_path, self._path)
+
+
+def create_cache_snapshot_store(settings: Mapping[str, Any], storage: MachineBaseStorage) -> CacheSnapshotStore | None:
+    """Create the cache snapshot store configured in the settings
+
+    Uses the `CACHE_SNAPSHOT` setting: `"storage"` to keep the snapshot in the storage backend, or the path of a local
+    file. Returns `None` if no snapshot should be kept.
+    """
+    location = settings.get("CACHE_SNAPSHOT")
+    if not location:
+        return None
+    if location == "storage":
+        return StorageCacheSnapshotStore(storage)
+    return FileCacheSnapshotStore(location)
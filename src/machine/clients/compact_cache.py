@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import sys
+from collections.abc import Iterator, Mapping, MutableMapping
+from typing import Any, Callable, Generic, TypeVar
+
+from pydantic import BaseModel
+
+from machine.models import Channel, User
+from machine.models.channel import PurposeTopic
+from machine.models.user import Profile
+from machine.utils.collections import LRUDict
+
+M = TypeVar("M", bound=BaseModel)
+V = TypeVar("V")
+
+Record = tuple[Any, ...]
+
+# Marks an image URL that can be derived from the 24px image URL
+_DERIVED: Any = object()
+# Number of recently used models a CompactMap keeps, so they don't have to be recreated for every lookup
+DECODED_CACHE_SIZE = 1000
+_IMAGE_SIZES = {"image_32": "32", "image_48": "48", "image_72": "72", "image_192": "192", "image_512": "512"}
+
+
+class RecordCodec(Generic[M]):
+    """Converts pydantic models to compact tuples and back
+
+    Field values are stored in a tuple in the order of the model fields, instead of in the `__dict__` of a model
+    instance. Values of the fields in `interned` are interned, so repeated values (team ids, timezones, ...) are only
+    kept in memory once. Nested models are converted with their own codec.
+
+    Models are recreated without validation, because they were validated before they were converted.
+    """
+
+    def __init__(
+        self, model: type[M], interned: frozenset[str] = frozenset(), nested: Mapping[str, RecordCodec] | None = None
+    ):
+        self._model = model
+        self._fields = tuple(model.model_fields)
+        self._interned = interned
+        self._nested = dict(nested or {})
+
+    def encode(self, obj: M) -> Record:
+        values = []
+        for name in self._fields:
+            value = getattr(obj, name)
+            if value is None:
+                pass
+            elif name in self._nested:
+                value = self._nested[name].encode(value)
+            elif name in self._interned:
+                value = sys.intern(value)
+            elif isinstance(value, list):
+                value = tuple(value)
+            values.append(value)
+        return tuple(values)
+
+    def decode(self, record: Record) -> M:
+        values = {}
+        for name, value in zip(self._fields, record):
+            if value is None:
+                continue
+            if name in self._nested:
+                value = self._nested[name].decode(value)
+            elif isinstance(value, tuple):
+                value = list(value)
+            values[name] = value
+        return self._model.model_construct(**values)
+
+    def decode_field(self, record: Record, name: str) -> Any:
+        """Get the value of a single field, without recreating the whole model
+
+        Args:
+            record: the record
+            name: name of a field that isn't a nested model
+
+        Returns:
+            the value of the field
+        """
+        value = record[self._fields.index(name)]
+        return list(value) if isinstance(value, tuple) else value
+
+
+class ProfileCodec(RecordCodec[Profile]):
+    """Codec for user profiles, that doesn't store image URLs that can be derived from the 24px image URL
+
+    Slack serves avatars in several sizes, with URLs that only differ in the size, eg.
+    `https://avatars.slack-edge.com/..._24.jpg` and `https://avatars.slack-edge.com/..._48.jpg`.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(Profile, interned=frozenset({"team", "status_emoji"}))
+        self._image_24 = self._fields.index("image_24")
+        self._images = {self._fields.index(name): size for name, size in _IMAGE_SIZES.items()}
+
+    def encode(self, obj: Profile) -> Record:
+        record = list(super().encode(obj))
+        image_24 = record[self._image_24]
+        if image_24 is not None:
+            for index, size in self._images.items():
+                if record[index] is not None and record[index] == _derive_image_url(image_24, size):
+                    record[index] = _DERIVED
+        return tuple(record)
+
+    def decode(self, record: Record) -> Profile:
+        if any(record[index] is _DERIVED for index in self._images):
+            values = list(record)
+            for index, size in self._images.items():
+                if values[index] is _DERIVED:
+                    values[index] = _derive_image_url(values[self._image_24], size)
+            record = tuple(values)
+        return super().decode(record)
+
+
+def _derive_image_url(image_24: str, size: str) -> str:
+    # Slack avatars end in _24.<ext>, Gravatar URLs have an s=24 parameter and a -24.png default image
+    return image_24.replace("_24.", f"_{size}.").replace("s=24", f"s={size}").replace("-24.", f"-{size}.")
+
+
+USER_CODEC: RecordCodec[User] = RecordCodec(
+    User,
+    interned=frozenset({"team_id", "color", "tz", "tz_label", "locale"}),
+    nested={"profile": ProfileCodec()},
+)
+_PURPOSE_TOPIC_CODEC: RecordCodec[PurposeTopic] = RecordCodec(PurposeTopic, interned=frozenset({"creator"}))
+CHANNEL_CODEC: RecordCodec[Channel] = RecordCodec(
+    Channel,
+    interned=frozenset({"creator", "user"}),
+    nested={"topic": _PURPOSE_TOPIC_CODEC, "purpose": _PURPOSE_TOPIC_CODEC},
+)
+
+
+class CompactMap(MutableMapping[str, M]):
+    """Dict-like container that stores models as compact records
+
+    Models are converted to records when they're stored, and recreated when they're retrieved. This saves a lot of
+    memory for large caches, at the cost of some CPU time for lookups. The `decoded_cache_size` most recently used
+    models are kept, so repeated lookups of the same (active) users and channels don't recreate them.
+    """
+
+    def __init__(
+        self, codec: RecordCodec[M], data: Mapping[str, M] | None = None, decoded_cache_size: int = DECODED_CACHE_SIZE
+    ):
+        self._codec = codec
+        self._records: dict[str, Record] = {}
+        self._decoded: LRUDict[str, M] = LRUDict(decoded_cache_size)
+        if data is not None:
+            self.update(data)
+
+    def __getitem__(self, key: str) -> M:
+        value = self._decoded.get(key)
+        if value is None:
+            value = self._decoded[key] = self._codec.decode(self._records[key])
+        return value
+
+    def __setitem__(self, key: str, value: M) -> None:
+        self._records[key] = self._codec.encode(value)
+        self._decoded.pop(key, None)
+
+    def __delitem__(self, key: str) -> None:
+        del self._records[key]
+        self._decoded.pop(key, None)
+
+    def field(self, key: str, name: str) -> Any:
+        """Get the value of a single field of a model, without recreating the model
+
+        Args:
+            key: key of the model
+            name: name of a field that isn't a nested model
+
+        Returns:
+            the value of the field
+        """
+        value = self._decoded.get(key)
+        if value is not None:
+            return getattr(value, name)
+        return self._codec.decode_field(self._records[key], name)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._records
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._records)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({len(self)} items)"
+
+
+class KeyIndex(MutableMapping[str, V]):
+    """Secondary index on a mapping, that stores the primary keys of the values instead of the values themselves
+
+    Used to look up users by email, without storing the users a second time.
+    """
+
+    def __init__(self, target: Mapping[str, V], primary_key: Callable[[V], str], data: Mapping[str, V] | None = None):
+        self._target = target
+        self._primary_key = primary_key
+        self._keys: dict[str, str] = {}
+        if data is not None:
+            self.update(data)
+
+    def __getitem__(self, key: str) -> V:
+        return self._target[self._keys[key]]
+
+    def __setitem__(self, key: str, value: V) -> None:
+        self._keys[key] = sys.intern(self._primary_key(value))
+
+    def __delitem__(self, key: str) -> None:
+        del self._keys[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
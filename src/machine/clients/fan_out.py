@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Iterable
+from dataclasses import dataclass
+from typing import Callable
+
+from slack_sdk.web.async_slack_response import AsyncSlackResponse
+from structlog.stdlib import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_CONCURRENCY = 10
+
+
+@dataclass(frozen=True)
+class DeliveryResult:
+    """Result of sending a message to one of the recipients of a fan-out
+
+    Attributes:
+        recipient: id of the user or channel
+        response: response of the Slack API, if the message was sent
+        error: the error that occurred, if the message could not be sent
+    """
+
+    recipient: str
+    response: AsyncSlackResponse | None = None
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+async def fan_out(
+    recipients: Iterable[str],
+    send: Callable[[str], Awaitable[AsyncSlackResponse]],
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> dict[str, DeliveryResult]:
+    """Send a message to many recipients, with at most `concurrency` messages in flight at the same time
+
+    Failures are recorded per recipient, so one failing recipient doesn't stop the others. Every recipient gets the
+    message only once, even if it's passed more than once.
+
+    Args:
+        recipients: ids of the users or channels
+        send: function that sends the message to one recipient
+        concurrency: maximum number of messages that are sent at the same time
+
+    Returns:
+        the result per recipient, in the order of the recipients
+    """
+    if concurrency < 1:
+        raise ValueError("Concurrency must be at least 1")
+    unique_recipients = list(dict.fromkeys(recipients))
+    results: dict[str, DeliveryResult] = {}
+    pending = iter(unique_recipients)
+
+    async def work() -> None:
+        # Workers pull recipients from a shared iterator, so only `concurrency` tasks exist for any number of recipients
+        for recipient in pending:
+            try:
+                results[recipient] = DeliveryResult(recipient, response=await send(recipient))
+            except Exception as e:
+                logger.warning("Could not send message", recipient=recipient, error=str(e))
+                results[recipient] = DeliveryResult(recipient, error=e)
+
+    await asyncio.gather(*(work() for _ in range(min(concurrency, len(unique_recipients)))))
+    return {recipient: results[recipient] for recipient in unique_recipients}
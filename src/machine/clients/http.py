@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+from collections.abc import Mapping
+from typing import Any
+
+import httpx
+from structlog.stdlib import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_CLIENT = "default"
+
+# Options that can be set for all clients with HTTP_* settings, and per client in the HTTP_CLIENTS setting
+_DEFAULTS: dict[str, Any] = {
+    "timeout": 10.0,
+    "connect_timeout": 60.0,
+    "max_connections": 100,
+    "max_keepalive_connections": 20,
+    "keepalive_expiry": 30.0,
+}
+
+
+def http2_available() -> bool:
+    """HTTP/2 support in httpx requires the optional `h2` package"""
+    return importlib.util.find_spec("h2") is not None
+
+
+class HttpClientPool:
+    """Named, pooled HTTP clients that are shared by all plugins
+
+    Every client keeps connections alive between requests, so requests to the same host don't need a new TCP and TLS
+    handshake. Clients are created the first time they're requested, and closed when Slack Machine shuts down.
+
+    Timeouts and connection limits come from the `HTTP_TIMEOUT`, `HTTP_CONNECT_TIMEOUT`, `HTTP_MAX_CONNECTIONS`,
+    `HTTP_MAX_KEEPALIVE_CONNECTIONS` and `HTTP_KEEPALIVE_EXPIRY` settings, and can be overridden per client in the
+    `HTTP_CLIENTS` setting, which maps client names to options. Options of a client can also include `base_url`,
+    `headers`, `http2` and `proxy`. HTTP/2 is used when the `h2` package is installed, unless `HTTP2` is set to `False`.
+    Clients use the proxy in the `HTTP_CLIENTS_PROXY` setting, unless their `proxy` option overrides it. The
+    `HTTP_PROXY` setting only applies to the connection to Slack.
+    """
+
+    def __init__(self, settings: Mapping[str, Any] | None = None):
+        settings = settings or {}
+        self._defaults = {
+            option: settings.get(f"HTTP_{option.upper()}", default) for option, default in _DEFAULTS.items()
+        }
+        self._defaults["http2"] = settings.get("HTTP2", True)
+        self._proxy = settings.get("HTTP_CLIENTS_PROXY")
+        self._client_options: Mapping[str, Mapping[str, Any]] = settings.get("HTTP_CLIENTS", {})
+        self._clients: dict[str, httpx.AsyncClient] = {}
+
+    def get(self, name: str = DEFAULT_CLIENT) -> httpx.AsyncClient:
+        """Get the client with the given name, creating it if it doesn't exist yet
+
+        Args:
+            name: name of the client. Clients with a different name have their own connection pool and options.
+
+        Returns:
+            the client
+        """
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = self._clients[name] = self._create(name)
+        return client
+
+    def _create(self, name: str) -> httpx.AsyncClient:
+        options = {**self._defaults, **self._client_options.get(name, {})}
+        http2 = bool(options["http2"]) and http2_available()
+        logger.debug("Creating HTTP client", name=name, http2=http2)
+        return httpx.AsyncClient(
+            base_url=options.get("base_url", ""),
+            headers=options.get("headers"),
+            timeout=httpx.Timeout(float(options["timeout"]), connect=float(options["connect_timeout"])),
+            limits=httpx.Limits(
+                max_connections=int(options["max_connections"]),
+                max_keepalive_connections=int(options["max_keepalive_connections"]),
+                keepalive_expiry=float(options["keepalive_expiry"]),
+            ),
+            http2=http2,
+            proxy=options.get("proxy", self._proxy),
+        )
+
+    async def close(self) -> None:
+        """Close all clients"""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        await asyncio.gather(*(client.aclose() for client in clients))
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from typing import Callable, Generic, TypeVar
+
+V = TypeVar("V")
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a channel or user name for lookups, names are compared case-insensitively"""
+    return name.lower()
+
+
+class NameIndex(Generic[V]):
+    """Index from normalized names to the ids of the users or channels with that name
+
+    The index only stores ids. Lookups resolve the ids in the cache that is passed in, and check that the name still
+    matches, so entries that were evicted from the cache or renamed in the meantime are never returned. A single
+    `prefix` (eg. `#` for channels) is removed from the names that are looked up.
+    """
+
+    def __init__(self, names: Callable[[V], Iterable[str | None]], prefix: str = ""):
+        self._names = names
+        self._prefix = prefix
+        self._ids: dict[str, list[str]] = {}
+
+    def _normalized_names(self, entity: V) -> set[str]:
+        return {normalize_name(name) for name in self._names(entity) if name}
+
+    def add(self, key: str, entity: V) -> None:
+        for name in self._normalized_names(entity):
+            ids = self._ids.setdefault(name, [])
+            if key not in ids:
+                ids.append(key)
+
+    def remove(self, key: str, entity: V) -> None:
+        for name in self._normalized_names(entity):
+            ids = self._ids.get(name)
+            if ids is not None and key in ids:
+                ids.remove(key)
+                if not ids:
+                    del self._ids[name]
+
+    def rebuild(self, entities: Mapping[str, V]) -> None:
+        self._ids = {}
+        for key, entity in entities.items():
+            self.add(key, entity)
+
+    def lookup(self, name: str, entities: Mapping[str, V]) -> V | None:
+        """Find the first user or channel with the given name
+
+        Args:
+            name: name to look for, optionally preceded by the prefix, compared case-insensitively
+            entities: cache to resolve ids in
+
+        Returns:
+            the user or channel, or `None` if there is none with that name
+        """
+        if self._prefix and name.startswith(self._prefix):
+            name = name[len(self._prefix) :]
+        normalized = normalize_name(name)
+        for key in self._ids.get(normalized, ()):
+            entity = entities.get(key)
+            if entity is not None and normalized in self._normalized_names(entity):
+                return entity
+        return None
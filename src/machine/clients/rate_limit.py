@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Awaitable, Mapping
+from dataclasses import dataclass, replace
+from typing import Any, Callable, TypeVar
+
+from slack_sdk.errors import SlackApiError
+from structlog.stdlib import get_logger
+
+from machine.utils.collections import LRUDict
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# Sustained rate (calls per second) and burst size of the Slack Web API rate limit tiers
+# See https://api.slack.com/apis/rate-limits
+TIERS: dict[int, tuple[float, int]] = {
+    1: (1 / 60, 1),
+    2: (20 / 60, 5),
+    3: (50 / 60, 10),
+    4: (100 / 60, 20),
+}
+
+# Tier of the Web API methods that Slack Machine calls on behalf of plugins. chat.postMessage has a special rate limit
+# of about 1 message per second per channel, which is enforced per channel instead.
+METHOD_TIERS: dict[str, int] = {
+    "chat.postEphemeral": 4,
+    "chat.scheduleMessage": 3,
+    "chat.update": 3,
+    "chat.delete": 3,
+    "reactions.add": 3,
+    "conversations.open": 3,
+    "conversations.setTopic": 2,
+    "pins.add": 2,
+    "pins.remove": 2,
+    "views.open": 4,
+    "views.push": 4,
+    "views.update": 4,
+    "views.publish": 4,
+}
+
+# Methods that are paced per channel, with the rate (messages per second) and burst size of a single channel
+CHANNEL_METHODS: frozenset[str] = frozenset({"chat.postMessage"})
+CHANNEL_RATE: tuple[float, int] = (1.0, 3)
+
+# Rate (calls per second) and burst size of methods that are also limited for the workspace as a whole. Besides the
+# limit per channel, Slack allows several hundred messages per minute per workspace, so sending a message to many
+# channels at once (see fan_out) is paced as well.
+METHOD_RATES: dict[str, tuple[float, int]] = {"chat.postMessage": (300 / 60, 20)}
+
+# Methods that take a trigger_id, which expires 3 seconds after the user interaction. By the time Slack allows a retry,
+# the trigger_id is no longer valid, so these calls are never retried.
+NO_RETRY_METHODS: frozenset[str] = frozenset({"views.open", "views.push"})
+
+
+class TokenBucket:
+    """Token bucket that hands out time slots instead of making callers poll for tokens
+
+    The bucket allows bursts of `capacity` calls, and `rate` calls per second after that. Every reservation is given the
+    earliest moment it may proceed, so callers are served in the order in which they reserved.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        if rate <= 0:
+            raise ValueError("Rate must be positive")
+        if capacity < 1:
+            raise ValueError("Capacity must be at least 1")
+        self._interval = 1 / rate
+        self._tolerance = (capacity - 1) * self._interval
+        # Theoretical arrival time of the next call if calls were perfectly paced
+        self._tat = 0.0
+
+    def reserve(self, now: float, not_before: float = 0.0) -> float:
+        """Reserve a slot for one call
+
+        Args:
+            now: current (monotonic) time
+            not_before: the call won't proceed before this moment anyway
+
+        Returns:
+            the moment at which the call may proceed
+        """
+        start = max(now, not_before)
+        tat = max(self._tat, start)
+        self._tat = tat + self._interval
+        return max(start, tat - self._tolerance)
+
+
+@dataclass
+class OutboundStats:
+    """Statistics of an [`OutboundScheduler`][machine.clients.rate_limit.OutboundScheduler]
+
+    Attributes:
+        queue_depth: number of calls that are currently waiting for their turn
+        calls: number of calls that were made, including retries
+        throttled: number of calls that had to wait for their turn
+        rate_limited: number of times Slack responded that a rate limit was exceeded
+        total_wait: total number of seconds calls have waited for their turn
+        max_wait: longest time in seconds a single call has waited for its turn
+    """
+
+    queue_depth: int = 0
+    calls: int = 0
+    throttled: int = 0
+    rate_limited: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+
+class OutboundScheduler:
+    """Paces outgoing Web API calls so they stay within the rate limits of Slack
+
+    Calls are paced with a token bucket per method, sized after the rate limit tier of the method (or its own rate in
+    `method_rates`), and a token bucket per channel for messages. When Slack responds that a rate limit was exceeded
+    anyway, all calls of that method are paused for the time given in the `Retry-After` header, and the call is
+    retried, unless the method is one of `no_retry_methods`.
+    """
+
+    def __init__(
+        self,
+        method_tiers: Mapping[str, int] = METHOD_TIERS,
+        method_rates: Mapping[str, tuple[float, int]] = METHOD_RATES,
+        channel_methods: frozenset[str] = CHANNEL_METHODS,
+        channel_rate: tuple[float, int] = CHANNEL_RATE,
+        no_retry_methods: frozenset[str] = NO_RETRY_METHODS,
+        max_retries: int = 3,
+        max_channels: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_retries < 0:
+            raise ValueError("Maximum number of retries can't be negative")
+        self._method_buckets = {api_method: TokenBucket(*TIERS[tier]) for api_method, tier in method_tiers.items()}
+        self._method_buckets.update({api_method: TokenBucket(*rate) for api_method, rate in method_rates.items()})
+        self._channel_methods = channel_methods
+        self._channel_rate = channel_rate
+        # Buckets of channels that haven't seen messages in a while are full, so they can safely be evicted
+        self._channel_buckets: LRUDict[str, TokenBucket] = LRUDict(max_channels)
+        self._paused_until: dict[str, float] = {}
+        self._no_retry_methods = no_retry_methods
+        self._max_retries = max_retries
+        self._clock = clock
+        self._queued: dict[str, int] = {}
+        self._stats = OutboundStats()
+
+    async def call(self, api_method: str, request: Callable[[], Awaitable[T]], channel: str | None = None) -> T:
+        """Make a Web API call when it's its turn, retrying it when Slack reports that a rate limit was exceeded
+
+        Args:
+            api_method: name of the Web API method, eg. `chat.postMessage`
+            request: function that makes the call
+            channel: id of the channel the call is about. Messages are paced per channel.
+
+        Returns:
+            the result of the call
+        """
+        retries = 0
+        max_retries = 0 if api_method in self._no_retry_methods else self._max_retries
+        while True:
+            await self._wait_for_turn(api_method, channel)
+            self._stats.calls += 1
+            try:
+                return await request()
+            except SlackApiError as e:
+                if e.response["error"] != "ratelimited":
+                    raise
+                retry_after = int(e.response.headers.get("Retry-After", 1))
+                self._stats.rate_limited += 1
+                self._paused_until[api_method] = max(self._paused_until.get(api_method, 0), self._clock() + retry_after)
+                if retries >= max_retries:
+                    raise
+                retries += 1
+                logger.warning(
+                    "Slack API rate limit hit, retrying", api_method=api_method, retry_after=retry_after, retry=retries
+                )
+
+    async def _wait_for_turn(self, api_method: str, channel: str | None) -> None:
+        now = self._clock()
+        proceed_at = max(now, self._paused_until.get(api_method, 0))
+        method_bucket = self._method_buckets.get(api_method)
+        if method_bucket is not None:
+            proceed_at = method_bucket.reserve(now, proceed_at)
+        if channel is not None and api_method in self._channel_methods:
+            channel_bucket = self._channel_buckets.get(channel)
+            if channel_bucket is None:
+                channel_bucket = self._channel_buckets[channel] = TokenBucket(*self._channel_rate)
+            proceed_at = channel_bucket.reserve(now, proceed_at)
+        delay = proceed_at - now
+        if delay <= 0:
+            return
+        self._stats.throttled += 1
+        self._stats.total_wait += delay
+        self._stats.max_wait = max(self._stats.max_wait, delay)
+        self._queued[api_method] = self._queued.get(api_method, 0) + 1
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self._queued[api_method] -= 1
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of calls that are currently waiting for their turn"""
+        return sum(self._queued.values())
+
+    def queue_depth_by_method(self) -> dict[str, int]:
+        """Number of calls that are currently waiting for their turn, per Web API method"""
+        return {api_method: depth for api_method, depth in self._queued.items() if depth}
+
+    def stats(self) -> OutboundStats:
+        """Statistics of the calls made so far"""
+        return replace(self._stats, queue_depth=self.queue_depth)
+
+
+def create_outbound_scheduler(settings: Mapping[str, Any]) -> OutboundScheduler | None:
+    """Create the outbound scheduler configured in the settings
+
+    Uses the `OUTBOUND_RATE_LIMIT` and `OUTBOUND_MAX_RETRIES` settings. Returns `None` if outgoing calls should not be
+    paced.
+    """
+    if not settings.get("OUTBOUND_RATE_LIMIT", True):
+        return None
+    return OutboundScheduler(max_retries=int(settings.get("OUTBOUND_MAX_RETRIES", 3)))
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Awaitable, Hashable
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from slack_sdk.web.async_slack_response import AsyncSlackResponse
+
+# Slack truncates messages longer than 40000 characters, and advises to keep them under 4000 characters
+MAX_TEXT_LENGTH = 4000
+
+QueueKey = tuple[str, "str | None"]
+
+
+@dataclass
+class _PendingMessage:
+    text: str | None
+    source: Hashable | None
+    kwargs: dict[str, Any]
+    future: asyncio.Future[AsyncSlackResponse]
+
+    @property
+    def mergeable(self) -> bool:
+        # Only messages with nothing but text can be merged
+        return bool(self.text) and not any(value for name, value in self.kwargs.items() if name != "thread_ts")
+
+
+class SendQueue:
+    """Ordered queues of outgoing messages, one per channel and thread
+
+    Messages sent through the queue are posted in the order in which they were queued. Consecutive plain text messages
+    from the same source, that are queued within `window` seconds of each other, are merged into a single message as
+    long as the merged text stays under `max_text_length` characters. Every merged message resolves to the response of
+    the message it was merged into.
+    """
+
+    def __init__(
+        self,
+        send: Callable[..., Awaitable[AsyncSlackResponse]],
+        window: float = 0.2,
+        max_text_length: int = MAX_TEXT_LENGTH,
+    ):
+        if window < 0:
+            raise ValueError("Window can't be negative")
+        self._send = send
+        self._window = window
+        self._max_text_length = max_text_length
+        self._queues: dict[QueueKey, deque[_PendingMessage]] = {}
+        self._workers: dict[QueueKey, asyncio.Task[None]] = {}
+
+    async def send(
+        self, channel_id: str, text: str | None, source: Hashable | None = None, **kwargs: Any
+    ) -> AsyncSlackResponse:
+        """Queue a message and wait until it's posted
+
+        Args:
+            channel_id: id of the channel to post the message to
+            text: text of the message
+            source: identifies the sender of the message. Only messages from the same source are merged.
+            **kwargs: other arguments for [`SlackClient.send`][machine.clients.slack.SlackClient.send]
+
+        Returns:
+            the response of posting the message, or the message it was merged into
+        """
+        key = (channel_id, kwargs.get("thread_ts"))
+        message = _PendingMessage(text, source, kwargs, asyncio.get_running_loop().create_future())
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = deque()
+            self._workers[key] = asyncio.create_task(self._drain(key, queue))
+        queue.append(message)
+        return await message.future
+
+    def queue_depth(self) -> int:
+        """Number of messages that are waiting to be posted"""
+        return sum(len(queue) for queue in self._queues.values())
+
+    async def close(self) -> None:
+        """Wait until all queued messages are posted"""
+        workers = list(self._workers.values())
+        if workers:
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def _drain(self, key: QueueKey, queue: deque[_PendingMessage]) -> None:
+        channel_id, _ = key
+        try:
+            while queue:
+                if queue[0].mergeable and self._window:
+                    # Give the sender a moment to queue more messages that can be merged with this one
+                    await asyncio.sleep(self._window)
+                batch = self._take_batch(queue)
+                if not batch:
+                    continue
+                first = batch[0]
+                text = "\n".join(message.text for message in batch if message.text) if len(batch) > 1 else first.text
+                try:
+                    response = await self._send(channel_id, text, **first.kwargs)
+                except Exception as e:
+                    for message in batch:
+                        if not message.future.done():
+                            message.future.set_exception(e)
+                else:
+                    for message in batch:
+                        if not message.future.done():
+                            message.future.set_result(response)
+        finally:
+            # Nothing is awaited between the last check of the queue and removing it, so no message can be lost
+            del self._queues[key]
+            del self._workers[key]
+            # Only left over when the worker itself was cancelled
+            for message in queue:
+                message.future.cancel()
+
+    def _take_batch(self, queue: deque[_PendingMessage]) -> list[_PendingMessage]:
+        batch: list[_PendingMessage] = []
+        length = 0
+        while queue:
+            message = queue[0]
+            if message.future.done():
+                # The sender stopped waiting for the message, eg. because its handler was cancelled
+                queue.popleft()
+                continue
+            if batch:
+                first = batch[0]
+                if not (first.mergeable and message.mergeable and message.source == first.source):
+                    break
+                if length + 1 + len(message.text or "") > self._max_text_length:
+                    break
+            queue.popleft()
+            batch.append(message)
+            length += (1 if len(batch) > 1 else 0) + len(message.text or "")
+        return batch
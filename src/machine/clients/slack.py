@@ -1,23 +1,36 @@
 from __future__ import annotations
 
 import asyncio
-from collections.abc import AsyncGenerator, Awaitable
+import contextlib
+import time
+from collections.abc import AsyncGenerator, Awaitable, Hashable, Iterable, Mapping, MutableMapping, Sequence
 from datetime import datetime
-from typing import Any, Callable
+from functools import partial
+from operator import attrgetter
+from typing import Any, Callable, TypeVar
 from zoneinfo import ZoneInfo
 
+from pydantic import BaseModel, TypeAdapter
 from slack_sdk.errors import SlackApiError
 from slack_sdk.models.views import View
 from slack_sdk.socket_mode.aiohttp import SocketModeClient
 from slack_sdk.socket_mode.async_client import AsyncBaseSocketModeClient
 from slack_sdk.socket_mode.request import SocketModeRequest
-from slack_sdk.socket_mode.response import SocketModeResponse
 from slack_sdk.web.async_client import AsyncWebClient
 from slack_sdk.web.async_slack_response import AsyncSlackResponse
 from structlog.stdlib import get_logger
 
+from machine.clients.api_cache import CachingAsyncWebClient
+from machine.clients.cache_snapshot import CacheSnapshot, CacheSnapshotStore
+from machine.clients.compact_cache import CHANNEL_CODEC, USER_CODEC, CompactMap, KeyIndex, RecordCodec
+from machine.clients.fan_out import DEFAULT_CONCURRENCY, DeliveryResult, fan_out
+from machine.clients.name_index import NameIndex
+from machine.clients.rate_limit import OutboundScheduler, OutboundStats
+from machine.clients.send_queue import SendQueue
 from machine.models import Channel, User
+from machine.utils.collections import LRUDict
 from machine.utils.datetime import calculate_epoch
+from machine.utils.single_flight import SingleFlight
 
 logger = get_logger(__name__)
 
@@ -36,61 +49,164 @@ def id_for_channel(channel: Channel | str) -> str:
         return channel
 
 
+# Event types that affect the local channel & user caches, and the methods of SlackClient that handle them
+_CACHE_EVENT_HANDLERS = {
+    "team_join": "_on_team_join",
+    "user_change": "_on_user_change",
+    "channel_created": "_on_channel_created",
+    "channel_deleted": "_on_channel_deleted",
+    "group_deleted": "_on_channel_deleted",
+    "channel_rename": "_on_channel_updated",
+    "group_rename": "_on_channel_updated",
+    "channel_archive": "_on_channel_updated",
+    "group_archive": "_on_channel_updated",
+    "channel_unarchive": "_on_channel_updated",
+    "group_unarchive": "_on_channel_updated",
+    "channel_id_changed": "_on_channel_id_changed",
+    "member_joined_channel": "_on_member_joined_channel",
+}
+
+
+CONVERSATION_TYPES = ("public_channel", "private_channel", "mpim", "im")
+
+_USER_LIST = TypeAdapter(list[User])
+_CHANNEL_LIST = TypeAdapter(list[Channel])
+# Validation holds the GIL, so running it in a thread doesn't help. Instead, records are validated in chunks that take
+# a few milliseconds each, and other tasks get to run in between.
+VALIDATION_CHUNK_SIZE = 200
+
+T = TypeVar("T")
+M = TypeVar("M", bound=BaseModel)
+
+
+async def _validate_in_chunks(adapter: TypeAdapter[list[M]], records: Sequence[dict[str, Any]]) -> list[M]:
+    validated: list[M] = []
+    for start in range(0, len(records), VALIDATION_CHUNK_SIZE):
+        validated.extend(adapter.validate_python(records[start : start + VALIDATION_CHUNK_SIZE]))
+        await asyncio.sleep(0)
+    return validated
+
+
+def _merge_changes(new: dict[str, T], current: Mapping[str, T], changed_ids: set[str]) -> None:
+    # Entries that were changed by events since the rebuild started are more recent than what was fetched
+    for id_ in changed_ids:
+        if id_ in current:
+            new[id_] = current[id_]
+        else:
+            new.pop(id_, None)
+
+
+def _cached_field(cache: Mapping[str, M], key: str, name: str) -> Any:
+    # A compact cache can read a single field, without recreating the whole model
+    if isinstance(cache, CompactMap):
+        return cache.field(key, name)
+    return getattr(cache[key], name)
+
+
+def _user_names(user: User) -> tuple[str | None, ...]:
+    return user.name, user.profile.display_name_normalized, user.profile.display_name
+
+
+def _channel_names(channel: Channel) -> tuple[str | None, ...]:
+    return (channel.name_normalized,)
+
+
+def _warn_missing_email(user: User) -> None:
+    if not user.is_bot:
+        logger.warning("User has not provided an email address in their profile", user=user.model_dump())
+
+
 class SlackClient:
     _client: SocketModeClient
-    _users: dict[str, User]
-    _users_by_email: dict[str, User]
-    _channels: dict[str, Channel]
+    _users: MutableMapping[str, User]
+    _users_by_email: MutableMapping[str, User]
+    _channels: MutableMapping[str, Channel]
     _bot_info: dict[str, Any]
     _tz: ZoneInfo
-
-    def __init__(self, client: SocketModeClient, tz: ZoneInfo):
+    _cache_snapshot_store: CacheSnapshotStore | None
+    _reconcile_task: asyncio.Task[None] | None
+    _rate_limited_until: dict[str, float]
+    _changed_user_ids: set[str] | None
+    _changed_channel_ids: set[str] | None
+    _outbound_scheduler: OutboundScheduler | None
+
+    def __init__(
+        self,
+        client: SocketModeClient,
+        tz: ZoneInfo,
+        cache_snapshot_store: CacheSnapshotStore | None = None,
+        lazy_cache_size: int | None = None,
+        compact_cache: bool = False,
+        outbound_scheduler: OutboundScheduler | None = None,
+        coalesce_window: float = 0.2,
+    ):
+        if lazy_cache_size is not None and lazy_cache_size < 1:
+            raise ValueError("Lazy cache size must be at least 1")
         self._client = client
-        self._users = {}
-        self._users_by_email = {}
-        self._channels: dict[str, Channel] = {}
+        self._lazy_cache_size = lazy_cache_size
+        # A lazy cache is small, so there's no need to make it compact
+        self._compact_cache = compact_cache and lazy_cache_size is None
+        self._users = self._new_cache({}, USER_CODEC)
+        self._user_names: NameIndex[User] = NameIndex(_user_names, prefix="@")
+        self._channel_names: NameIndex[Channel] = NameIndex(_channel_names, prefix="#")
+        self._users_by_email = self._new_email_index({})
+        self._channels = self._new_cache({}, CHANNEL_CODEC)
         self._tz = tz
+        self._user_fetches: SingleFlight[str, User] = SingleFlight()
+        self._channel_fetches: SingleFlight[str, Channel] = SingleFlight()
+        self._cache_snapshot_store = cache_snapshot_store
+        self._reconcile_task = None
+        self._rate_limited_until = {}
+        # Ids of users and channels changed by events while the caches are being rebuilt
+        self._changed_user_ids = None
+        self._changed_channel_ids = None
+        self._outbound_scheduler = outbound_scheduler
+        self._send_queue = SendQueue(self._send_now, window=coalesce_window)
 
     @property
     def web_client(self) -> AsyncWebClient:
         return self._client.web_client
 
+    @property
+    def outbound_stats(self) -> OutboundStats | None:
+        """Statistics of the pacing of outgoing calls, or `None` if outgoing calls are not paced"""
+        return self._outbound_scheduler.stats() if self._outbound_scheduler is not None else None
+
+    async def _call(
+        self,
+        api_method: str,
+        client_method: Callable[..., Awaitable[AsyncSlackResponse]],
+        **kwargs: Any,
+    ) -> AsyncSlackResponse:
+        # Outgoing calls are paced by the scheduler, which also retries calls that hit a rate limit (except for calls
+        # that take a trigger_id, see NO_RETRY_METHODS)
+        if self._outbound_scheduler is None:
+            return await client_method(**kwargs)
+        return await self._outbound_scheduler.call(
+            api_method, partial(client_method, **kwargs), channel=kwargs.get("channel")
+        )
+
     def register_handler(
         self,
         handler: Callable[[AsyncBaseSocketModeClient, SocketModeRequest], Awaitable[None]],
     ) -> None:
         self._client.socket_mode_request_listeners.append(handler)
 
-    async def _process_users_channels(self, _: AsyncBaseSocketModeClient, req: SocketModeRequest) -> None:
-        if req.type == "events_api":
-            # Acknowledge the request
-            response = SocketModeResponse(envelope_id=req.envelope_id)
-            await self._client.send_socket_mode_response(response)
-
-            event = req.payload["event"]
-
-            # Handle events to update local channel & user caches
-            if event["type"] == "team_join":
-                await self._on_team_join(event)
-            elif event["type"] == "user_change":
-                await self._on_user_change(event)
-            elif event["type"] == "channel_created":
-                await self._on_channel_created(event)
-            elif event["type"] == "channel_deleted" or event["type"] == "group_deleted":
-                await self._on_channel_deleted(event)
-            elif (
-                event["type"] == "channel_rename"
-                or event["type"] == "group_rename"
-                or event["type"] == "channel_archive"
-                or event["type"] == "group_archive"
-                or event["type"] == "channel_unarchive"
-                or event["type"] == "group_unarchive"
-            ):
-                await self._on_channel_updated(event)
-            elif event["type"] == "channel_id_changed":
-                await self._on_channel_id_changed(event)
-            elif event["type"] == "member_joined_channel":
-                await self._on_member_joined_channel(event)
+    @property
+    def cache_event_types(self) -> frozenset[str]:
+        """Types of events that are used to keep the user and channel caches up to date"""
+        return frozenset(_CACHE_EVENT_HANDLERS)
+
+    async def handle_cache_event(self, event: dict[str, Any]) -> None:
+        """Update local channel & user caches based on an incoming event
+
+        Args:
+            event: event from the Events API. Events of types other than
+                [`cache_event_types`][machine.clients.slack.SlackClient.cache_event_types] are ignored.
+        """
+        handler_name = _CACHE_EVENT_HANDLERS.get(event["type"])
+        if handler_name is not None:
+            await getattr(self, handler_name)(event)
 
     async def fetch_paginated_data(
         self,
@@ -100,26 +216,88 @@ class SlackClient:
         limit: int = 1000,
         **method_kwargs: Any,
     ) -> AsyncGenerator[dict[str, Any], None]:
-        cursor = None
-        while True:
-            try:
-                response = await client_method(limit=limit, cursor=cursor, **method_kwargs)
-                items = response[data_key]
+        """Fetch all items of a paginated Web API method
 
-                for item in items:
-                    yield item
+        See [`fetch_paginated_pages`][machine.clients.slack.SlackClient.fetch_paginated_pages] for how pages are
+        fetched.
 
-                cursor = (response.get("response_metadata") or {}).get("next_cursor")
-                logger.info(f"{len(items)} {logger_label} loaded in this batch.")
+        Args:
+            client_method: method of the web client to call
+            data_key: key of the items in the response
+            logger_label: name of the items, for logging
+            limit: maximum number of items per page
+            method_kwargs: extra arguments for the method
 
-                if not cursor:
-                    break
+        Yields:
+            the items of all pages, in order
+        """
+        async for items in self.fetch_paginated_pages(client_method, data_key, logger_label, limit, **method_kwargs):
+            for item in items:
+                yield item
 
+    async def fetch_paginated_pages(
+        self,
+        client_method: Callable[..., Awaitable[AsyncSlackResponse]],
+        data_key: str,
+        logger_label: str,
+        limit: int = 1000,
+        **method_kwargs: Any,
+    ) -> AsyncGenerator[list[dict[str, Any]], None]:
+        """Fetch all pages of a paginated Web API method
+
+        The next page is requested as soon as the cursor for it is known, so it is fetched while the current page is
+        being processed. When Slack responds with a rate limit error, all fetches of the same method wait for the time
+        indicated by the `Retry-After` header before trying again.
+
+        Args:
+            client_method: method of the web client to call
+            data_key: key of the items in the response
+            logger_label: name of the items, for logging
+            limit: maximum number of items per page
+            method_kwargs: extra arguments for the method
+
+        Yields:
+            the items of each page, in order
+        """
+        next_page: asyncio.Task[AsyncSlackResponse] | None = asyncio.create_task(
+            self._fetch_page(client_method, logger_label, limit=limit, cursor=None, **method_kwargs)
+        )
+        try:
+            while next_page is not None:
+                response = await next_page
+                items = response[data_key]
+                cursor = (response.get("response_metadata") or {}).get("next_cursor")
+                logger.info(f"{len(items)} {logger_label} loaded in this batch.")
+                next_page = (
+                    asyncio.create_task(
+                        self._fetch_page(client_method, logger_label, limit=limit, cursor=cursor, **method_kwargs)
+                    )
+                    if cursor
+                    else None
+                )
+                yield items
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+
+    async def _fetch_page(
+        self, client_method: Callable[..., Awaitable[AsyncSlackResponse]], logger_label: str, **kwargs: Any
+    ) -> AsyncSlackResponse:
+        method_name = getattr(client_method, "__name__", logger_label)
+        while True:
+            # Wait until the rate limit that Slack reported for this method has passed
+            delay = self._rate_limited_until.get(method_name, 0) - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                return await client_method(**kwargs)
             except SlackApiError as e:
                 if e.response["error"] == "ratelimited":
                     retry_after = int(e.response.headers.get("Retry-After", 1))
                     logger.warning(f"Slack API rate limit hit. Retrying after {retry_after} seconds...")
-                    await asyncio.sleep(retry_after)
+                    self._rate_limited_until[method_name] = max(
+                        self._rate_limited_until.get(method_name, 0), time.monotonic() + retry_after
+                    )
                 else:
                     logger.error(f"Error fetching {logger_label}: {e.response['error']}")
                     raise e
@@ -131,13 +309,33 @@ class SlackClient:
         As of writing the rate limit for the Users List API is 20+ per minute
         (Web API Tier 2). This means if you have more than 20,000 users the
         cache may take over a minute to build.
+
+        Users are validated in small chunks, so the event loop stays responsive. The new cache replaces the
+        current one when all users have been fetched. Users that are already cached and haven't been updated since are
+        kept as they are, and changes to the cache made by events in the meantime are preserved.
         """
-        async for user in self.fetch_paginated_data(
-            client_method=self._client.web_client.users_list,
-            data_key="members",
-            logger_label="users",
-        ):
-            self._register_user(user)
+        users: dict[str, User] = {}
+        self._changed_user_ids = set()
+        try:
+            async for page in self.fetch_paginated_pages(
+                client_method=self._client.web_client.users_list,
+                data_key="members",
+                logger_label="users",
+            ):
+                outdated = []
+                for user_response in page:
+                    user_id = user_response["id"]
+                    updated = user_response.get("updated")
+                    if user_id in self._users and _cached_field(self._users, user_id, "updated") == updated:
+                        users[user_id] = self._users[user_id]
+                    else:
+                        outdated.append(user_response)
+                for user in await _validate_in_chunks(_USER_LIST, outdated):
+                    users[user.id] = user
+            _merge_changes(users, self._users, self._changed_user_ids)
+            self._replace_users(users)
+        finally:
+            self._changed_user_ids = None
 
         logger.debug("Total users cached: %s", len(self._users))
         logger.debug(
@@ -151,53 +349,260 @@ class SlackClient:
         As of writing the rate limit for the Conversations API is 20+ per minute
         (Web API Tier 2). This means if you have more than 20,000 channels the
         cache may take over a minute to build.
+
+        Channels are validated in small chunks, so the event loop stays responsive. The new cache replaces
+        the current one when all channels have been fetched, and changes to the cache made by events in the meantime are
+        preserved.
         """
-        async for channel in self.fetch_paginated_data(
-            client_method=self._client.web_client.conversations_list,
-            data_key="channels",
-            logger_label="channels",
-            types="public_channel,private_channel,mpim,im",
-        ):
-            self._register_channel(channel)
+        channels: dict[str, Channel] = {}
+
+        async def cache_channels(conversation_type: str) -> None:
+            async for page in self.fetch_paginated_pages(
+                client_method=self._client.web_client.conversations_list,
+                data_key="channels",
+                logger_label="channels",
+                types=conversation_type,
+            ):
+                for channel in await _validate_in_chunks(_CHANNEL_LIST, page):
+                    channels[channel.id] = channel
+
+        self._changed_channel_ids = set()
+        try:
+            # Every type of conversation is paginated separately, so they can be fetched concurrently
+            await asyncio.gather(*(cache_channels(conversation_type) for conversation_type in CONVERSATION_TYPES))
+            _merge_changes(channels, self._channels, self._changed_channel_ids)
+            self._replace_channels(channels)
+        finally:
+            self._changed_channel_ids = None
 
         logger.debug("Total channels cached: %s", len(self._channels))
         logger.debug("Channels: %s", ", ".join([c.identifier for c in self._channels.values()]))
 
     async def setup(self) -> None:
-        # Setup handlers
-        # TODO: use partial?
-        self.register_handler(lambda client, req: self._process_users_channels(client, req))
-
         # Get bot info
         auth_info = await self._client.web_client.auth_test()
         self._bot_info = (await self._client.web_client.bots_info(bot=auth_info["bot_id"]))["bot"]
         logger.debug("Bot info: %s", self._bot_info)
 
-        await self.cache_all_users()
-        await self.cache_all_channels()
+        if await self.load_cache_snapshot():
+            if self._lazy_cache_size is None:
+                # Serve from the snapshot right away, and catch up with changes made while the bot was down
+                self._reconcile_task = asyncio.create_task(self._reconcile_caches())
+        elif self._lazy_cache_size is not None:
+            logger.info(
+                "Lazy cache enabled, users and channels will be fetched when needed", size=self._lazy_cache_size
+            )
+        else:
+            await asyncio.gather(self.cache_all_users(), self.cache_all_channels())
+            await self.save_cache_snapshot()
+
+    async def close(self) -> None:
+        """Post queued messages, stop reconciling the caches and save a final snapshot of them"""
+        await self._send_queue.close()
+        if self._reconcile_task is not None:
+            self._reconcile_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._reconcile_task
+            self._reconcile_task = None
+        await self.save_cache_snapshot()
+
+    async def load_cache_snapshot(self) -> bool:
+        """Fill the user and channel caches from the snapshot saved by a previous run
+
+        Returns:
+            `True` if the caches were filled, `False` if no snapshot is configured or available
+        """
+        if self._cache_snapshot_store is None:
+            return False
+        try:
+            snapshot = await self._cache_snapshot_store.load()
+        except Exception:
+            logger.exception("Error while loading cache snapshot")
+            return False
+        if snapshot is None:
+            return False
+        users = await _validate_in_chunks(_USER_LIST, snapshot.users)
+        channels = await _validate_in_chunks(_CHANNEL_LIST, snapshot.channels)
+        self._replace_users({user.id: user for user in users})
+        self._replace_channels({channel.id: channel for channel in channels})
+        logger.info(
+            "Loaded user and channel caches from snapshot",
+            users=len(snapshot.users),
+            channels=len(snapshot.channels),
+            age=round(time.time() - snapshot.created_at),
+        )
+        return True
+
+    async def save_cache_snapshot(self) -> None:
+        """Save a snapshot of the user and channel caches, so the next run can start from it"""
+        if self._cache_snapshot_store is None:
+            return
+        try:
+            await self._cache_snapshot_store.save(
+                CacheSnapshot.from_caches(self._users.values(), self._channels.values())
+            )
+        except Exception:
+            logger.exception("Error while saving cache snapshot")
+
+    async def _reconcile_caches(self) -> None:
+        try:
+            await asyncio.gather(self.cache_all_users(), self.cache_all_channels())
+        except Exception:
+            logger.exception("Error while reconciling caches, continuing with cached users and channels")
+            return
+        logger.info("User and channel caches reconciled")
+        await self.save_cache_snapshot()
 
     def _register_user(self, user_response: dict[str, Any]) -> User:
         user = User.model_validate(user_response)
+        previous = self._users.get(user.id)
+        if previous is not None:
+            self._user_names.remove(user.id, previous)
         self._users[user.id] = user
+        self._user_names.add(user.id, user)
+        if self._changed_user_ids is not None:
+            self._changed_user_ids.add(user.id)
         if user.profile.email is not None:
             self._users_by_email[user.profile.email] = user
         else:
-            if not user.is_bot:
-                logger.warning("User has not provided an email address in their profile", user=user.model_dump())
+            _warn_missing_email(user)
         return user
 
+    def _replace_users(self, users: dict[str, User]) -> None:
+        users_by_email = {}
+        for user in users.values():
+            if user.profile.email is not None:
+                users_by_email[user.profile.email] = user
+            elif user.id not in self._users:
+                _warn_missing_email(user)
+        self._users = self._new_cache(users, USER_CODEC)
+        self._users_by_email = self._new_email_index(users_by_email)
+        self._user_names.rebuild(users)
+
+    def _replace_channels(self, channels: dict[str, Channel]) -> None:
+        self._channels = self._new_cache(channels, CHANNEL_CODEC)
+        self._channel_names.rebuild(channels)
+
+    def _new_cache(self, entries: dict[str, M], codec: RecordCodec[M]) -> MutableMapping[str, M]:
+        if self._lazy_cache_size is not None:
+            return LRUDict(self._lazy_cache_size, entries)
+        if self._compact_cache:
+            return CompactMap(codec, entries)
+        return entries
+
+    def _new_email_index(self, users_by_email: dict[str, User]) -> MutableMapping[str, User]:
+        if self._compact_cache:
+            # Refer to the users by id, so they aren't stored twice
+            return KeyIndex(self._users, attrgetter("id"), users_by_email)
+        return self._new_cache(users_by_email, USER_CODEC)
+
+    @property
+    def lazy_cache(self) -> bool:
+        """Whether users and channels are cached lazily
+
+        If `True`, the user and channel caches only hold the most recently used users and channels. Others are
+        fetched when needed, with [`fetch_user`][machine.clients.slack.SlackClient.fetch_user],
+        [`fetch_channel`][machine.clients.slack.SlackClient.fetch_channel] or
+        [`ensure_cached`][machine.clients.slack.SlackClient.ensure_cached].
+        """
+        return self._lazy_cache_size is not None
+
+    async def fetch_user(self, user_id: str) -> User:
+        """Get a user from the cache, or from the Slack API if it's not cached
+
+        Concurrent fetches of the same user result in a single API call.
+
+        Args:
+            user_id: id of the user
+
+        Returns:
+            the user
+        """
+        user = self._users.get(user_id)
+        if user is not None:
+            return user
+        return await self._user_fetches.do(user_id, partial(self._fetch_user, user_id))
+
+    async def _fetch_user(self, user_id: str) -> User:
+        response = await self._client.web_client.users_info(user=user_id)
+        return self._register_user(response["user"])
+
+    async def fetch_channel(self, channel_id: str) -> Channel:
+        """Get a channel from the cache, or from the Slack API if it's not cached
+
+        Concurrent fetches of the same channel result in a single API call.
+
+        Args:
+            channel_id: id of the channel
+
+        Returns:
+            the channel
+        """
+        channel = self._channels.get(channel_id)
+        if channel is not None:
+            return channel
+        return await self._channel_fetches.do(channel_id, partial(self._fetch_channel, channel_id))
+
+    async def _fetch_channel(self, channel_id: str) -> Channel:
+        response = await self._client.web_client.conversations_info(channel=channel_id)
+        return self._register_channel(response["channel"])
+
+    async def ensure_cached(self, user_id: str | None = None, channel_id: str | None = None) -> None:
+        """Make sure a user and/or channel are in the cache, if users and channels are cached lazily
+
+        This is called before handlers are invoked, so the sender and channel of messages, commands and interactions
+        can be looked up in the cache. Users and channels that can't be fetched are logged and skipped.
+
+        Args:
+            user_id: id of the user
+            channel_id: id of the channel
+        """
+        if self._lazy_cache_size is None:
+            return
+        fetches: list[Awaitable[Any]] = []
+        if user_id is not None and user_id not in self._users:
+            fetches.append(self.fetch_user(user_id))
+        if channel_id is not None and channel_id not in self._channels:
+            fetches.append(self.fetch_channel(channel_id))
+        for result in await asyncio.gather(*fetches, return_exceptions=True):
+            if isinstance(result, Exception):
+                logger.warning("Could not fetch user or channel", user_id=user_id, channel_id=channel_id, exc=result)
+
     def _register_channel(self, channel_response: dict[str, Any]) -> Channel:
         channel = Channel.model_validate(channel_response)
+        previous = self._channels.get(channel.id)
+        if previous is not None:
+            self._channel_names.remove(channel.id, previous)
         self._channels[channel.id] = channel
+        self._channel_names.add(channel.id, channel)
+        self._mark_channels_changed(channel.id)
         return channel
 
+    def _mark_channels_changed(self, *channel_ids: str) -> None:
+        if self._changed_channel_ids is not None:
+            self._changed_channel_ids.update(channel_ids)
+
+    def _invalidate_api_cache(self, api_method: str, **params: Any) -> None:
+        # Events tell us when cached Web API responses are outdated, well before their TTL expires
+        web_client = self._client.web_client
+        if isinstance(web_client, CachingAsyncWebClient):
+            web_client.cache.invalidate(api_method, **params)
+
+    def _invalidate_user(self, user_response: dict[str, Any]) -> None:
+        self._invalidate_api_cache("users.info", user=user_response["id"])
+        email = user_response.get("profile", {}).get("email")
+        if email:
+            self._invalidate_api_cache("users.lookupByEmail", email=email)
+
     async def _on_team_join(self, event: dict[str, Any]) -> None:
         logger.debug("team_join: %s", event)
+        self._invalidate_user(event["user"])
         user = self._register_user(event["user"])
         logger.debug("User joined team: %s", user)
 
     async def _on_user_change(self, event: dict[str, Any]) -> None:
         logger.debug("user_change: %s", event)
+        self._invalidate_user(event["user"])
         user = self._register_user(event["user"])
         logger.debug("User changed: %s", user)
 
@@ -212,40 +617,50 @@ class SlackClient:
             "channel_rename/channel_archive/channel_unarchive/group_rename/group_archive/group_unarchive: %s", event
         )
         channel_id = event["channel"]["id"] if isinstance(event["channel"], dict) else event["channel"]
+        self._invalidate_api_cache("conversations.info", channel=channel_id)
         channel_resp = await self._client.web_client.conversations_info(channel=channel_id)
         channel = self._register_channel(channel_resp["channel"])
         logger.debug("Channel updated: %s", channel)
 
     async def _on_channel_deleted(self, event: dict[str, Any]) -> None:
         logger.debug("channel_deleted: %s", event)
-        channel = self._channels[event["channel"]]
-        del self._channels[event["channel"]]
-        logger.debug("Channel %s deleted", channel.name)
+        self._invalidate_api_cache("conversations.info", channel=event["channel"])
+        channel = self._channels.pop(event["channel"], None)
+        if channel is not None:
+            self._channel_names.remove(event["channel"], channel)
+        self._mark_channels_changed(event["channel"])
+        logger.debug("Channel %s deleted", channel.name if channel is not None else event["channel"])
 
     async def _on_member_joined_channel(self, event: dict[str, Any]) -> None:
         logger.debug("member_joined_channel: %s", event)
         if event["user"] == self._bot_info["user_id"]:
             channel_id = event["channel"]
+            self._invalidate_api_cache("conversations.info", channel=channel_id)
             channel_resp = await self._client.web_client.conversations_info(channel=channel_id)
             channel = self._register_channel(channel_resp["channel"])
             logger.debug("Bot joined %s", channel)
 
     async def _on_channel_id_changed(self, event: dict[str, Any]) -> None:
         logger.debug("channel_id_changed: %s", event)
-        channel = self._channels[event["old_channel_id"]]
-        self._channels[event["new_channel_id"]] = channel
-        del self._channels[event["old_channel_id"]]
+        self._invalidate_api_cache("conversations.info", channel=event["old_channel_id"])
+        channel = self._channels.pop(event["old_channel_id"], None)
+        # With a lazy cache, the channel might not be cached
+        if channel is not None:
+            self._channel_names.remove(event["old_channel_id"], channel)
+            self._channels[event["new_channel_id"]] = channel
+            self._channel_names.add(event["new_channel_id"], channel)
+        self._mark_channels_changed(event["old_channel_id"], event["new_channel_id"])
 
     @property
-    def users(self) -> dict[str, User]:
+    def users(self) -> MutableMapping[str, User]:
         return self._users
 
     @property
-    def users_by_email(self) -> dict[str, User]:
+    def users_by_email(self) -> MutableMapping[str, User]:
         return self._users_by_email
 
     @property
-    def channels(self) -> dict[str, Channel]:
+    def channels(self) -> MutableMapping[str, Channel]:
         return self._channels
 
     @property
@@ -258,73 +673,209 @@ class SlackClient:
     def get_user_by_email(self, email: str) -> User | None:
         return self._users_by_email.get(email)
 
-    async def send(self, channel: Channel | str, text: str | None, **kwargs: Any) -> AsyncSlackResponse:
+    def find_user_by_name(self, name: str) -> User | None:
+        """Find a user by their username or display name, case-insensitively
+
+        Args:
+            name: username or display name, optionally preceded by `@`
+
+        Returns:
+            the user, or `None` if no user has that name
+        """
+        return self._user_names.lookup(name, self._users)
+
+    def find_channel_by_name(self, name: str) -> Channel | None:
+        """Find a channel by its name, case-insensitively. This does not include DMs.
+
+        Args:
+            name: name of the channel, optionally preceded by `#`
+
+        Returns:
+            the channel, or `None` if no channel has that name
+        """
+        return self._channel_names.lookup(name, self._channels)
+
+    async def send(
+        self,
+        channel: Channel | str,
+        text: str | None,
+        coalesce: bool = False,
+        source: Hashable | None = None,
+        **kwargs: Any,
+    ) -> AsyncSlackResponse:
+        """Send a message to a channel
+
+        Args:
+            channel: channel or id of the channel to send the message to
+            text: text of the message
+            coalesce: send the message through the ordered queue of the channel (and thread). Consecutive plain text
+                messages from the same `source` that are sent shortly after each other, are merged into one message.
+            source: identifies the sender of the message, when `coalesce` is `True`
+            **kwargs: other arguments for chat.postMessage or chat.postEphemeral
+
+        Returns:
+            the response of chat.postMessage or chat.postEphemeral
+        """
         channel_id = id_for_channel(channel)
+        if coalesce:
+            return await self._send_queue.send(channel_id, text, source=source, **kwargs)
+        return await self._send_now(channel_id, text, **kwargs)
+
+    async def _send_now(self, channel_id: str, text: str | None, **kwargs: Any) -> AsyncSlackResponse:
         if "ephemeral_user" in kwargs and kwargs["ephemeral_user"] is not None:
             ephemeral_user_id = id_for_user(kwargs["ephemeral_user"])
             del kwargs["ephemeral_user"]
-            return await self._client.web_client.chat_postEphemeral(
-                channel=channel_id, user=ephemeral_user_id, text=text, **kwargs
+            return await self._call(
+                "chat.postEphemeral",
+                self._client.web_client.chat_postEphemeral,
+                channel=channel_id,
+                user=ephemeral_user_id,
+                text=text,
+                **kwargs,
             )
         else:
-            return await self._client.web_client.chat_postMessage(channel=channel_id, text=text, **kwargs)
+            return await self._call(
+                "chat.postMessage",
+                self._client.web_client.chat_postMessage,
+                channel=channel_id,
+                text=text,
+                **kwargs,
+            )
+
+    async def send_many(
+        self,
+        channels: Iterable[Channel | str],
+        text: str | None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        **kwargs: Any,
+    ) -> dict[str, DeliveryResult]:
+        """Send the same message to many channels
+
+        Args:
+            channels: channels or ids of the channels to send the message to
+            text: text of the message
+            concurrency: maximum number of messages that are sent at the same time
+            **kwargs: other arguments for chat.postMessage
+
+        Returns:
+            the result per channel id
+        """
+        return await fan_out(
+            (id_for_channel(channel) for channel in channels),
+            lambda channel_id: self.send(channel_id, text, **kwargs),
+            concurrency,
+        )
 
     async def send_scheduled(
         self, when: datetime, channel: Channel | str, text: str, **kwargs: Any
     ) -> AsyncSlackResponse:
         channel_id = id_for_channel(channel)
         scheduled_ts = calculate_epoch(when, self._tz)
-        return await self._client.web_client.chat_scheduleMessage(
-            channel=channel_id, text=text, post_at=scheduled_ts, **kwargs
+        return await self._call(
+            "chat.scheduleMessage",
+            self._client.web_client.chat_scheduleMessage,
+            channel=channel_id,
+            text=text,
+            post_at=scheduled_ts,
+            **kwargs,
         )
 
     async def update(self, channel: Channel | str, ts: str, text: str | None, **kwargs: Any) -> AsyncSlackResponse:
         channel_id = id_for_channel(channel)
-        return await self._client.web_client.chat_update(channel=channel_id, ts=ts, text=text, **kwargs)
+        return await self._call(
+            "chat.update", self._client.web_client.chat_update, channel=channel_id, ts=ts, text=text, **kwargs
+        )
 
     async def delete(self, channel: Channel | str, ts: str, **kwargs: Any) -> AsyncSlackResponse:
         channel_id = id_for_channel(channel)
-        return await self._client.web_client.chat_delete(channel=channel_id, ts=ts, **kwargs)
+        return await self._call("chat.delete", self._client.web_client.chat_delete, channel=channel_id, ts=ts, **kwargs)
 
     async def react(self, channel: Channel | str, ts: str, emoji: str) -> AsyncSlackResponse:
         channel_id = id_for_channel(channel)
-        return await self._client.web_client.reactions_add(name=emoji, channel=channel_id, timestamp=ts)
+        return await self._call(
+            "reactions.add", self._client.web_client.reactions_add, name=emoji, channel=channel_id, timestamp=ts
+        )
 
     async def open_im(self, users: User | str | list[User | str]) -> str:
         user_ids = [id_for_user(user) for user in users] if isinstance(users, list) else id_for_user(users)
-        response = await self._client.web_client.conversations_open(users=user_ids)
+        response = await self._call("conversations.open", self._client.web_client.conversations_open, users=user_ids)
         return response["channel"]["id"]
 
     async def send_dm(self, user: User | str, text: str | None, **kwargs: Any) -> AsyncSlackResponse:
         user_id = id_for_user(user)
 
-        return await self._client.web_client.chat_postMessage(channel=user_id, text=text, as_user=True, **kwargs)
+        return await self._call(
+            "chat.postMessage",
+            self._client.web_client.chat_postMessage,
+            channel=user_id,
+            text=text,
+            as_user=True,
+            **kwargs,
+        )
+
+    async def send_dm_many(
+        self,
+        users: Iterable[User | str],
+        text: str | None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        **kwargs: Any,
+    ) -> dict[str, DeliveryResult]:
+        """Send the same direct message to many users
+
+        Args:
+            users: users or ids of the users to send the message to
+            text: text of the message
+            concurrency: maximum number of messages that are sent at the same time
+            **kwargs: other arguments for chat.postMessage
+
+        Returns:
+            the result per user id
+        """
+        return await fan_out(
+            (id_for_user(user) for user in users), lambda user_id: self.send_dm(user_id, text, **kwargs), concurrency
+        )
 
     async def send_dm_scheduled(self, when: datetime, user: User | str, text: str, **kwargs: Any) -> AsyncSlackResponse:
         user_id = id_for_user(user)
         scheduled_ts = calculate_epoch(when, self._tz)
 
-        return await self._client.web_client.chat_scheduleMessage(
-            channel=user_id, text=text, as_user=True, post_at=scheduled_ts, **kwargs
+        return await self._call(
+            "chat.scheduleMessage",
+            self._client.web_client.chat_scheduleMessage,
+            channel=user_id,
+            text=text,
+            as_user=True,
+            post_at=scheduled_ts,
+            **kwargs,
         )
 
     async def pin_message(self, channel: Channel | str, ts: str) -> AsyncSlackResponse:
         channel_id = id_for_channel(channel)
-        return await self._client.web_client.pins_add(channel=channel_id, timestamp=ts)
+        return await self._call("pins.add", self._client.web_client.pins_add, channel=channel_id, timestamp=ts)
 
     async def unpin_message(self, channel: Channel | str, ts: str) -> AsyncSlackResponse:
         channel_id = id_for_channel(channel)
-        return await self._client.web_client.pins_remove(channel=channel_id, timestamp=ts)
+        return await self._call("pins.remove", self._client.web_client.pins_remove, channel=channel_id, timestamp=ts)
 
     async def set_topic(self, channel: Channel | str, topic: str, **kwargs: Any) -> AsyncSlackResponse:
         channel_id = id_for_channel(channel)
-        return await self._client.web_client.conversations_setTopic(channel=channel_id, topic=topic, **kwargs)
+        return await self._call(
+            "conversations.setTopic",
+            self._client.web_client.conversations_setTopic,
+            channel=channel_id,
+            topic=topic,
+            **kwargs,
+        )
 
     async def open_modal(self, trigger_id: str, view: dict | View, **kwargs: Any) -> AsyncSlackResponse:
-        return await self._client.web_client.views_open(trigger_id=trigger_id, view=view, **kwargs)
+        return await self._call(
+            "views.open", self._client.web_client.views_open, trigger_id=trigger_id, view=view, **kwargs
+        )
 
     async def push_modal(self, trigger_id: str, view: dict | View, **kwargs: Any) -> AsyncSlackResponse:
-        return await self._client.web_client.views_push(trigger_id=trigger_id, view=view, **kwargs)
+        return await self._call(
+            "views.push", self._client.web_client.views_push, trigger_id=trigger_id, view=view, **kwargs
+        )
 
     async def update_modal(
         self,
@@ -334,12 +885,20 @@ class SlackClient:
         hash: str | None = None,
         **kwargs: Any,
     ) -> AsyncSlackResponse:
-        return await self._client.web_client.views_update(
-            view=view, view_id=view_id, external_id=external_id, hash=hash, **kwargs
+        return await self._call(
+            "views.update",
+            self._client.web_client.views_update,
+            view=view,
+            view_id=view_id,
+            external_id=external_id,
+            hash=hash,
+            **kwargs,
         )
 
     async def publish_home_tab(
         self, user: User | str, view: dict | View, hash: str | None = None, **kwargs: Any
     ) -> AsyncSlackResponse:
         user_id = id_for_user(user)
-        return await self._client.web_client.views_publish(user_id=user_id, view=view, hash=hash, **kwargs)
+        return await self._call(
+            "views.publish", self._client.web_client.views_publish, user_id=user_id, view=view, hash=hash, **kwargs
+        )
@@ -12,17 +12,16 @@ from zoneinfo import ZoneInfo
 import dill
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from slack_sdk.socket_mode.aiohttp import SocketModeClient
-from slack_sdk.web.async_client import AsyncWebClient
 from structlog.stdlib import get_logger
 
+from machine.clients.api_cache import create_web_client
+from machine.clients.cache_snapshot import create_cache_snapshot_store
+from machine.clients.http import HttpClientPool
+from machine.clients.rate_limit import create_outbound_scheduler
 from machine.clients.slack import SlackClient
-from machine.handlers import (
-    create_generic_event_handler,
-    create_interactive_handler,
-    create_message_handler,
-    create_slash_command_handler,
-    log_request,
-)
+from machine.handlers import create_request_router
+from machine.handlers.deduplication import create_deduplicator
+from machine.handlers.dispatcher import Dispatcher, create_dispatcher
 from machine.models.core import (
     BlockActionHandler,
     CommandHandler,
@@ -38,6 +37,7 @@ from machine.plugins.decorators import DecoratedPluginFunc
 from machine.plugins.metadata import ActionConfig, CommandConfig, MatcherConfig, Metadata, ModalConfig
 from machine.settings import import_settings
 from machine.storage import MachineBaseStorage, PluginStorage
+from machine.storage.backends.caching import create_caching_storage
 from machine.utils.collections import CaseInsensitiveDict
 from machine.utils.logging import configure_logging
 from machine.utils.module_loading import import_string
@@ -49,11 +49,14 @@ class Machine:
     _socket_mode_client: SocketModeClient
     _client: SlackClient | None
     _storage_backend: MachineBaseStorage
+    _plugin_storage_backend: MachineBaseStorage
     _settings: CaseInsensitiveDict | None
     _help: Manual
     _registered_actions: RegisteredActions
     _tz: ZoneInfo
     _scheduler: AsyncIOScheduler
+    _dispatcher: Dispatcher
+    _http_clients: HttpClientPool | None
 
     def __init__(self, settings: CaseInsensitiveDict | None = None):
         if settings is not None:
@@ -63,6 +66,8 @@ class Machine:
         self._help = Manual(human={}, robot={})
         self._registered_actions = RegisteredActions()
         self._client = None
+        self._dispatcher = Dispatcher()
+        self._http_clients = None
 
     async def _setup(self) -> None:
         logger.info("Initializing Slack Machine...")
@@ -114,7 +119,10 @@ class Machine:
         logger.info("Initializing storage backend %s...", storage_backend)
         _, cls = import_string(storage_backend)[0]
         self._storage_backend = cls(self._settings)
-        await self._storage_backend.init()
+        # Plugins can read through an in-process cache, because they often read the same keys (eg. role assignments).
+        # Other components need to see every change right away, so they use the backend directly.
+        self._plugin_storage_backend = create_caching_storage(self._settings, self._storage_backend)
+        await self._plugin_storage_backend.init()
         logger.info("Storage backend %s initialized!", storage_backend)
 
     async def _setup_slack_clients(self) -> None:
@@ -122,12 +130,21 @@ class Machine:
         # Setup Slack socket mode client
         self._socket_mode_client = SocketModeClient(
             app_token=self._settings["SLACK_APP_TOKEN"],
-            web_client=AsyncWebClient(token=self._settings["SLACK_BOT_TOKEN"]),
+            web_client=create_web_client(self._settings),
             proxy=self._settings["HTTP_PROXY"],
         )
 
         # Setup high-level Slack client for plugins
-        self._client = SlackClient(self._socket_mode_client, self._tz)
+        lazy_cache_size = self._settings.get("LAZY_CACHE_SIZE")
+        self._client = SlackClient(
+            self._socket_mode_client,
+            self._tz,
+            create_cache_snapshot_store(self._settings, self._storage_backend),
+            lazy_cache_size=int(lazy_cache_size) if lazy_cache_size else None,
+            compact_cache=bool(self._settings.get("COMPACT_CACHE", False)),
+            outbound_scheduler=create_outbound_scheduler(self._settings),
+            coalesce_window=float(self._settings.get("SEND_COALESCE_WINDOW", 0.2)),
+        )
         await self._client.setup()
 
     # TODO: factor out plugin registration in separate class / set of functions
@@ -137,12 +154,15 @@ class Machine:
             logger.error("Slack client not initialized!")
             sys.exit(1)
         logger.debug("PLUGINS: %s", self._settings["PLUGINS"])
+        # All plugins share the same HTTP clients, so connections to the same hosts are reused
+        self._http_clients = HttpClientPool(self._settings)
         for plugin in self._settings["PLUGINS"]:
             for class_name, cls in import_string(plugin):
                 if issubclass(cls, MachineBasePlugin) and cls is not MachineBasePlugin:
                     logger.debug("Found a Machine plugin: %s", plugin)
-                    storage = PluginStorage(class_name, self._storage_backend)
+                    storage = PluginStorage(class_name, self._plugin_storage_backend)
                     instance = cls(self._client, self._settings, storage)
+                    instance._http_clients = self._http_clients
                     missing_settings = self._register_plugin(class_name, instance)
                     if missing_settings:
                         logger.warning("Error loading plugin %s", class_name)
@@ -152,7 +172,7 @@ class Machine:
                     else:
                         await instance.init()
                         logger.info("Plugin %s loaded", class_name)
-        await self._storage_backend.set("manual", dill.dumps(self._help))
+        await self._plugin_storage_backend.set("manual", dill.dumps(self._help))
 
     def _register_plugin(self, plugin_class_name: str, cls_instance: MachineBasePlugin) -> list[str] | None:
         missing_settings = []
@@ -284,6 +304,7 @@ class Machine:
             function_signature=signature,
             regex=matcher_config.regex,
             handle_message_changed=matcher_config.handle_changed_message,
+            timeout=matcher_config.timeout,
         )
         key = f"{fq_fn_name}-{matcher_config.regex.pattern}"
         getattr(self._registered_actions, type_)[key] = handler
@@ -307,6 +328,7 @@ class Machine:
             function_signature=signature,
             command=command_config.command,
             is_generator=command_config.is_generator,
+            timeout=command_config.timeout,
         )
         command = command_config.command
         if command in self._registered_actions.command:
@@ -332,6 +354,7 @@ class Machine:
             function_signature=signature,
             action_id_matcher=block_action_config.action_id,
             block_id_matcher=block_action_config.block_id,
+            timeout=block_action_config.timeout,
         )
         action_id = matcher_to_str(block_action_config.action_id)
         block_id = matcher_to_str(block_action_config.block_id)
@@ -357,6 +380,7 @@ class Machine:
             function_signature=signature,
             callback_id_matcher=modal_config.callback_id,
             is_generator=modal_config.is_generator,
+            timeout=modal_config.timeout,
         )
         key = f"{fq_fn_name}-{matcher_to_str(modal_config.callback_id)}"
         getattr(self._registered_actions, type_)[key] = handler
@@ -390,20 +414,18 @@ class Machine:
         bot_id = self._client.bot_info["user_id"]
         bot_name = self._client.bot_info["name"]
 
-        if self._settings.get("LOGLEVEL", "ERROR").upper() == "DEBUG":
-            self._client.register_handler(log_request)
-
-        message_handler = create_message_handler(
-            self._registered_actions, self._settings, bot_id, bot_name, self._client
+        self._dispatcher = create_dispatcher(self._settings)
+        await self._dispatcher.start()
+        router = create_request_router(
+            self._registered_actions,
+            self._settings,
+            bot_id,
+            bot_name,
+            self._client,
+            self._dispatcher,
+            create_deduplicator(self._settings, self._storage_backend),
         )
-        generic_event_handler = create_generic_event_handler(self._registered_actions)
-        slash_command_handler = create_slash_command_handler(self._registered_actions, self._client)
-        block_action_handler = create_interactive_handler(self._registered_actions, self._client)
-
-        self._client.register_handler(message_handler)
-        self._client.register_handler(generic_event_handler)
-        self._client.register_handler(slash_command_handler)
-        self._client.register_handler(block_action_handler)
+        self._client.register_handler(router)
         # Establish a WebSocket connection to the Socket Mode servers
         await self._socket_mode_client.connect()
         logger.info("Connected to Slack")
@@ -415,5 +437,10 @@ class Machine:
         await asyncio.sleep(float("inf"))
 
     async def close(self) -> None:
-        closables = [self._socket_mode_client.close(), self._storage_backend.close()]
+        if self._client is not None:
+            # The final cache snapshot might be saved to the storage backend, so close the client first
+            await self._client.close()
+        closables = [self._socket_mode_client.close(), self._plugin_storage_backend.close(), self._dispatcher.close()]
+        if self._http_clients is not None:
+            closables.append(self._http_clients.close())
         await asyncio.gather(*closables)
@@ -3,3 +3,4 @@ from .event_handler import create_generic_event_handler  # noqa
 from .interactive_handler import create_interactive_handler  # noqa
 from .logging import log_request  # noqa
 from .message_handler import create_message_handler  # noqa
+from .router import create_request_router  # noqa
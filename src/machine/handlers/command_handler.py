@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import contextlib
 from collections.abc import AsyncGenerator, Awaitable
+from functools import partial
 from typing import Any, Callable, Union, cast
 
 from slack_sdk.models import JsonObject
@@ -11,7 +12,7 @@ from slack_sdk.socket_mode.response import SocketModeResponse
 from structlog.stdlib import get_logger
 
 from machine.clients.slack import SlackClient
-from machine.handlers.logging import create_scoped_logger
+from machine.handlers.dispatcher import Dispatcher, Job
 from machine.models.core import RegisteredActions
 from machine.plugins.command import Command
 
@@ -21,7 +22,10 @@ logger = get_logger(__name__)
 def create_slash_command_handler(
     plugin_actions: RegisteredActions,
     slack_client: SlackClient,
+    dispatcher: Dispatcher | None = None,
 ) -> Callable[[AsyncBaseSocketModeClient, SocketModeRequest], Awaitable[None]]:
+    dispatcher = dispatcher if dispatcher is not None else Dispatcher()
+
     async def handle_slash_command_request(client: AsyncBaseSocketModeClient, request: SocketModeRequest) -> None:
         if request.type == "slash_commands":
             logger.debug("slash command received", payload=request.payload)
@@ -29,33 +33,67 @@ def create_slash_command_handler(
             if request.payload["command"] in plugin_actions.command:
                 cmd = plugin_actions.command[request.payload["command"]]
                 command_obj = _gen_command(request.payload, slack_client)
-                if "logger" in cmd.function_signature.parameters:
-                    command_logger = create_scoped_logger(
-                        cmd.class_name,
-                        cmd.function.__name__,
-                        user_id=command_obj.sender.id,
-                        user_name=command_obj.sender.name,
+                plan = cmd.plan
+
+                async def prepare() -> dict[str, Any]:
+                    # With a lazy cache, the sender and channel have to be fetched before the handler can look them
+                    # up. This is done in the job, so the fetch doesn't hold up the intake of requests.
+                    await slack_client.ensure_cached(
+                        user_id=request.payload.get("user_id"), channel_id=request.payload.get("channel_id")
                     )
-                    extra_args = {"logger": command_logger}
-                else:
-                    extra_args = {}
+                    if not plan.injects_logger:
+                        return {}
+                    job.logger = plan.logger.bind(user_id=command_obj.sender.id, user_name=command_obj.sender.name)
+                    return {"logger": job.logger}
+
+                on_reject: Callable[[], Awaitable[None]] | None = None
                 # Check if the handler is a generator. In this case we have an immediate response we can send back
                 if cmd.is_generator:
-                    gen_fn = cast(Callable[..., AsyncGenerator[Union[dict, JsonObject, str], None]], cmd.function)
                     logger.debug("Slash command handler is generator, returning immediate ack")
-                    gen = gen_fn(command_obj, **extra_args)
-                    # return immediate reponse
-                    payload = await gen.__anext__()
-                    ack_response = SocketModeResponse(envelope_id=request.envelope_id, payload=payload)
-                    await client.send_socket_mode_response(ack_response)
-                    # Now run the rest of the function
-                    with contextlib.suppress(StopAsyncIteration):
-                        await gen.__anext__()
+
+                    async def run() -> None:
+                        acked = False
+                        try:
+                            gen = cast(
+                                AsyncGenerator[Union[dict, JsonObject, str], None],
+                                plan.bind(command_obj, await prepare())(),
+                            )
+                            # return immediate reponse
+                            payload = await gen.__anext__()
+                            acked = True
+                            ack_response = SocketModeResponse(envelope_id=request.envelope_id, payload=payload)
+                            await client.send_socket_mode_response(ack_response)
+                        finally:
+                            if not acked:
+                                # The handler failed or timed out before its immediate response, so acknowledge the
+                                # request without one
+                                ack_response = SocketModeResponse(envelope_id=request.envelope_id)
+                                await client.send_socket_mode_response(ack_response)
+                        # Now run the rest of the function
+                        with contextlib.suppress(StopAsyncIteration):
+                            await gen.__anext__()
+
+                    # The job acknowledges the request, so if it's rejected, the request has to be acknowledged anyway
+                    on_reject = partial(
+                        client.send_socket_mode_response, SocketModeResponse(envelope_id=request.envelope_id)
+                    )
+
                 else:
                     ack_response = SocketModeResponse(envelope_id=request.envelope_id)
                     await client.send_socket_mode_response(ack_response)
-                    fn = cast(Callable[..., Awaitable[None]], cmd.function)
-                    await fn(command_obj, **extra_args)
+
+                    async def run() -> None:
+                        await plan.bind(command_obj, await prepare())()
+
+                job = Job(
+                    fn=run,
+                    name=plan.name,
+                    lane="interactive",
+                    timeout=cmd.timeout,
+                    logger=plan.logger,
+                    on_reject=on_reject,
+                )
+                await dispatcher.dispatch([job])
 
     return handle_slash_command_request
 
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Any, Callable
+
+from slack_sdk.socket_mode.request import SocketModeRequest
+from structlog.stdlib import get_logger
+
+from machine.storage import MachineBaseStorage
+
+logger = get_logger(__name__)
+
+STORAGE_KEY_PREFIX = "machine.deduplication"
+
+
+class RequestDeduplicator:
+    """Detects Socket Mode requests that Slack delivers more than once
+
+    Slack redelivers requests when the bot is slow to acknowledge them or when it reconnects. A request is considered a
+    duplicate when its envelope id, or (for Events API requests) the event it contains, has been seen before. Events
+    are identified by their type and their `client_msg_id`, or `event_ts` if they don't have a `client_msg_id`.
+
+    Seen keys are kept in memory for `ttl` seconds, with at most `max_size` keys. When the limit is reached, the
+    oldest keys are evicted first. If a storage backend is provided, keys are also stored there, so several instances
+    of the bot sharing the same storage can deduplicate against each other. Keys are stored with a single
+    set-if-absent per key, which is atomic for the Redis, SQLite, DynamoDB and memory backends.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10_000,
+        ttl: float = 600,
+        storage: MachineBaseStorage | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_size < 1:
+            raise ValueError("Maximum size must be at least 1")
+        if ttl <= 0:
+            raise ValueError("TTL must be a positive number of seconds")
+        self._max_size = max_size
+        self._ttl = ttl
+        self._storage = storage
+        self._clock = clock
+        self._seen: OrderedDict[str, float] = OrderedDict()
+
+    async def is_duplicate(self, request: SocketModeRequest, shared: bool = True) -> bool:
+        """Check if a request was seen before, and remember it
+
+        Args:
+            request: incoming Socket Mode request
+            shared: whether to also check the storage backend, if there is one
+
+        Returns:
+            `True` if the request (or the event it contains) was seen before, `False` otherwise
+        """
+        keys = request_keys(request)
+        # All keys are remembered, so a redelivery is recognized by any of them
+        duplicate = False
+        for key in keys:
+            duplicate = self._check_and_remember(key) or duplicate
+        if duplicate or self._storage is None or not shared:
+            return duplicate
+        return await self._check_and_remember_shared(self._storage, keys)
+
+    def _check_and_remember(self, key: str) -> bool:
+        now = self._clock()
+        # Keys are never refreshed, so they are ordered by expiry
+        while self._seen and next(iter(self._seen.values())) <= now:
+            self._seen.popitem(last=False)
+        if key in self._seen:
+            return True
+        self._seen[key] = now + self._ttl
+        if len(self._seen) > self._max_size:
+            self._seen.popitem(last=False)
+        return False
+
+    async def _check_and_remember_shared(self, storage: MachineBaseStorage, keys: list[str]) -> bool:
+        storage_keys = [f"{STORAGE_KEY_PREFIX}:{key}" for key in keys]
+        try:
+            stored = await asyncio.gather(
+                *(storage.set_if_absent(storage_key, b"1", expires=int(self._ttl)) for storage_key in storage_keys)
+            )
+            return not all(stored)
+        except Exception:
+            # Better to process a request twice than not at all
+            logger.exception("Error while checking for duplicate request in storage")
+        return False
+
+
+def request_keys(request: SocketModeRequest) -> list[str]:
+    """Generate the keys that identify a Socket Mode request for deduplication
+
+    Args:
+        request: incoming Socket Mode request
+
+    Returns:
+        key for the envelope, and for the event if the request is an Events API request
+    """
+    keys = [f"envelope:{request.envelope_id}"]
+    if request.type == "events_api":
+        event = request.payload.get("event", {})
+        event_id = event.get("client_msg_id") or event.get("event_ts")
+        if event_id:
+            keys.append(f"event:{event.get('type')}:{event_id}")
+    return keys
+
+
+def create_deduplicator(settings: Mapping[str, Any], storage: MachineBaseStorage) -> RequestDeduplicator | None:
+    """Create the request deduplicator configured in the settings
+
+    Uses the `DEDUPLICATE_REQUESTS`, `DEDUPLICATION_MAX_SIZE`, `DEDUPLICATION_TTL` and `DEDUPLICATION_SHARED`
+    settings. Returns `None` if deduplication is disabled.
+    """
+    if not settings.get("DEDUPLICATE_REQUESTS", True):
+        return None
+    return RequestDeduplicator(
+        max_size=int(settings.get("DEDUPLICATION_MAX_SIZE", 10_000)),
+        ttl=float(settings.get("DEDUPLICATION_TTL", 600)),
+        storage=storage if settings.get("DEDUPLICATION_SHARED", False) else None,
+    )
@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Mapping
+from dataclasses import dataclass
+from typing import Any, Callable, Literal, cast
+
+from structlog.stdlib import BoundLogger, get_logger
+
+logger = get_logger(__name__)
+
+OverflowPolicy = Literal["block", "drop_oldest", "shed_listen_to"]
+OVERFLOW_POLICIES: tuple[OverflowPolicy, ...] = ("block", "drop_oldest", "shed_listen_to")
+Lane = Literal["events", "interactive"]
+
+
+@dataclass
+class Job:
+    """A single invocation of a plugin handler
+
+    Attributes:
+        fn: callable that creates the coroutine to run. The coroutine is only created when the job is started, so
+            jobs that are never run (because they were dropped) don't leave behind un-awaited coroutines.
+        name: fully qualified name of the handler, used for logging
+        sheddable: whether the job can be shed when the queue is full and the overflow policy is `shed_listen_to`.
+            This is the case for message handlers triggered by messages that weren't addressed to the bot.
+        lane: `interactive` for handlers of slash commands and interactive payloads, which Slack expects to be
+            acknowledged within 3 seconds, `events` for everything else
+        timeout: maximum number of seconds the job is allowed to run, after which it is cancelled. If `None`, the
+            default timeout of the dispatcher applies
+        logger: scoped logger of the handler, used to log timeouts
+        on_reject: called instead of `fn` when the job is rejected, because its queue is full and too many jobs are
+            waiting for room in it. Jobs that acknowledge their request themselves use this to acknowledge it anyway.
+    """
+
+    fn: Callable[[], Awaitable[None]]
+    name: str
+    sheddable: bool = False
+    lane: Lane = "events"
+    timeout: float | None = None
+    logger: BoundLogger | None = None
+    on_reject: Callable[[], Awaitable[None]] | None = None
+
+
+@dataclass(frozen=True)
+class DispatcherStats:
+    """Snapshot of the state of a dispatcher
+
+    Attributes:
+        queue_depth: number of jobs in the events lane waiting for a worker
+        queue_capacity: maximum number of jobs that can wait for a worker in each lane, 0 if jobs are not queued
+        waiting: number of jobs (of both lanes) waiting for room in a full queue
+        workers: number of workers of the events lane, 0 if jobs are run inline
+        busy_workers: number of workers (of both lanes) that are currently running a job
+        interactive_queue_depth: number of jobs in the interactive lane waiting for a worker
+        interactive_workers: number of workers of the interactive lane, 0 if jobs are run inline
+        processed: number of jobs that have finished running
+        dropped: number of queued jobs that were dropped to make room for new jobs
+        shed: number of new jobs that were shed because the queue was full
+        rejected: number of new jobs that were rejected because the queue was full and too many jobs were already
+            waiting for room in it
+        timed_out: number of jobs that were cancelled because they exceeded their timeout
+    """
+
+    queue_depth: int
+    queue_capacity: int
+    waiting: int
+    workers: int
+    busy_workers: int
+    interactive_queue_depth: int
+    interactive_workers: int
+    processed: int
+    dropped: int
+    shed: int
+    rejected: int
+    timed_out: int
+
+
+class Dispatcher:
+    """Runs plugin handlers inline
+
+    Handlers triggered by the same request run concurrently, and the request listener waits until all of them have
+    finished. This is the default dispatcher.
+
+    Jobs that run longer than their timeout (or the default timeout, if the job doesn't have one) are cancelled.
+    """
+
+    def __init__(self, default_timeout: float | None = None) -> None:
+        if default_timeout is not None and default_timeout <= 0:
+            raise ValueError("Default timeout must be a positive number of seconds")
+        self._default_timeout = default_timeout
+        self._processed = 0
+        self._timed_out = 0
+
+    async def start(self) -> None:  # noqa: B027 (no-op by design)
+        """Start the dispatcher"""
+        pass
+
+    async def close(self) -> None:  # noqa: B027 (no-op by design)
+        """Stop the dispatcher"""
+        pass
+
+    async def dispatch(self, jobs: list[Job]) -> None:
+        """Run jobs
+
+        Args:
+            jobs: jobs to run
+        """
+        await asyncio.gather(*[self._run(job) for job in jobs])
+
+    async def _run(self, job: Job) -> None:
+        timeout = job.timeout if job.timeout is not None else self._default_timeout
+        try:
+            if timeout is None:
+                await job.fn()
+            else:
+                await asyncio.wait_for(job.fn(), timeout)
+        except asyncio.TimeoutError:
+            self._timed_out += 1
+            job_logger = job.logger if job.logger is not None else get_logger(job.name)
+            job_logger.warning("Handler exceeded its timeout and was cancelled", timeout=timeout)
+        finally:
+            self._processed += 1
+
+    def stats(self) -> DispatcherStats:
+        """Get a snapshot of the state of the dispatcher
+
+        Returns:
+            queue depth and job counters
+        """
+        return DispatcherStats(
+            queue_depth=0,
+            queue_capacity=0,
+            waiting=0,
+            workers=0,
+            busy_workers=0,
+            interactive_queue_depth=0,
+            interactive_workers=0,
+            processed=self._processed,
+            dropped=0,
+            shed=0,
+            rejected=0,
+            timed_out=self._timed_out,
+        )
+
+
+class WorkerPoolDispatcher(Dispatcher):
+    """Runs plugin handlers on a fixed pool of workers
+
+    Jobs are put on a bounded queue, from which a fixed number of workers pick them up. This way the request listener
+    can return as soon as the jobs are queued, and the number of handlers running at the same time is limited. When
+    the queue is full, the overflow policy determines what happens:
+
+    - `block`: wait until there's room in the queue
+    - `drop_oldest`: drop the job that has been waiting the longest to make room
+    - `shed_listen_to`: drop new jobs for messages that weren't addressed to the bot, wait for room otherwise
+
+    Waiting doesn't slow down the intake of requests, because every request is handled in its own task. To keep memory
+    bounded, at most `max_waiting` jobs per lane can wait for room in a full queue. New jobs beyond that are rejected,
+    and their `on_reject` callback is called instead.
+
+    Jobs in the interactive lane (slash commands and interactive payloads) have their own queue and workers, so they
+    don't have to wait for a backlog of message handlers. Workers of the events lane also pick up waiting interactive
+    jobs before their own jobs. Interactive jobs are never dropped or shed, they are only rejected when too many of them
+    are waiting for room in their queue.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        max_queue_size: int,
+        overflow_policy: OverflowPolicy = "block",
+        interactive_workers: int | None = None,
+        default_timeout: float | None = None,
+        max_waiting: int | None = None,
+    ):
+        super().__init__(default_timeout)
+        if workers < 1:
+            raise ValueError("Number of workers must be at least 1")
+        if interactive_workers is not None and interactive_workers < 1:
+            raise ValueError("Number of interactive workers must be at least 1")
+        if max_queue_size < 1:
+            raise ValueError("Maximum queue size must be at least 1")
+        if max_waiting is not None and max_waiting < 0:
+            raise ValueError("Maximum number of waiting jobs can't be negative")
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Overflow policy must be one of: {', '.join(OVERFLOW_POLICIES)}")
+        self._workers = workers
+        self._interactive_workers = interactive_workers if interactive_workers is not None else workers
+        self._max_queue_size = max_queue_size
+        self._overflow_policy = overflow_policy
+        self._max_waiting = max_waiting if max_waiting is not None else max_queue_size
+        self._queue: asyncio.Queue[Job] | None = None
+        self._interactive_queue: asyncio.Queue[Job] | None = None
+        self._worker_tasks: list[asyncio.Task[None]] = []
+        self._busy_workers = 0
+        self._dropped = 0
+        self._shed = 0
+        self._rejected = 0
+        self._waiting: dict[Lane, int] = {"events": 0, "interactive": 0}
+
+    async def start(self) -> None:
+        # The queues are created here, so they're bound to the running event loop
+        self._queue = asyncio.Queue(maxsize=self._max_queue_size)
+        self._interactive_queue = asyncio.Queue(maxsize=self._max_queue_size)
+        self._worker_tasks = [
+            *(asyncio.create_task(self._work(self._queue, self._interactive_queue)) for _ in range(self._workers)),
+            *(
+                asyncio.create_task(self._work(self._interactive_queue, self._interactive_queue))
+                for _ in range(self._interactive_workers)
+            ),
+        ]
+        logger.info(
+            "Started dispatcher",
+            workers=self._workers,
+            interactive_workers=self._interactive_workers,
+            max_queue_size=self._max_queue_size,
+        )
+
+    async def close(self) -> None:
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    async def dispatch(self, jobs: list[Job]) -> None:
+        """Queue jobs to be run by the workers
+
+        Args:
+            jobs: jobs to run
+        """
+        if self._queue is None or self._interactive_queue is None:
+            raise RuntimeError("Dispatcher has not been started")
+        for job in jobs:
+            if job.lane == "interactive":
+                await self._enqueue(self._interactive_queue, job, "block")
+            else:
+                await self._enqueue(self._queue, job, self._overflow_policy)
+
+    async def _enqueue(self, queue: asyncio.Queue[Job], job: Job, overflow_policy: OverflowPolicy) -> None:
+        if not queue.full():
+            queue.put_nowait(job)
+            return
+        if overflow_policy == "drop_oldest":
+            dropped = queue.get_nowait()
+            queue.task_done()
+            self._dropped += 1
+            logger.warning("Dispatcher queue full, dropped oldest job", job=dropped.name, stats=self.stats())
+            queue.put_nowait(job)
+            return
+        if overflow_policy == "shed_listen_to" and job.sheddable:
+            self._shed += 1
+            logger.warning("Dispatcher queue full, shed job", job=job.name, stats=self.stats())
+            return
+        if self._waiting[job.lane] >= self._max_waiting:
+            self._rejected += 1
+            logger.warning(
+                "Dispatcher queue full and too many jobs waiting, rejected job", job=job.name, stats=self.stats()
+            )
+            if job.on_reject is not None:
+                try:
+                    await job.on_reject()
+                except Exception:
+                    logger.exception("Error while handling rejected job", job=job.name)
+            return
+        self._waiting[job.lane] += 1
+        try:
+            await queue.put(job)
+        finally:
+            self._waiting[job.lane] -= 1
+
+    async def _work(self, queue: asyncio.Queue[Job], priority_queue: asyncio.Queue[Job]) -> None:
+        while True:
+            source = priority_queue if not priority_queue.empty() else queue
+            job = await source.get()
+            self._busy_workers += 1
+            try:
+                await self._run(job)
+            except Exception:
+                logger.exception("Error while running handler", job=job.name)
+            finally:
+                self._busy_workers -= 1
+                source.task_done()
+
+    def stats(self) -> DispatcherStats:
+        return DispatcherStats(
+            queue_depth=self._queue.qsize() if self._queue is not None else 0,
+            queue_capacity=self._max_queue_size,
+            waiting=sum(self._waiting.values()),
+            workers=self._workers,
+            busy_workers=self._busy_workers,
+            interactive_queue_depth=self._interactive_queue.qsize() if self._interactive_queue is not None else 0,
+            interactive_workers=self._interactive_workers,
+            processed=self._processed,
+            dropped=self._dropped,
+            shed=self._shed,
+            rejected=self._rejected,
+            timed_out=self._timed_out,
+        )
+
+
+def create_dispatcher(settings: Mapping[str, Any]) -> Dispatcher:
+    """Create the dispatcher configured in the settings
+
+    Uses the `EVENT_WORKERS`, `EVENT_QUEUE_SIZE`, `EVENT_MAX_WAITING`, `EVENT_OVERFLOW_POLICY`, `INTERACTIVE_WORKERS`
+    and `HANDLER_TIMEOUT` settings. If `EVENT_WORKERS` is not set, handlers are run inline.
+    """
+    handler_timeout = settings.get("HANDLER_TIMEOUT")
+    default_timeout = float(handler_timeout) if handler_timeout else None
+    workers = settings.get("EVENT_WORKERS")
+    if not workers:
+        return Dispatcher(default_timeout)
+    interactive_workers = settings.get("INTERACTIVE_WORKERS")
+    max_waiting = settings.get("EVENT_MAX_WAITING")
+    return WorkerPoolDispatcher(
+        workers=int(workers),
+        max_queue_size=int(settings.get("EVENT_QUEUE_SIZE", 1000)),
+        overflow_policy=cast(OverflowPolicy, settings.get("EVENT_OVERFLOW_POLICY", "block")),
+        interactive_workers=int(interactive_workers) if interactive_workers else None,
+        default_timeout=default_timeout,
+        max_waiting=int(max_waiting) if max_waiting is not None else None,
+    )
@@ -1,14 +1,12 @@
 from __future__ import annotations
 
-import asyncio
 from collections.abc import Awaitable
+from functools import partial
 from typing import Any, Callable
 
-from slack_sdk.socket_mode.async_client import AsyncBaseSocketModeClient
-from slack_sdk.socket_mode.request import SocketModeRequest
-from slack_sdk.socket_mode.response import SocketModeResponse
 from structlog.stdlib import get_logger
 
+from machine.handlers.dispatcher import Dispatcher, Job
 from machine.models.core import RegisteredActions
 
 logger = get_logger(__name__)
@@ -16,25 +14,21 @@ logger = get_logger(__name__)
 
 def create_generic_event_handler(
     plugin_actions: RegisteredActions,
-) -> Callable[[AsyncBaseSocketModeClient, SocketModeRequest], Awaitable[None]]:
-    async def handle_event_request(client: AsyncBaseSocketModeClient, request: SocketModeRequest) -> None:
-        if request.type == "events_api":
-            # Acknowledge the request anyway
-            response = SocketModeResponse(envelope_id=request.envelope_id)
-            # Don't forget having await for method calls
-            await client.send_socket_mode_response(response)
+    dispatcher: Dispatcher | None = None,
+) -> Callable[[dict[str, Any]], Awaitable[None]]:
+    dispatcher = dispatcher if dispatcher is not None else Dispatcher()
 
-            # only process message events
-            if request.payload["event"]["type"] in plugin_actions.process:
-                await dispatch_event_handlers(
-                    request.payload["event"], list(plugin_actions.process[request.payload["event"]["type"]].values())
-                )
+    async def handle_event(event: dict[str, Any]) -> None:
+        if event["type"] in plugin_actions.process:
+            await dispatch_event_handlers(event, list(plugin_actions.process[event["type"]].values()), dispatcher)
 
-    return handle_event_request
+    return handle_event
 
 
 async def dispatch_event_handlers(
-    event: dict[str, Any], event_handlers: list[Callable[[dict[str, Any]], Awaitable[None]]]
+    event: dict[str, Any],
+    event_handlers: list[Callable[[dict[str, Any]], Awaitable[None]]],
+    dispatcher: Dispatcher | None = None,
 ) -> None:
-    handler_funcs = [f(event) for f in event_handlers]
-    await asyncio.gather(*handler_funcs)
+    jobs = [Job(fn=partial(f, event), name=getattr(f, "__qualname__", repr(f))) for f in event_handlers]
+    await (dispatcher if dispatcher is not None else Dispatcher()).dispatch(jobs)
@@ -1,10 +1,9 @@
 from __future__ import annotations
 
-import asyncio
 import contextlib
-import re
 from collections.abc import AsyncGenerator, Awaitable
-from typing import Callable, Union, cast
+from functools import partial
+from typing import Any, Callable, Union, cast
 
 from slack_sdk.models.views import View
 from slack_sdk.socket_mode.async_client import AsyncBaseSocketModeClient
@@ -13,8 +12,8 @@ from slack_sdk.socket_mode.response import SocketModeResponse
 from structlog.stdlib import get_logger
 
 from machine.clients.slack import SlackClient
-from machine.handlers.logging import create_scoped_logger
-from machine.models.core import RegisteredActions
+from machine.handlers.dispatcher import Dispatcher, Job
+from machine.models.core import BlockActionHandler, ModalHandler, RegisteredActions
 from machine.models.interactive import (
     Action,
     BlockActionsPayload,
@@ -31,23 +30,34 @@ logger = get_logger(__name__)
 def create_interactive_handler(
     plugin_actions: RegisteredActions,
     slack_client: SlackClient,
+    dispatcher: Dispatcher | None = None,
 ) -> Callable[[AsyncBaseSocketModeClient, SocketModeRequest], Awaitable[None]]:
+    dispatcher = dispatcher if dispatcher is not None else Dispatcher()
+
     async def handle_interactive_request(client: AsyncBaseSocketModeClient, request: SocketModeRequest) -> None:
         if request.type == "interactive":
             logger.debug("interactive trigger received", payload=request.payload)
+            if not _has_consumers(plugin_actions, request.payload):
+                # No handler is interested in this payload, so there's no need to parse it
+                logger.debug("no handlers for interactive trigger, ignoring")
+                response = SocketModeResponse(envelope_id=request.envelope_id)
+                await client.send_socket_mode_response(response)
+                return
             parsed_payload = InteractivePayload.validate_python(request.payload)
             if parsed_payload.type == "block_actions":
                 # Acknowledge the request
                 response = SocketModeResponse(envelope_id=request.envelope_id)
                 await client.send_socket_mode_response(response)
-                await handle_block_actions(parsed_payload, plugin_actions, slack_client)
+                await handle_block_actions(parsed_payload, plugin_actions, slack_client, dispatcher)
             if parsed_payload.type == "view_submission":
-                await handle_view_submission(parsed_payload, request.envelope_id, client, plugin_actions, slack_client)
+                await handle_view_submission(
+                    parsed_payload, request.envelope_id, client, plugin_actions, slack_client, dispatcher
+                )
             if parsed_payload.type == "view_closed":
                 # Acknowledge the request
                 response = SocketModeResponse(envelope_id=request.envelope_id)
                 await client.send_socket_mode_response(response)
-                await handle_view_closed(parsed_payload, plugin_actions, slack_client)
+                await handle_view_closed(parsed_payload, plugin_actions, slack_client, dispatcher)
 
     return handle_interactive_request
 
@@ -56,28 +66,17 @@ async def handle_block_actions(
     payload: BlockActionsPayload,
     plugin_actions: RegisteredActions,
     slack_client: SlackClient,
+    dispatcher: Dispatcher | None = None,
 ) -> None:
-    handler_funcs = []
-    for handler in plugin_actions.block_actions.values():
-        # if neither block_id matcher nor action_id matcher is present, we consider it as no match
-        # but this is asserted during the registration of the handler
-        for action in payload.actions:
-            if _matches(handler.block_id_matcher, action.block_id) and _matches(
-                handler.action_id_matcher, action.action_id
-            ):
-                block_action_obj = _gen_block_action(payload, action, slack_client)
-                if "logger" in handler.function_signature.parameters:
-                    block_action_logger = create_scoped_logger(
-                        handler.class_name,
-                        handler.function.__name__,
-                        user_id=block_action_obj.user.id,
-                        user_name=block_action_obj.user.name,
-                    )
-                    extra_args = {"logger": block_action_logger}
-                else:
-                    extra_args = {}
-                handler_funcs.append(handler.function(block_action_obj, **extra_args))
-    await asyncio.gather(*handler_funcs)
+    jobs = []
+    channel_id = payload.channel.id if payload.channel is not None else None
+    prepare = partial(slack_client.ensure_cached, user_id=payload.user.id, channel_id=channel_id)
+    for action in payload.actions:
+        for handler in plugin_actions.block_actions.matching(action.action_id, action.block_id):
+            block_action_obj = _gen_block_action(payload, action, slack_client)
+            extra_args = _extra_args(handler, block_action_obj.user.id, block_action_obj.user.name)
+            jobs.append(_create_job(handler, handler.plan.bind(block_action_obj, extra_args), extra_args, prepare))
+    await _dispatch(jobs, dispatcher)
 
 
 async def handle_view_submission(
@@ -86,70 +85,132 @@ async def handle_view_submission(
     socket_mode_client: AsyncBaseSocketModeClient,
     plugin_actions: RegisteredActions,
     slack_client: SlackClient,
+    dispatcher: Dispatcher | None = None,
 ) -> None:
-    handler_funcs = []
+    jobs = []
     modal_submission_obj = _gen_modal_submission(payload, slack_client)
-    for handler in plugin_actions.modal.values():
-        if _matches(handler.callback_id_matcher, payload.view.callback_id):
-            if "logger" in handler.function_signature.parameters:
-                view_submission_logger = create_scoped_logger(
-                    handler.class_name,
-                    handler.function.__name__,
-                    user_id=payload.user.id,
-                    user_name=payload.user.name,
+    prepare = partial(slack_client.ensure_cached, user_id=payload.user.id)
+    for handler in plugin_actions.modal.matching(payload.view.callback_id):
+        extra_args = _extra_args(handler, payload.user.id, payload.user.name)
+        # Check if the handler is a generator. In this case we have an immediate response we can send back
+        if handler.is_generator:
+            gen_fn = cast(
+                Callable[[], AsyncGenerator[Union[dict, View], None]],
+                handler.plan.bind(modal_submission_obj, extra_args),
+            )
+            logger.debug("Modal submission handler is generator, returning immediate ack")
+            jobs.append(
+                _create_job(
+                    handler,
+                    partial(
+                        _run_generator_modal_handler,
+                        gen_fn,
+                        envelope_id,
+                        socket_mode_client,
+                        prepare,
+                    ),
+                    extra_args,
+                    # The job acknowledges the submission, so if it's rejected, it has to be acknowledged anyway
+                    on_reject=partial(
+                        socket_mode_client.send_socket_mode_response, SocketModeResponse(envelope_id=envelope_id)
+                    ),
                 )
-                extra_args = {"logger": view_submission_logger}
-            else:
-                extra_args = {}
-            # Check if the handler is a generator. In this case we have an immediate response we can send back
-            if handler.is_generator:
-                gen_fn = cast(Callable[..., AsyncGenerator[Union[dict, View], None]], handler.function)
-                logger.debug("Modal submission handler is generator, returning immediate ack")
-                gen = gen_fn(modal_submission_obj, **extra_args)
-                # return immediate reponse
-                response = await gen.__anext__()
-                ack_response = SocketModeResponse(envelope_id=envelope_id, payload=response)
-                await socket_mode_client.send_socket_mode_response(ack_response)
-                # Now run the rest of the function
-                with contextlib.suppress(StopAsyncIteration):
-                    await gen.__anext__()
-            else:
-                logger.debug("Modal submission is regular async function")
-                ack_response = SocketModeResponse(envelope_id=envelope_id)
-                await socket_mode_client.send_socket_mode_response(ack_response)
-                handler_funcs.append(handler.function(modal_submission_obj, **extra_args))
-    await asyncio.gather(*handler_funcs)
+            )
+        else:
+            logger.debug("Modal submission is regular async function")
+            ack_response = SocketModeResponse(envelope_id=envelope_id)
+            await socket_mode_client.send_socket_mode_response(ack_response)
+            jobs.append(_create_job(handler, handler.plan.bind(modal_submission_obj, extra_args), extra_args, prepare))
+    await _dispatch(jobs, dispatcher)
+
+
+async def _run_generator_modal_handler(
+    gen_fn: Callable[[], AsyncGenerator[Union[dict, View], None]],
+    envelope_id: str,
+    socket_mode_client: AsyncBaseSocketModeClient,
+    prepare: Callable[[], Awaitable[None]],
+) -> None:
+    acked = False
+    try:
+        await prepare()
+        gen = gen_fn()
+        # return immediate reponse
+        response = await gen.__anext__()
+        acked = True
+        ack_response = SocketModeResponse(envelope_id=envelope_id, payload=response)
+        await socket_mode_client.send_socket_mode_response(ack_response)
+    finally:
+        if not acked:
+            # The handler failed or timed out before its immediate response, so acknowledge the submission without one
+            await socket_mode_client.send_socket_mode_response(SocketModeResponse(envelope_id=envelope_id))
+    # Now run the rest of the function
+    with contextlib.suppress(StopAsyncIteration):
+        await gen.__anext__()
 
 
 async def handle_view_closed(
     payload: ViewClosedPayload,
     plugin_actions: RegisteredActions,
     slack_client: SlackClient,
+    dispatcher: Dispatcher | None = None,
 ) -> None:
-    handler_funcs = []
+    jobs = []
     modal_submission_obj = _gen_modal_closure(payload, slack_client)
-    for handler in plugin_actions.modal_closed.values():
-        if _matches(handler.callback_id_matcher, payload.view.callback_id):
-            if "logger" in handler.function_signature.parameters:
-                view_closure_logger = create_scoped_logger(
-                    handler.class_name,
-                    handler.function.__name__,
-                    user_id=payload.user.id,
-                    user_name=payload.user.name,
-                )
-                extra_args = {"logger": view_closure_logger}
-            else:
-                extra_args = {}
-            handler_funcs.append(handler.function(modal_submission_obj, **extra_args))
-    await asyncio.gather(*handler_funcs)
-
-
-def _matches(matcher: Union[re.Pattern[str], str, None], input_: str) -> bool:
-    if matcher is None:
-        return True
-    if isinstance(matcher, re.Pattern):
-        return matcher.match(input_) is not None
-    return matcher == input_
+    prepare = partial(slack_client.ensure_cached, user_id=payload.user.id)
+    for handler in plugin_actions.modal_closed.matching(payload.view.callback_id):
+        extra_args = _extra_args(handler, payload.user.id, payload.user.name)
+        jobs.append(_create_job(handler, handler.plan.bind(modal_submission_obj, extra_args), extra_args, prepare))
+    await _dispatch(jobs, dispatcher)
+
+
+def _extra_args(handler: BlockActionHandler | ModalHandler, user_id: str, user_name: str) -> dict[str, Any]:
+    if handler.plan.injects_logger:
+        return {"logger": handler.plan.logger.bind(user_id=user_id, user_name=user_name)}
+    return {}
+
+
+def _create_job(
+    handler: BlockActionHandler | ModalHandler,
+    fn: Callable[[], Awaitable[None]],
+    extra_args: dict[str, Any],
+    prepare: Callable[[], Awaitable[None]] | None = None,
+    on_reject: Callable[[], Awaitable[None]] | None = None,
+) -> Job:
+    async def run() -> None:
+        # With a lazy cache, the user and channel have to be fetched before the handler can look them up. This is done
+        # in the job, so the fetch doesn't delay the acknowledgement or hold up the intake of requests.
+        if prepare is not None:
+            await prepare()
+        await fn()
+
+    return Job(
+        fn=run,
+        name=handler.plan.name,
+        lane="interactive",
+        timeout=handler.timeout,
+        logger=extra_args.get("logger", handler.plan.logger),
+        on_reject=on_reject,
+    )
+
+
+async def _dispatch(jobs: list[Job], dispatcher: Dispatcher | None) -> None:
+    if jobs:
+        await (dispatcher if dispatcher is not None else Dispatcher()).dispatch(jobs)
+
+
+def _has_consumers(plugin_actions: RegisteredActions, payload: dict[str, Any]) -> bool:
+    payload_type = payload.get("type")
+    if payload_type == "block_actions":
+        actions = payload.get("actions", [])
+        return any(
+            plugin_actions.block_actions.matching(action.get("action_id", ""), action.get("block_id", ""))
+            for action in actions
+        )
+    if payload_type == "view_submission" or payload_type == "view_closed":
+        handlers = plugin_actions.modal if payload_type == "view_submission" else plugin_actions.modal_closed
+        callback_id = payload.get("view", {}).get("callback_id", "")
+        return bool(handlers.matching(callback_id))
+    return False
 
 
 def _gen_block_action(payload: BlockActionsPayload, triggered_action: Action, slack_client: SlackClient) -> BlockAction:
@@ -1,17 +1,13 @@
 from __future__ import annotations
 
-import asyncio
 import re
 from collections.abc import Awaitable, Mapping
 from typing import Any, Callable
 
-from slack_sdk.socket_mode.async_client import AsyncBaseSocketModeClient
-from slack_sdk.socket_mode.request import SocketModeRequest
-from slack_sdk.socket_mode.response import SocketModeResponse
 from structlog.stdlib import get_logger
 
 from machine.clients.slack import SlackClient
-from machine.handlers.logging import create_scoped_logger
+from machine.handlers.dispatcher import Dispatcher, Job
 from machine.models.core import MessageHandler, RegisteredActions
 from machine.plugins.message import Message
 
@@ -24,29 +20,24 @@ def create_message_handler(
     bot_id: str,
     bot_name: str,
     slack_client: SlackClient,
-) -> Callable[[AsyncBaseSocketModeClient, SocketModeRequest], Awaitable[None]]:
+    dispatcher: Dispatcher | None = None,
+) -> Callable[[dict[str, Any]], Awaitable[None]]:
     message_matcher = generate_message_matcher(settings)
+    dispatcher = dispatcher if dispatcher is not None else Dispatcher()
+
+    async def handle_message_event(event: dict[str, Any]) -> None:
+        await handle_message(
+            event=event,
+            bot_name=bot_name,
+            bot_id=bot_id,
+            plugin_actions=plugin_actions,
+            message_matcher=message_matcher,
+            slack_client=slack_client,
+            log_handled_message=settings["LOG_HANDLED_MESSAGES"],
+            dispatcher=dispatcher,
+        )
 
-    async def handle_message_request(client: AsyncBaseSocketModeClient, request: SocketModeRequest) -> None:
-        if request.type == "events_api":
-            # Acknowledge the request anyway
-            response = SocketModeResponse(envelope_id=request.envelope_id)
-            # Don't forget having await for method calls
-            await client.send_socket_mode_response(response)
-
-            # only process message events
-            if request.payload["event"]["type"] == "message":
-                await handle_message(
-                    event=request.payload["event"],
-                    bot_name=bot_name,
-                    bot_id=bot_id,
-                    plugin_actions=plugin_actions,
-                    message_matcher=message_matcher,
-                    slack_client=slack_client,
-                    log_handled_message=settings["LOG_HANDLED_MESSAGES"],
-                )
-
-    return handle_message_request
+    return handle_message_event
 
 
 def generate_message_matcher(settings: Mapping) -> re.Pattern[str]:
@@ -69,6 +60,7 @@ async def handle_message(
     message_matcher: re.Pattern,
     slack_client: SlackClient,
     log_handled_message: bool,
+    dispatcher: Dispatcher | None = None,
 ) -> None:
     # Handle message subtype 'message_changed' to allow the bot to respond to edits
     if "subtype" in event and event["subtype"] == "message_changed":
@@ -79,18 +71,21 @@ async def handle_message(
         event["channel"] = channel
         event["subtype"] = "message_changed"
     if "user" in event and event["user"] != bot_id:
-        listeners = list(plugin_actions.listen_to.values())
         respond_to_msg = _check_bot_mention(
             event,
             bot_name,
             bot_id,
             message_matcher,
         )
+        # Only handlers that can possibly match the text are considered, see MessageHandlerIndex
         if respond_to_msg:
-            listeners += list(plugin_actions.respond_to.values())
-            await dispatch_listeners(respond_to_msg, listeners, slack_client, log_handled_message)
+            text = respond_to_msg.get("text", "")
+            listeners = plugin_actions.listen_to.candidates(text) + plugin_actions.respond_to.candidates(text)
+            await dispatch_listeners(respond_to_msg, listeners, slack_client, log_handled_message, dispatcher)
         else:
-            await dispatch_listeners(event, listeners, slack_client, log_handled_message)
+            listeners = plugin_actions.listen_to.candidates(event.get("text", ""))
+            # Messages that aren't addressed to the bot can be shed under load
+            await dispatch_listeners(event, listeners, slack_client, log_handled_message, dispatcher, sheddable=True)
 
 
 def _check_bot_mention(
@@ -129,25 +124,65 @@ def _gen_message(event: dict[str, Any], slack_client: SlackClient) -> Message:
     return Message(slack_client, event)
 
 
+def _create_listener_job(
+    handler: MessageHandler,
+    match: re.Match[str],
+    message: Message,
+    event: dict[str, Any],
+    slack_client: SlackClient,
+    log_handled_message: bool,
+    sheddable: bool,
+) -> Job:
+    plan = handler.plan
+    extra_params = match.groupdict()
+
+    async def run() -> None:
+        # With a lazy cache, the sender and channel have to be fetched before handlers can look them up. This is done
+        # in the job, so fetching them doesn't hold up the intake of events. Concurrent fetches are coalesced.
+        await slack_client.ensure_cached(user_id=event.get("user"), channel_id=event.get("channel"))
+        # Binding the scoped logger requires looking up the sender, so we only do it if the logger is used
+        if log_handled_message or plan.injects_logger:
+            handler_logger = plan.logger.bind(user_id=message.sender.id, user_name=message.sender.name)
+            job.logger = handler_logger
+            if log_handled_message:
+                handler_logger.info("Handling message", message=message.text)
+            if plan.injects_logger:
+                extra_params["logger"] = handler_logger
+        await plan.bind(message, extra_params)()
+
+    job = Job(fn=run, name=plan.name, sheddable=sheddable, timeout=handler.timeout, logger=plan.logger)
+    return job
+
+
 async def dispatch_listeners(
-    event: dict[str, Any], message_handlers: list[MessageHandler], slack_client: SlackClient, log_handled_message: bool
+    event: dict[str, Any],
+    message_handlers: list[MessageHandler],
+    slack_client: SlackClient,
+    log_handled_message: bool,
+    dispatcher: Dispatcher | None = None,
+    sheddable: bool = False,
 ) -> None:
-    handler_funcs = []
+    jobs = []
+    # The message is only created if there's at least one match. All matching handlers of a plugin share the same
+    # message, handlers of other plugins get their own copy, so their coalesced replies aren't merged.
+    message: Message | None = None
+    plugin_messages: dict[str, Message] = {}
+    is_message_changed = event.get("subtype") == "message_changed"
+    text = event.get("text", "")
     for handler in message_handlers:
-        matcher = handler.regex
-        if "subtype" in event and event["subtype"] == "message_changed" and not handler.handle_message_changed:
+        if is_message_changed and not handler.handle_message_changed:
             continue
-        match = matcher.search(event.get("text", ""))
+        match = handler.regex.search(text)
         if match:
-            message = _gen_message(event, slack_client)
-            extra_params = {**match.groupdict()}
-            handler_logger = create_scoped_logger(
-                handler.class_name, handler.function.__name__, user_id=message.sender.id, user_name=message.sender.name
+            if message is None:
+                message = _gen_message(event, slack_client)
+            plugin_message = plugin_messages.get(handler.class_name)
+            if plugin_message is None:
+                plugin_message = plugin_messages[handler.class_name] = message._for_source(handler.class_name)
+            jobs.append(
+                _create_listener_job(
+                    handler, match, plugin_message, event, slack_client, log_handled_message, sheddable
+                )
             )
-            if log_handled_message:
-                handler_logger.info("Handling message", message=message.text)
-            if "logger" in handler.function_signature.parameters:
-                extra_params["logger"] = handler_logger
-            handler_funcs.append(handler.function(message, **extra_params))
-    await asyncio.gather(*handler_funcs)
-    return
+    if jobs:
+        await (dispatcher if dispatcher is not None else Dispatcher()).dispatch(jobs)
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from collections.abc import Awaitable, Mapping
+from typing import Any, Callable
+
+from slack_sdk.socket_mode.async_client import AsyncBaseSocketModeClient
+from slack_sdk.socket_mode.request import SocketModeRequest
+from slack_sdk.socket_mode.response import SocketModeResponse
+from structlog.stdlib import get_logger
+
+from machine.clients.slack import SlackClient
+from machine.handlers.command_handler import create_slash_command_handler
+from machine.handlers.deduplication import RequestDeduplicator
+from machine.handlers.dispatcher import Dispatcher
+from machine.handlers.event_handler import create_generic_event_handler
+from machine.handlers.interactive_handler import create_interactive_handler
+from machine.handlers.logging import log_request
+from machine.handlers.message_handler import create_message_handler
+from machine.models.core import RegisteredActions
+
+logger = get_logger(__name__)
+
+EventHandler = Callable[[dict[str, Any]], Awaitable[None]]
+RequestHandler = Callable[[AsyncBaseSocketModeClient, SocketModeRequest], Awaitable[None]]
+
+
+def create_request_router(
+    plugin_actions: RegisteredActions,
+    settings: Mapping,
+    bot_id: str,
+    bot_name: str,
+    slack_client: SlackClient,
+    dispatcher: Dispatcher | None = None,
+    deduplicator: RequestDeduplicator | None = None,
+) -> RequestHandler:
+    """Create the single Socket Mode request listener of Slack Machine
+
+    The router acknowledges every Events API envelope exactly once, as soon as it is received, and then dispatches the
+    event only to the subsystems that are interested in its type. Events that no subsystem is interested in are
+    dropped right after acknowledging them. Other request types (slash commands and interactive
+    payloads) are dispatched to their respective handlers, which take care of acknowledging the request themselves,
+    because they might have to include a response payload in the acknowledgement.
+
+    Plugin handlers are run by the dispatcher, cache updates are always applied inline. If a deduplicator is given,
+    requests that Slack redelivers are acknowledged and dropped before they reach any handler. Events API requests are
+    acknowledged before they are checked. Other requests are acknowledged by their handlers, so they are only checked
+    against the deduplicator's memory, which doesn't need a round trip to the storage backend. Slack only retries
+    Events API requests, so those are the ones that need to be checked across instances.
+    """
+    event_handlers: dict[str, list[EventHandler]] = {}
+    # Caches are updated first, so plugins processing the same event see the updated users & channels
+    for event_type in slack_client.cache_event_types:
+        event_handlers.setdefault(event_type, []).append(slack_client.handle_cache_event)
+    if plugin_actions.listen_to or plugin_actions.respond_to:
+        event_handlers.setdefault("message", []).append(
+            create_message_handler(plugin_actions, settings, bot_id, bot_name, slack_client, dispatcher)
+        )
+    generic_event_handler = create_generic_event_handler(plugin_actions, dispatcher)
+    for event_type in plugin_actions.process:
+        event_handlers.setdefault(event_type, []).append(generic_event_handler)
+
+    request_handlers: dict[str, RequestHandler] = {
+        "slash_commands": create_slash_command_handler(plugin_actions, slack_client, dispatcher),
+        "interactive": create_interactive_handler(plugin_actions, slack_client, dispatcher),
+    }
+    log_requests = settings.get("LOGLEVEL", "ERROR").upper() == "DEBUG"
+
+    async def route_request(client: AsyncBaseSocketModeClient, request: SocketModeRequest) -> None:
+        if log_requests:
+            await log_request(client, request)
+        if request.type == "events_api":
+            response = SocketModeResponse(envelope_id=request.envelope_id)
+            await client.send_socket_mode_response(response)
+            if deduplicator is not None and await deduplicator.is_duplicate(request):
+                _log_duplicate(request)
+                return
+            event = request.payload["event"]
+            for handler in event_handlers.get(event["type"], []):
+                try:
+                    await handler(event)
+                except Exception:
+                    logger.exception("Error while handling event", event_type=event["type"])
+        else:
+            if deduplicator is not None and await deduplicator.is_duplicate(request, shared=False):
+                _log_duplicate(request)
+                await client.send_socket_mode_response(SocketModeResponse(envelope_id=request.envelope_id))
+                return
+            request_handler = request_handlers.get(request.type)
+            if request_handler is not None:
+                await request_handler(client, request)
+
+    return route_request
+
+
+def _log_duplicate(request: SocketModeRequest) -> None:
+    logger.info(
+        "Dropping duplicate request",
+        envelope_id=request.envelope_id,
+        retry_attempt=request.retry_attempt,
+        retry_reason=request.retry_reason,
+    )
@@ -1,14 +1,19 @@
 from __future__ import annotations
 
 import re
-from collections.abc import AsyncGenerator, Awaitable
+from abc import ABC, abstractmethod
+from collections.abc import AsyncGenerator, Awaitable, Iterator, Mapping, MutableMapping
 from dataclasses import dataclass, field
+from functools import partial
 from inspect import Signature
-from typing import Any, Callable, Union
+from operator import itemgetter
+from typing import Any, Callable, Generic, TypeVar, Union
 
 from slack_sdk.models import JsonObject
+from structlog.stdlib import BoundLogger, get_logger
 
 from machine.plugins.base import MachineBasePlugin
+from machine.utils.regex import LiteralMatcher, fold_case, required_literal
 
 
 @dataclass
@@ -23,6 +28,48 @@ class Manual:
     robot: dict[str, list[str]]
 
 
+@dataclass(frozen=True)
+class InvocationPlan:
+    """How to invoke a plugin handler, worked out once when the handler is registered
+
+    Attributes:
+        name: fully qualified name of the handler function
+        injects_logger: whether the handler function accepts a `logger` argument
+        logger: logger of the handler, without any context bound to it
+        function: the (bound) handler function
+    """
+
+    name: str
+    injects_logger: bool
+    logger: BoundLogger
+    function: Callable[..., Any]
+
+    @classmethod
+    def create(cls, class_name: str, function: Callable[..., Any], function_signature: Signature) -> InvocationPlan:
+        name = f"{class_name}.{function.__name__}"
+        return cls(
+            name=name,
+            injects_logger="logger" in function_signature.parameters,
+            logger=get_logger(name),
+            function=function,
+        )
+
+    def bind(self, payload: Any, kwargs: dict[str, Any]) -> Callable[[], Any]:
+        """Bind the arguments of a single invocation to the handler function
+
+        Args:
+            payload: the object passed as first argument, eg. a message or command
+            kwargs: additional keyword arguments
+
+        Returns:
+            callable without arguments that invokes the handler function. For generator handlers, it returns the
+                generator.
+        """
+        if kwargs:
+            return partial(self.function, payload, **kwargs)
+        return partial(self.function, payload)
+
+
 @dataclass
 class MessageHandler:
     class_: MachineBasePlugin
@@ -31,6 +78,11 @@ class MessageHandler:
     function_signature: Signature
     regex: re.Pattern[str]
     handle_message_changed: bool
+    timeout: float | None = None
+    plan: InvocationPlan = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.plan = InvocationPlan.create(self.class_name, self.function, self.function_signature)
 
 
 @dataclass
@@ -41,6 +93,11 @@ class CommandHandler:
     function_signature: Signature
     command: str
     is_generator: bool
+    timeout: float | None = None
+    plan: InvocationPlan = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.plan = InvocationPlan.create(self.class_name, self.function, self.function_signature)
 
 
 @dataclass
@@ -51,6 +108,11 @@ class BlockActionHandler:
     function_signature: Signature
     action_id_matcher: Union[re.Pattern[str], str, None]
     block_id_matcher: Union[re.Pattern[str], str, None]
+    timeout: float | None = None
+    plan: InvocationPlan = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.plan = InvocationPlan.create(self.class_name, self.function, self.function_signature)
 
 
 @dataclass
@@ -61,17 +123,231 @@ class ModalHandler:
     function_signature: Signature
     callback_id_matcher: Union[re.Pattern[str], str]
     is_generator: bool
+    timeout: float | None = None
+    plan: InvocationPlan = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.plan = InvocationPlan.create(self.class_name, self.function, self.function_signature)
+
+
+H = TypeVar("H")
+P = TypeVar("P")
+
+
+class _HandlerIndex(MutableMapping[str, H], Generic[H, P], ABC):
+    """Base class for registered handlers that are indexed for fast lookup
+
+    Behaves like a regular dict of handlers. The index (plan) is built lazily on first lookup, and rebuilt after the
+    handlers have changed.
+    """
+
+    def __init__(self, handlers: Mapping[str, H] | None = None):
+        self._handlers: dict[str, H] = {}
+        self._plan: P | None = None
+        if handlers is not None:
+            self.update(handlers)
+
+    def __setitem__(self, key: str, handler: H) -> None:
+        self._handlers[key] = handler
+        self._plan = None
+
+    def __getitem__(self, key: str) -> H:
+        return self._handlers[key]
+
+    def __delitem__(self, key: str) -> None:
+        del self._handlers[key]
+        self._plan = None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._handlers)
+
+    def __len__(self) -> int:
+        return len(self._handlers)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._handlers!r})"
+
+    def _get_plan(self) -> P:
+        if self._plan is None:
+            self._plan = self._build_plan()
+        return self._plan
+
+    @abstractmethod
+    def _build_plan(self) -> P:
+        """Build the index for the current handlers"""
+        ...
+
+
+class MessageHandlerIndex(_HandlerIndex[MessageHandler, "_MessageHandlerIndexPlan"]):
+    """Registered message handlers, indexed by the literal text their regex requires
+
+    Behaves like a regular dict of message handlers. For every handler, the longest literal that every match of the
+    handler's regex must contain is extracted. When a message comes in, a single scan of the message text finds the
+    literals it contains, and only the handlers with those literals (and handlers without a required literal) are
+    returned as candidates. This way the full regex only has to run for handlers that can actually match.
+    """
+
+    def _build_plan(self) -> _MessageHandlerIndexPlan:
+        plan = _MessageHandlerIndexPlan()
+        for position, handler in enumerate(self._handlers.values()):
+            literal = required_literal(handler.regex)
+            if literal is None:
+                plan.unconditional.append((position, handler))
+            else:
+                group = plan.case_insensitive if literal[1] else plan.case_sensitive
+                group.setdefault(literal[0], []).append((position, handler))
+        plan.case_sensitive_matcher = LiteralMatcher(plan.case_sensitive) if plan.case_sensitive else None
+        plan.case_insensitive_matcher = LiteralMatcher(plan.case_insensitive) if plan.case_insensitive else None
+        return plan
+
+    def candidates(self, text: str) -> list[MessageHandler]:
+        """Find the handlers that might match the provided text
+
+        Args:
+            text: text of the incoming message
+
+        Returns:
+            handlers that might match the text, in order of registration
+        """
+        plan = self._get_plan()
+        candidates = list(plan.unconditional)
+        if plan.case_sensitive_matcher is not None:
+            for literal in plan.case_sensitive_matcher.search(text):
+                candidates.extend(plan.case_sensitive[literal])
+        if plan.case_insensitive_matcher is not None:
+            for literal in plan.case_insensitive_matcher.search(fold_case(text)):
+                candidates.extend(plan.case_insensitive[literal])
+        if len(candidates) > 1:
+            candidates.sort(key=itemgetter(0))
+        return [handler for _, handler in candidates]
+
+
+@dataclass
+class _MessageHandlerIndexPlan:
+    unconditional: list[tuple[int, MessageHandler]] = field(default_factory=list)
+    case_sensitive: dict[str, list[tuple[int, MessageHandler]]] = field(default_factory=dict)
+    case_insensitive: dict[str, list[tuple[int, MessageHandler]]] = field(default_factory=dict)
+    case_sensitive_matcher: LiteralMatcher | None = None
+    case_insensitive_matcher: LiteralMatcher | None = None
+
+
+class BlockActionHandlerIndex(_HandlerIndex[BlockActionHandler, "_BlockActionHandlerIndexPlan"]):
+    """Registered block action handlers, indexed by their exact action id and block id
+
+    Behaves like a regular dict of block action handlers. Handlers that only use strings to match the action id and
+    block id are looked up in a dict, only handlers that use a regex are matched one by one.
+    """
+
+    def _build_plan(self) -> _BlockActionHandlerIndexPlan:
+        plan = _BlockActionHandlerIndexPlan()
+        for position, handler in enumerate(self._handlers.values()):
+            action_id, block_id = handler.action_id_matcher, handler.block_id_matcher
+            if isinstance(action_id, re.Pattern) or isinstance(block_id, re.Pattern):
+                plan.regex.append((position, handler))
+            else:
+                plan.exact.setdefault((action_id, block_id), []).append((position, handler))
+        return plan
+
+    def matching(self, action_id: str, block_id: str) -> list[BlockActionHandler]:
+        """Find the handlers that match an action
+
+        Args:
+            action_id: action id of the incoming action
+            block_id: block id of the incoming action
+
+        Returns:
+            handlers that match the action, in order of registration
+        """
+        plan = self._get_plan()
+        matches: list[tuple[int, BlockActionHandler]] = []
+        # A missing matcher (None) matches any id
+        for key in ((action_id, block_id), (action_id, None), (None, block_id)):
+            matches.extend(plan.exact.get(key, ()))
+        for position, handler in plan.regex:
+            if _matches(handler.action_id_matcher, action_id) and _matches(handler.block_id_matcher, block_id):
+                matches.append((position, handler))
+        if len(matches) > 1:
+            matches.sort(key=itemgetter(0))
+        return [handler for _, handler in matches]
+
+
+@dataclass
+class _BlockActionHandlerIndexPlan:
+    exact: dict[tuple[str | None, str | None], list[tuple[int, BlockActionHandler]]] = field(default_factory=dict)
+    regex: list[tuple[int, BlockActionHandler]] = field(default_factory=list)
+
+
+class ModalHandlerIndex(_HandlerIndex[ModalHandler, "_ModalHandlerIndexPlan"]):
+    """Registered modal handlers, indexed by their exact callback id
+
+    Behaves like a regular dict of modal handlers. Handlers that use a string to match the callback id are looked up in
+    a dict, only handlers that use a regex are matched one by one.
+    """
+
+    def _build_plan(self) -> _ModalHandlerIndexPlan:
+        plan = _ModalHandlerIndexPlan()
+        for position, handler in enumerate(self._handlers.values()):
+            callback_id = handler.callback_id_matcher
+            if isinstance(callback_id, re.Pattern):
+                plan.regex.append((position, handler))
+            else:
+                plan.exact.setdefault(callback_id, []).append((position, handler))
+        return plan
+
+    def matching(self, callback_id: str) -> list[ModalHandler]:
+        """Find the handlers that match a modal
+
+        Args:
+            callback_id: callback id of the incoming modal
+
+        Returns:
+            handlers that match the modal, in order of registration
+        """
+        plan = self._get_plan()
+        matches = list(plan.exact.get(callback_id, ()))
+        for position, handler in plan.regex:
+            if _matches(handler.callback_id_matcher, callback_id):
+                matches.append((position, handler))
+        if len(matches) > 1:
+            matches.sort(key=itemgetter(0))
+        return [handler for _, handler in matches]
+
+
+@dataclass
+class _ModalHandlerIndexPlan:
+    exact: dict[str, list[tuple[int, ModalHandler]]] = field(default_factory=dict)
+    regex: list[tuple[int, ModalHandler]] = field(default_factory=list)
+
+
+def _matches(matcher: Union[re.Pattern[str], str, None], input_: str) -> bool:
+    if matcher is None:
+        return True
+    if isinstance(matcher, re.Pattern):
+        return matcher.match(input_) is not None
+    return matcher == input_
 
 
 @dataclass
 class RegisteredActions:
-    listen_to: dict[str, MessageHandler] = field(default_factory=dict)
-    respond_to: dict[str, MessageHandler] = field(default_factory=dict)
+    listen_to: MessageHandlerIndex = field(default_factory=MessageHandlerIndex)
+    respond_to: MessageHandlerIndex = field(default_factory=MessageHandlerIndex)
     process: dict[str, dict[str, Callable[[dict[str, Any]], Awaitable[None]]]] = field(default_factory=dict)
     command: dict[str, CommandHandler] = field(default_factory=dict)
-    block_actions: dict[str, BlockActionHandler] = field(default_factory=dict)
-    modal: dict[str, ModalHandler] = field(default_factory=dict)
-    modal_closed: dict[str, ModalHandler] = field(default_factory=dict)
+    block_actions: BlockActionHandlerIndex = field(default_factory=BlockActionHandlerIndex)
+    modal: ModalHandlerIndex = field(default_factory=ModalHandlerIndex)
+    modal_closed: ModalHandlerIndex = field(default_factory=ModalHandlerIndex)
+
+    def __post_init__(self) -> None:
+        if not isinstance(self.listen_to, MessageHandlerIndex):
+            self.listen_to = MessageHandlerIndex(self.listen_to)
+        if not isinstance(self.respond_to, MessageHandlerIndex):
+            self.respond_to = MessageHandlerIndex(self.respond_to)
+        if not isinstance(self.block_actions, BlockActionHandlerIndex):
+            self.block_actions = BlockActionHandlerIndex(self.block_actions)
+        if not isinstance(self.modal, ModalHandlerIndex):
+            self.modal = ModalHandlerIndex(self.modal)
+        if not isinstance(self.modal_closed, ModalHandlerIndex):
+            self.modal_closed = ModalHandlerIndex(self.modal_closed)
 
 
 def matcher_to_str(id_: Union[str, re.Pattern[str], None]) -> str:
@@ -1,15 +1,18 @@
 from __future__ import annotations
 
-from collections.abc import Sequence
+from collections.abc import Iterable, Mapping, Sequence
 from datetime import datetime
 from typing import Any
 
+import httpx
 from slack_sdk.models.attachments import Attachment
 from slack_sdk.models.blocks import Block
 from slack_sdk.models.views import View
 from slack_sdk.web.async_client import AsyncWebClient
 from slack_sdk.web.async_slack_response import AsyncSlackResponse
 
+from machine.clients.fan_out import DEFAULT_CONCURRENCY, DeliveryResult
+from machine.clients.http import DEFAULT_CLIENT, HttpClientPool
 from machine.clients.slack import SlackClient
 from machine.models import Channel, User
 from machine.plugins import ee
@@ -39,6 +42,8 @@ class MachineBasePlugin:
     storage: PluginStorage
     settings: CaseInsensitiveDict
     _fq_name: str
+    # Shared by all plugins, Slack Machine sets it after creating the plugin
+    _http_clients: HttpClientPool | None = None
 
     def __init__(self, client: SlackClient, settings: CaseInsensitiveDict, storage: PluginStorage):
         self._client = client
@@ -47,7 +52,7 @@ class MachineBasePlugin:
         self._fq_name = f"{self.__module__}.{self.__class__.__name__}"
 
     @property
-    def users(self) -> dict[str, User]:
+    def users(self) -> Mapping[str, User]:
         """Dictionary of all users in the Slack workspace
 
         Returns:
@@ -57,7 +62,7 @@ class MachineBasePlugin:
         return self._client.users
 
     @property
-    def users_by_email(self) -> dict[str, User]:
+    def users_by_email(self) -> Mapping[str, User]:
         """Dictionary of all users in the Slack workspace by email
 
         Note:
@@ -71,7 +76,7 @@ class MachineBasePlugin:
         return self._client.users
 
     @property
-    def channels(self) -> dict[str, Channel]:
+    def channels(self) -> Mapping[str, Channel]:
         """List of all channels in the Slack workspace
 
         This is a list of all channels in the Slack workspace that the bot is aware of. This
@@ -93,6 +98,24 @@ class MachineBasePlugin:
         """  # noqa: E501
         return self._client.web_client
 
+    def http(self, name: str = DEFAULT_CLIENT) -> httpx.AsyncClient:
+        """Shared HTTP client to call other APIs
+
+        Clients are pooled and shared by all plugins, and keep connections alive between requests. Use the same name
+        for requests to the same service, so they reuse connections and get the options that are configured for that
+        name in the `HTTP_CLIENTS` setting. Don't close the client, Slack Machine closes it when it shuts down. The
+        clients are only available to plugins that were loaded by Slack Machine.
+
+        Args:
+            name: name of the client
+
+        Returns:
+            an instance of [`httpx.AsyncClient`](https://www.python-httpx.org/async/)
+        """
+        if self._http_clients is None:
+            raise RuntimeError("HTTP clients are only available to plugins that were loaded by Slack Machine")
+        return self._http_clients.get(name)
+
     @property
     def bot_info(self) -> dict[str, Any]:
         """Information about the bot user in Slack
@@ -124,12 +147,18 @@ class MachineBasePlugin:
         Returns:
             The channel if found, `None` otherwise.
         """
-        if channel_name.startswith("#"):
-            channel_name = channel_name[1:]
-        for c in self.channels.values():
-            if c.name_normalized and channel_name.lower() == c.name_normalized.lower():
-                return c
-        return None
+        return self._client.find_channel_by_name(channel_name)
+
+    def find_user_by_name(self, name: str) -> User | None:
+        """Find a user by their username or display name, irrespective of a preceding @ symbol.
+
+        Args:
+            name: The username or display name of the user to retrieve.
+
+        Returns:
+            The user if found, `None` otherwise.
+        """
+        return self._client.find_user_by_name(name)
 
     def get_user_by_id(self, user_id: str) -> User | None:
         """Get a user by their ID.
@@ -142,6 +171,34 @@ class MachineBasePlugin:
         """
         return self.users.get(user_id)
 
+    async def fetch_user(self, user_id: str) -> User:
+        """Get a user by their ID, fetching them from Slack if they're not cached
+
+        Use this instead of `get_user_by_id` when the `LAZY_CACHE_SIZE` setting is used, because then not every user is
+        cached.
+
+        Args:
+            user_id: The ID of the user to retrieve.
+
+        Returns:
+            The user
+        """
+        return await self._client.fetch_user(user_id)
+
+    async def fetch_channel(self, channel_id: str) -> Channel:
+        """Get a channel by its ID, fetching it from Slack if it's not cached
+
+        Use this instead of `self.channels` when the `LAZY_CACHE_SIZE` setting is used, because then not every channel
+        is cached.
+
+        Args:
+            channel_id: The ID of the channel to retrieve.
+
+        Returns:
+            The channel
+        """
+        return await self._client.fetch_channel(channel_id)
+
     def get_user_by_email(self, email: str) -> User | None:
         """Get a user by their email address.
 
@@ -177,6 +234,7 @@ class MachineBasePlugin:
         blocks: Sequence[Block] | Sequence[dict[str, Any]] | None = None,
         thread_ts: str | None = None,
         ephemeral_user: User | str | None = None,
+        coalesce: bool = False,
         **kwargs: Any,
     ) -> AsyncSlackResponse:
         """Send a message to a channel
@@ -207,6 +265,9 @@ class MachineBasePlugin:
             thread_ts: optional timestamp of thread, to send a message in that thread
             ephemeral_user: optional user name or id if the message needs to visible
                 to a specific user only
+            coalesce: send the message through the ordered queue of the channel (or thread). Consecutive plain text
+                messages that this plugin sends shortly after each other are merged into a single message, and all of
+                them return the response of that message.
 
         Returns:
             Dictionary deserialized from [chat.postMessage](https://api.slack.com/methods/chat.postMessage) response,
@@ -219,9 +280,39 @@ class MachineBasePlugin:
             blocks=blocks,
             thread_ts=thread_ts,
             ephemeral_user=ephemeral_user,
+            coalesce=coalesce,
+            source=self._fq_name,
             **kwargs,
         )
 
+    async def say_many(
+        self,
+        channels: Iterable[Channel | str],
+        text: str | None = None,
+        attachments: Sequence[Attachment] | Sequence[dict[str, Any]] | None = None,
+        blocks: Sequence[Block] | Sequence[dict[str, Any]] | None = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        **kwargs: Any,
+    ) -> dict[str, DeliveryResult]:
+        """Send the same message to many channels
+
+        Messages are sent concurrently, with at most `concurrency` messages in flight at the same time, and are paced
+        to stay within the rate limits of Slack. A failure to send to one channel doesn't stop the others.
+
+        Args:
+            channels: [`Channel`][machine.models.channel.Channel] objects or ids of channels to send the message to
+            text: message text
+            attachments: optional attachments (see [attachments](https://api.slack.com/docs/message-attachments))
+            blocks: optional blocks (see [blocks](https://api.slack.com/reference/block-kit/blocks))
+            concurrency: maximum number of messages that are sent at the same time
+
+        Returns:
+            [`DeliveryResult`][machine.clients.fan_out.DeliveryResult] per channel id, with the response or the error
+        """
+        return await self._client.send_many(
+            channels, text, concurrency=concurrency, attachments=attachments, blocks=blocks, **kwargs
+        )
+
     async def say_scheduled(
         self,
         when: datetime,
@@ -382,6 +473,34 @@ class MachineBasePlugin:
         """
         return await self._client.send_dm(user, text, attachments=attachments, blocks=blocks, **kwargs)
 
+    async def send_dm_many(
+        self,
+        users: Iterable[User | str],
+        text: str | None = None,
+        attachments: Sequence[Attachment] | Sequence[dict[str, Any]] | None = None,
+        blocks: Sequence[Block] | Sequence[dict[str, Any]] | None = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        **kwargs: Any,
+    ) -> dict[str, DeliveryResult]:
+        """Send the same Direct Message to many users
+
+        Messages are sent concurrently, with at most `concurrency` messages in flight at the same time, and are paced
+        to stay within the rate limits of Slack. A failure to send to one user doesn't stop the others.
+
+        Args:
+            users: [`User`][machine.models.user.User] objects or ids of users to send the DM to
+            text: message text
+            attachments: optional attachments (see [attachments](https://api.slack.com/docs/message-attachments))
+            blocks: optional blocks (see [blocks](https://api.slack.com/reference/block-kit/blocks))
+            concurrency: maximum number of messages that are sent at the same time
+
+        Returns:
+            [`DeliveryResult`][machine.clients.fan_out.DeliveryResult] per user id, with the response or the error
+        """
+        return await self._client.send_dm_many(
+            users, text, concurrency=concurrency, attachments=attachments, blocks=blocks, **kwargs
+        )
+
     async def send_dm_scheduled(
         self,
         when: datetime,
@@ -75,9 +75,4 @@ class RBACPlugin(MachineBasePlugin):
         ]
 
         admins_to_be_notified = {**admins, **roots}
-        for user_id in admins_to_be_notified:
-            await self.send_dm(
-                user_id,
-                title,
-                blocks=blocks,
-            )
+        await self.send_dm_many(admins_to_be_notified, title, blocks=blocks)
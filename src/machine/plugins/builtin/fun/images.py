@@ -9,6 +9,7 @@ from structlog.stdlib import get_logger
 from machine.plugins.base import MachineBasePlugin
 from machine.plugins.decorators import required_settings, respond_to
 from machine.plugins.message import Message
+from machine.storage.ttl_cache import TTLCache
 
 logger = get_logger(__name__)
 
@@ -24,6 +25,11 @@ def _make_blocks(search_string: str, image_url: str) -> list[Block]:
 class ImageSearchPlugin(MachineBasePlugin):
     """Images"""
 
+    async def init(self) -> None:
+        # Every search uses paid API quota, and popular searches are repeated a lot
+        ttl = float(self.settings.get("IMAGE_SEARCH_CACHE_TTL", 24 * 60 * 60))
+        self._search_cache: TTLCache[list[str]] = TTLCache(self.storage, "search", ttl, stale_ttl=ttl)
+
     @respond_to(r"(?:image|img)(?: me)? (?P<query>.+)")
     async def image_me(self, msg: Message, query: str) -> None:
         """image/img (me) <query>: find a random image"""
@@ -45,6 +51,11 @@ class ImageSearchPlugin(MachineBasePlugin):
             await msg.say(f"Couldn't find any results for '{query}'! :cry:")
 
     async def _search(self, query: str, animated: bool = False) -> list[str]:
+        cache_key = f"{'animated' if animated else 'image'}:{query.lower()}"
+        results = await self._search_cache.get(cache_key, lambda: self._search_google(query, animated))
+        return results if results is not None else []
+
+    async def _search_google(self, query: str, animated: bool) -> list[str] | None:
         query_params = {
             "cx": self.settings["GOOGLE_CSE_ID"],
             "key": self.settings["GOOGLE_API_KEY"],
@@ -56,15 +67,12 @@ class ImageSearchPlugin(MachineBasePlugin):
 
         if animated:
             query_params.update({"fileType": "gif", "hq": "animated", "tbs": "itp:animated"})
-        timeout = httpx.Timeout(10.0, connect=60.0)
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            response = await client.get("https://www.googleapis.com/customsearch/v1", params=query_params)
-        if response.status_code == httpx.codes.OK:
-            data = response.json()
-            results = [result["link"] for result in data["items"] if "items" in data]
-        else:
+        response = await self.http("google").get("https://www.googleapis.com/customsearch/v1", params=query_params)
+        if response.status_code != httpx.codes.OK:
             logger.warning(
                 "An error occurred while searching! Status code: %s, response: %s", response.status_code, response.text
             )
-            results = []
-        return results
+            # Returning None makes sure errors are not cached
+            return None
+        data = response.json()
+        return [result["link"] for result in data["items"] if "items" in data]
@@ -9,11 +9,17 @@ from machine.plugins.base import MachineBasePlugin
 from machine.plugins.builtin.fun.regexes import url_regex
 from machine.plugins.decorators import respond_to
 from machine.plugins.message import Message
+from machine.storage.ttl_cache import TTLCache
 
 
 class MemePlugin(MachineBasePlugin):
     """Images"""
 
+    async def init(self) -> None:
+        # The list of templates rarely changes, so it's cached for a day by default
+        ttl = float(self.settings.get("MEMEGEN_CACHE_TTL", 24 * 60 * 60))
+        self._templates_cache: TTLCache[list[dict[str, Any]]] = TTLCache(self.storage, "templates", ttl, stale_ttl=ttl)
+
     @respond_to(r"meme (?P<meme>\S+) (?P<top>.+);(?P<bottom>.+)")
     async def meme(self, msg: Message, meme: str, top: str, bottom: str) -> None:
         """meme <meme template> <top text>;<bottom text>: generate a meme"""
@@ -37,8 +43,8 @@ class MemePlugin(MachineBasePlugin):
     async def list_memes(self, msg: Message) -> None:
         """list memes: list all the available meme templates"""
         ephemeral = not msg.is_dm
-        status, templates = await self._memegen_api_request("/templates/")
-        if 200 <= status < 400 and templates is not None:
+        templates = await self._templates_cache.get(self._base_url, self._fetch_templates)
+        if templates is not None:
             message = "*You can choose from these memes:*\n\n" + "\n".join([
                 f"\t_{template['id']}_: '{template['name']}'" for template in templates
             ])
@@ -46,11 +52,13 @@ class MemePlugin(MachineBasePlugin):
         else:
             await msg.say("It seems I cannot find the memes you're looking for :cry:", ephemeral=ephemeral)
 
+    async def _fetch_templates(self) -> list[dict[str, Any]] | None:
+        status, templates = await self._memegen_api_request("/templates/")
+        return templates if 200 <= status < 400 else None
+
     async def _memegen_api_request(self, path: str) -> tuple[int, list[dict[str, Any]] | None]:
         url = self._base_url + path.lower()
-        timeout = httpx.Timeout(10.0, connect=60.0)
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            response = await client.get(url)
+        response = await self.http("memegen").get(url)
         if response.status_code == httpx.codes.OK:
             return response.status_code, response.json()
         else:
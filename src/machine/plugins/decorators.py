@@ -54,7 +54,10 @@ def process(slack_event_type: str) -> Callable[[Callable[P, R]], DecoratedPlugin
 
 
 def listen_to(
-    regex: str, flags: re.RegexFlag | int = re.IGNORECASE, handle_message_changed: bool = False
+    regex: str,
+    flags: re.RegexFlag | int = re.IGNORECASE,
+    handle_message_changed: bool = False,
+    timeout: float | None = None,
 ) -> Callable[[Callable[P, R]], DecoratedPluginFunc[P, R]]:
     """Listen to messages matching a regex pattern
 
@@ -68,22 +71,30 @@ def listen_to(
         regex: regex pattern to listen for
         flags: regex flags to apply when matching
         handle_message_changed: if changed messages should trigger the decorated function
+        timeout: maximum number of seconds the decorated function is allowed to run, after which it is cancelled.
+            Overrides the `HANDLER_TIMEOUT` setting
 
     Returns:
         wrapped method
     """
+    _validate_timeout(timeout)
 
     def listen_to_decorator(f: Callable[P, R]) -> DecoratedPluginFunc[P, R]:
         fn = cast(DecoratedPluginFunc, f)
         fn.metadata = getattr(f, "metadata", Metadata())
-        fn.metadata.plugin_actions.listen_to.append(MatcherConfig(re.compile(regex, flags), handle_message_changed))
+        fn.metadata.plugin_actions.listen_to.append(
+            MatcherConfig(re.compile(regex, flags), handle_message_changed, timeout)
+        )
         return fn
 
     return listen_to_decorator
 
 
 def respond_to(
-    regex: str, flags: re.RegexFlag | int = re.IGNORECASE, handle_message_changed: bool = False
+    regex: str,
+    flags: re.RegexFlag | int = re.IGNORECASE,
+    handle_message_changed: bool = False,
+    timeout: float | None = None,
 ) -> Callable[[Callable[P, R]], DecoratedPluginFunc[P, R]]:
     """Listen to messages mentioning the bot and matching a regex pattern
 
@@ -99,38 +110,46 @@ def respond_to(
         regex: regex pattern to listen for
         flags: regex flags to apply when matching
         handle_message_changed: if changed messages should trigger the decorated function
+        timeout: maximum number of seconds the decorated function is allowed to run, after which it is cancelled.
+            Overrides the `HANDLER_TIMEOUT` setting
 
     Returns:
         wrapped method
     """
+    _validate_timeout(timeout)
 
     def respond_to_decorator(f: Callable[P, R]) -> DecoratedPluginFunc[P, R]:
         fn = cast(DecoratedPluginFunc, f)
         fn.metadata = getattr(f, "metadata", Metadata())
-        fn.metadata.plugin_actions.respond_to.append(MatcherConfig(re.compile(regex, flags), handle_message_changed))
+        fn.metadata.plugin_actions.respond_to.append(
+            MatcherConfig(re.compile(regex, flags), handle_message_changed, timeout)
+        )
         return fn
 
     return respond_to_decorator
 
 
-def command(slash_command: str) -> Callable[[Callable[P, R]], DecoratedPluginFunc[P, R]]:
+def command(slash_command: str, timeout: float | None = None) -> Callable[[Callable[P, R]], DecoratedPluginFunc[P, R]]:
     """Respond to a slash command
 
     This decorator will enable a Plugin method to respond to slash commands
 
     Args:
         slash_command: the slash command to respond to
+        timeout: maximum number of seconds the decorated function is allowed to run, after which it is cancelled.
+            Overrides the `HANDLER_TIMEOUT` setting
 
     Returns:
         wrapped method
     """
+    _validate_timeout(timeout)
 
     def command_decorator(f: Callable[P, R]) -> DecoratedPluginFunc[P, R]:
         fn = cast(DecoratedPluginFunc, f)
         fn.metadata = getattr(f, "metadata", Metadata())
         normalized_slash_command = f"/{slash_command}" if not slash_command.startswith("/") else slash_command
         fn.metadata.plugin_actions.commands.append(
-            CommandConfig(command=normalized_slash_command, is_generator=inspect.isasyncgenfunction(f))
+            CommandConfig(command=normalized_slash_command, is_generator=inspect.isasyncgenfunction(f), timeout=timeout)
         )
         return fn
 
@@ -138,7 +157,9 @@ def command(slash_command: str) -> Callable[[Callable[P, R]], DecoratedPluginFun
 
 
 def action(
-    action_id: Union[re.Pattern[str], str, None] = None, block_id: Union[re.Pattern[str], str, None] = None
+    action_id: Union[re.Pattern[str], str, None] = None,
+    block_id: Union[re.Pattern[str], str, None] = None,
+    timeout: float | None = None,
 ) -> Callable[[Callable[P, R]], DecoratedPluginFunc[P, R]]:
     """Respond to block actions
 
@@ -153,23 +174,28 @@ def action(
     Args:
         action_id: the action_id to respond to, can be a string or regex pattern
         block_id: the block_id to respond to, can be a string or regex pattern
+        timeout: maximum number of seconds the decorated function is allowed to run, after which it is cancelled.
+            Overrides the `HANDLER_TIMEOUT` setting
 
     Returns:
         wrapped method
     """
+    _validate_timeout(timeout)
 
     def action_decorator(f: Callable[P, R]) -> DecoratedPluginFunc[P, R]:
         fn = cast(DecoratedPluginFunc, f)
         fn.metadata = getattr(f, "metadata", Metadata())
         if action_id is None and block_id is None:
             raise ValueError("At least one of action_id or block_id must be provided")
-        fn.metadata.plugin_actions.actions.append(ActionConfig(action_id=action_id, block_id=block_id))
+        fn.metadata.plugin_actions.actions.append(ActionConfig(action_id=action_id, block_id=block_id, timeout=timeout))
         return fn
 
     return action_decorator
 
 
-def modal(callback_id: Union[re.Pattern[str], str]) -> Callable[[Callable[P, R]], DecoratedPluginFunc[P, R]]:
+def modal(
+    callback_id: Union[re.Pattern[str], str], timeout: float | None = None
+) -> Callable[[Callable[P, R]], DecoratedPluginFunc[P, R]]:
     """Respond to modal submissions
 
     This decorator will enable a Plugin method to be triggered when certain modals are submitted.
@@ -178,24 +204,29 @@ def modal(callback_id: Union[re.Pattern[str], str]) -> Callable[[Callable[P, R]]
 
     Args:
         callback_id: the callback id to respond to, can be a string or regex pattern
+        timeout: maximum number of seconds the decorated function is allowed to run, after which it is cancelled.
+            Overrides the `HANDLER_TIMEOUT` setting
 
     Returns:
         wrapped method
     """
+    _validate_timeout(timeout)
 
     def modal_decorator(f: Callable[P, R]) -> DecoratedPluginFunc[P, R]:
         fn = cast(DecoratedPluginFunc, f)
         fn.metadata = getattr(f, "metadata", Metadata())
         is_generator = inspect.isasyncgenfunction(f)
         fn.metadata.plugin_actions.modal_submissions.append(
-            ModalConfig(callback_id=callback_id, is_generator=is_generator)
+            ModalConfig(callback_id=callback_id, is_generator=is_generator, timeout=timeout)
         )
         return fn
 
     return modal_decorator
 
 
-def modal_closed(callback_id: Union[re.Pattern[str], str]) -> Callable[[Callable[P, R]], DecoratedPluginFunc[P, R]]:
+def modal_closed(
+    callback_id: Union[re.Pattern[str], str], timeout: float | None = None
+) -> Callable[[Callable[P, R]], DecoratedPluginFunc[P, R]]:
     """Respond to modal closures
 
     This decorator will enable a Plugin method to be triggered when certain modals are closed.
@@ -207,10 +238,13 @@ def modal_closed(callback_id: Union[re.Pattern[str], str]) -> Callable[[Callable
 
     Args:
         callback_id: the callback id to respond to, can be a string or regex pattern
+        timeout: maximum number of seconds the decorated function is allowed to run, after which it is cancelled.
+            Overrides the `HANDLER_TIMEOUT` setting
 
     Returns:
         wrapped method
     """
+    _validate_timeout(timeout)
 
     def modal_closed_decorator(f: Callable[P, R]) -> DecoratedPluginFunc[P, R]:
         fn = cast(DecoratedPluginFunc, f)
@@ -218,12 +252,17 @@ def modal_closed(callback_id: Union[re.Pattern[str], str]) -> Callable[[Callable
         is_generator = inspect.isasyncgenfunction(f)
         if is_generator:
             raise ValueError("Modal closed handlers cannot be async generators")
-        fn.metadata.plugin_actions.modal_closures.append(ModalConfig(callback_id=callback_id))
+        fn.metadata.plugin_actions.modal_closures.append(ModalConfig(callback_id=callback_id, timeout=timeout))
         return fn
 
     return modal_closed_decorator
 
 
+def _validate_timeout(timeout: float | None) -> None:
+    if timeout is not None and timeout <= 0:
+        raise ValueError("timeout must be a positive number of seconds")
+
+
 def schedule(
     year: int | str | None = None,
     month: int | str | None = None,
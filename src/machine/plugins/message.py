@@ -1,7 +1,8 @@
 from __future__ import annotations
 
-from collections.abc import Sequence
+from collections.abc import Hashable, Sequence
 from datetime import datetime
+from functools import cached_property
 from typing import Any, cast
 
 from slack_sdk.models.attachments import Attachment
@@ -22,12 +23,24 @@ class Message:
 
     The `Message` class also contains convenience methods for replying to the message in the
     right channel, replying to the sender, etc.
+
+    All handlers of a plugin that match the same incoming message share a single `Message`. The sender and
+    channel are looked up the first time they're accessed, and the lookups are shared with the other plugins.
     """
 
     # TODO: create proper class for msg_event
-    def __init__(self, client: SlackClient, msg_event: dict[str, Any]):
+    def __init__(self, client: SlackClient, msg_event: dict[str, Any], source: Hashable | None = None):
         self._client = client
         self._msg_event = msg_event
+        # Identifies the plugin that replies to the message, so replies of different plugins are never merged
+        self._source = source
+        self._lookups: dict[str, Any] = {}
+
+    def _for_source(self, source: Hashable) -> Message:
+        """The same message, for replies of another plugin, sharing the lookups of the sender and channel"""
+        message = Message(self._client, self._msg_event, source)
+        message._lookups = self._lookups
+        return message
 
     @property
     def sender(self) -> User:
@@ -36,7 +49,10 @@ class Message:
         Returns:
             the User the message was sent by
         """
-        return self._client.users[self._msg_event["user"]]
+        sender = self._lookups.get("sender")
+        if sender is None:
+            sender = self._lookups["sender"] = self._client.users[self._msg_event["user"]]
+        return sender
 
     @property
     def channel(self) -> Channel:
@@ -45,9 +61,12 @@ class Message:
         Returns:
             the Channel the message was sent to
         """
-        return self._client.channels[self._msg_event["channel"]]
+        channel = self._lookups.get("channel")
+        if channel is None:
+            channel = self._lookups["channel"] = self._client.channels[self._msg_event["channel"]]
+        return channel
 
-    @property
+    @cached_property
     def is_dm(self) -> bool:
         """Is the message a direct message
 
@@ -102,6 +121,7 @@ class Message:
         blocks: Sequence[Block] | Sequence[dict[str, Any]] | None = None,
         thread_ts: str | None = None,
         ephemeral: bool = False,
+        coalesce: bool = False,
         **kwargs: Any,
     ) -> AsyncSlackResponse:
         """Send a new message to the channel the original message was received in
@@ -130,6 +150,9 @@ class Message:
             thread_ts: optional timestamp of thread, to send a message in that thread
             ephemeral: `True/False` wether to send the message as an ephemeral message, only
                 visible to the sender of the original message
+            coalesce: send the message through the ordered queue of the channel (or thread). Consecutive plain text
+                replies to this message that are sent shortly after each other are merged into a single message, and
+                all of them return the response of that message.
 
         Returns:
             Dictionary deserialized from [chat.postMessage](https://api.slack.com/methods/chat.postMessage) response,
@@ -146,6 +169,8 @@ class Message:
             blocks=blocks,
             thread_ts=thread_ts,
             ephemeral_user=ephemeral_user,
+            coalesce=coalesce,
+            source=self._source if self._source is not None else self,
             **kwargs,
         )
 
@@ -9,24 +9,28 @@ from typing import Any, Union
 class MatcherConfig:
     regex: re.Pattern[str]
     handle_changed_message: bool = False
+    timeout: float | None = None
 
 
 @dataclass
 class CommandConfig:
     command: str
     is_generator: bool = False
+    timeout: float | None = None
 
 
 @dataclass
 class ActionConfig:
     action_id: Union[re.Pattern[str], str, None] = None
     block_id: Union[re.Pattern[str], str, None] = None
+    timeout: float | None = None
 
 
 @dataclass
 class ModalConfig:
     callback_id: Union[re.Pattern[str], str]
     is_generator: bool = False
+    timeout: float | None = None
 
 
 @dataclass
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections.abc import Iterable, Mapping
 from datetime import timedelta
 from typing import Any
 
@@ -92,6 +93,58 @@ class PluginStorage:
         namespaced_key = self._namespace_key(key, shared)
         await self._storage.delete(namespaced_key)
 
+    async def get_many(self, keys: Iterable[str], shared: bool = False) -> dict[str, Any | None]:
+        """Retrieve data for multiple keys at once
+
+        Storage backends that support it retrieve all keys in a single round trip, which is a lot faster than
+        retrieving keys one by one.
+
+        Args:
+            keys: keys for the data to retrieve
+            shared: `True/False` wether to retrieve data from the shared (global) namespace.
+
+        Returns:
+            the data per key, `None` for keys that cannot be found/have expired
+        """
+        namespaced_keys = {self._namespace_key(key, shared): key for key in keys}
+        if not namespaced_keys:
+            return {}
+        values = await self._storage.get_many(list(namespaced_keys))
+        result: dict[str, Any | None] = {}
+        for namespaced_key, key in namespaced_keys.items():
+            value = values.get(namespaced_key)
+            result[key] = dill.loads(value) if value else None
+        return result
+
+    async def set_many(
+        self, items: Mapping[str, Any], expires: int | timedelta | None = None, shared: bool = False
+    ) -> None:
+        """Store or update data for multiple keys at once
+
+        Args:
+            items: the data to store per key
+            expires: optional number of seconds after which the data is expired
+            shared: `True/False` wether this data should be shared by other plugins. Use with care, because it
+                pollutes the global namespace of the storage.
+        """
+        if not items:
+            return
+        expires = int(expires.total_seconds()) if isinstance(expires, timedelta) else expires
+        pickled_items = {self._namespace_key(key, shared): dill.dumps(value) for key, value in items.items()}
+        await self._storage.set_many(pickled_items, expires)
+
+    async def delete_many(self, keys: Iterable[str], shared: bool = False) -> None:
+        """Remove multiple keys and their data from storage at once
+
+        Args:
+            keys: keys to remove
+            shared: `True/False` wether the keys to remove should be in the shared (global)
+                namespace
+        """
+        namespaced_keys = list(dict.fromkeys(self._namespace_key(key, shared) for key in keys))
+        if namespaced_keys:
+            await self._storage.delete_many(namespaced_keys)
+
     async def get_storage_size(self) -> int:
         """Calculate the total size of the storage
 
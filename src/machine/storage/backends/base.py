@@ -1,14 +1,15 @@
 from __future__ import annotations
 
+import asyncio
 from abc import ABC, abstractmethod
-from collections.abc import Mapping
+from collections.abc import Mapping, Sequence
 from typing import Any
 
 
 class MachineBaseStorage(ABC):
     """Base class for storage backends
 
-    Extending classes should implement the five methods in this base class. Slack Machine takes
+    Extending classes should implement the abstract methods in this base class. Slack Machine takes
     care of a lot of details regarding the persistent storage of data. So storage backends
     **do not** have to deal with the following, because Slack Machine takes care of these:
 
@@ -73,6 +74,65 @@ class MachineBaseStorage(ABC):
         """
         ...
 
+    async def set_if_absent(self, key: str, value: bytes, expires: int | None = None) -> bool:
+        """Store data by key, unless the key already exists
+
+        The default implementation checks if the key exists and then stores the data, which is not atomic. Backends
+        that can do this atomically should override this.
+
+        Args:
+            key: the key under which to store the data
+            value: data as (byte)string
+            expires: optional expiration time in seconds, after which the data should not be
+                returned any more.
+
+        Returns:
+            `True` if the data was stored, `False` if the key already existed
+        """
+        if await self.has(key):
+            return False
+        await self.set(key, value, expires)
+        return True
+
+    async def get_many(self, keys: Sequence[str]) -> dict[str, bytes | None]:
+        """Retrieve data for multiple keys
+
+        The default implementation calls [`get`][machine.storage.backends.base.MachineBaseStorage.get] concurrently
+        for every key. Backends that can retrieve multiple keys in a single round trip should override this.
+
+        Args:
+            keys: keys for which to retrieve data
+
+        Returns:
+            the raw data per key, `None` for keys that are unknown or have expired
+        """
+        values = await asyncio.gather(*(self.get(key) for key in keys))
+        return dict(zip(keys, values))
+
+    async def set_many(self, items: Mapping[str, bytes], expires: int | None = None) -> None:
+        """Store data for multiple keys
+
+        The default implementation calls [`set`][machine.storage.backends.base.MachineBaseStorage.set] concurrently
+        for every key. Backends that can store multiple keys in a single round trip should override this.
+
+        Args:
+            items: data as (byte)string per key
+            expires: optional expiration time in seconds, after which the data should not be
+                returned any more.
+        """
+        await asyncio.gather(*(self.set(key, value, expires) for key, value in items.items()))
+
+    async def delete_many(self, keys: Sequence[str]) -> None:
+        """Delete data for multiple keys
+
+        The default implementation calls [`delete`][machine.storage.backends.base.MachineBaseStorage.delete]
+        concurrently for every key. Backends that can delete multiple keys in a single round trip should override this.
+
+        Args:
+            keys: keys for which to delete the data
+        """
+        await asyncio.gather(*(self.delete(key) for key in keys))
+
     @abstractmethod
     async def size(self) -> int:
         """Calculate the total size of the storage
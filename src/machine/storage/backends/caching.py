@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from typing import Any, Callable, Protocol, runtime_checkable
+
+from structlog.stdlib import get_logger
+
+from machine.storage.backends.base import MachineBaseStorage
+from machine.utils.single_flight import SingleFlight
+
+logger = get_logger(__name__)
+
+# Number of seconds to wait before listening for invalidations again after the connection was lost
+RECONNECT_DELAY = 1.0
+
+
+@runtime_checkable
+class SupportsInvalidation(Protocol):
+    """Storage backend that can notify other instances of Slack Machine of changed keys"""
+
+    async def publish_invalidation(self, keys: Sequence[str]) -> None: ...
+
+    async def listen_for_invalidations(self, callback: Callable[[list[str]], None]) -> None: ...
+
+
+class CachingStorage(MachineBaseStorage):
+    """Read-through cache in front of another storage backend
+
+    Values that are read are kept in memory for `ttl` seconds, so repeated reads of the same keys don't need a round
+    trip to the storage backend. Unknown keys are cached as well. Writes and deletes go straight to the backend, and
+    remove the keys from the cache. When the cache holds more than `max_size` keys, the least recently used ones are
+    evicted.
+
+    Changes made by other instances of Slack Machine are only noticed after `ttl` seconds, unless the backend supports
+    publishing invalidations (eg. Redis). In that case, changed keys are removed from the caches of all instances right
+    away. Data that expires in the backend can also be returned from the cache for up to `ttl` seconds after it
+    expired.
+    """
+
+    def __init__(
+        self,
+        backend: MachineBaseStorage,
+        ttl: float = 10.0,
+        max_size: int = 10_000,
+        invalidation: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if ttl <= 0:
+            raise ValueError("TTL must be positive")
+        if max_size < 1:
+            raise ValueError("Maximum size must be at least 1")
+        super().__init__(backend.settings)
+        self.backend = backend
+        self._ttl = ttl
+        self._max_size = max_size
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, bytes | None]] = OrderedDict()
+        self._loads: SingleFlight[str, dict[str, bytes | None]] = SingleFlight()
+        # Keys that are being read from the backend, and keys that changed while they were being read. The results of
+        # those reads might be outdated, so they're not cached.
+        self._loading: dict[str, int] = {}
+        self._changed_while_loading: set[str] = set()
+        self._invalidation = invalidation and isinstance(backend, SupportsInvalidation)
+        self._listener: asyncio.Task[None] | None = None
+        self.hits = 0
+        self.misses = 0
+
+    async def init(self) -> None:
+        await self.backend.init()
+        if self._invalidation:
+            self._listener = asyncio.create_task(self._listen_for_invalidations())
+
+    async def _listen_for_invalidations(self) -> None:
+        assert isinstance(self.backend, SupportsInvalidation)
+        while True:
+            # Invalidations might have been missed while not listening
+            self.clear()
+            try:
+                await self.backend.listen_for_invalidations(self._invalidate_local)
+            except Exception:
+                logger.exception("Error while listening for storage cache invalidations")
+            await asyncio.sleep(RECONNECT_DELAY)
+
+    def _cached(self, key: str) -> tuple[float, bytes | None] | None:
+        cached = self._entries.get(key)
+        if cached is not None:
+            if cached[0] > self._clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    async def _load(self, keys: Sequence[str]) -> dict[str, bytes | None]:
+        for key in keys:
+            self._loading[key] = self._loading.get(key, 0) + 1
+        values: dict[str, bytes | None] = {}
+        try:
+            if len(keys) == 1:
+                values[keys[0]] = await self.backend.get(keys[0])
+            else:
+                values = await self.backend.get_many(keys)
+        finally:
+            expires_at = self._clock() + self._ttl
+            for key in keys:
+                if key in values and key not in self._changed_while_loading:
+                    self._entries[key] = (expires_at, values[key])
+                    self._entries.move_to_end(key)
+                self._loading[key] -= 1
+                if not self._loading[key]:
+                    del self._loading[key]
+                    self._changed_while_loading.discard(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+        return values
+
+    def _invalidate_local(self, keys: Sequence[str]) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+            if key in self._loading:
+                self._changed_while_loading.add(key)
+
+    async def _invalidate(self, keys: Sequence[str]) -> None:
+        self._invalidate_local(keys)
+        if self._invalidation:
+            assert isinstance(self.backend, SupportsInvalidation)
+            try:
+                await self.backend.publish_invalidation(keys)
+            except Exception:
+                # The change itself succeeded, other instances will pick it up when their cached values expire
+                logger.exception("Error while publishing storage cache invalidation")
+
+    async def get(self, key: str) -> bytes | None:
+        cached = self._cached(key)
+        if cached is not None:
+            return cached[1]
+        values = await self._loads.do(key, lambda: self._load([key]))
+        return values[key]
+
+    async def get_many(self, keys: Sequence[str]) -> dict[str, bytes | None]:
+        values: dict[str, bytes | None] = {}
+        missing = []
+        for key in keys:
+            cached = self._cached(key)
+            if cached is not None:
+                values[key] = cached[1]
+            else:
+                missing.append(key)
+        if missing:
+            values.update(await self._load(missing))
+        return {key: values[key] for key in keys}
+
+    async def has(self, key: str) -> bool:
+        cached = self._cached(key)
+        if cached is not None:
+            return cached[1] is not None
+        return await self.backend.has(key)
+
+    async def set(self, key: str, value: bytes, expires: int | None = None) -> None:
+        await self.backend.set(key, value, expires)
+        await self._invalidate([key])
+
+    async def set_if_absent(self, key: str, value: bytes, expires: int | None = None) -> bool:
+        stored = await self.backend.set_if_absent(key, value, expires)
+        if stored:
+            await self._invalidate([key])
+        return stored
+
+    async def set_many(self, items: Mapping[str, bytes], expires: int | None = None) -> None:
+        await self.backend.set_many(items, expires)
+        await self._invalidate(list(items))
+
+    async def delete(self, key: str) -> None:
+        await self.backend.delete(key)
+        await self._invalidate([key])
+
+    async def delete_many(self, keys: Sequence[str]) -> None:
+        await self.backend.delete_many(keys)
+        await self._invalidate(keys)
+
+    async def size(self) -> int:
+        return await self.backend.size()
+
+    def clear(self) -> None:
+        """Remove all cached values"""
+        self._entries.clear()
+        self._changed_while_loading.update(self._loading)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        await self.backend.close()
+
+
+def create_caching_storage(settings: Mapping[str, Any], backend: MachineBaseStorage) -> MachineBaseStorage:
+    """Put a read-through cache in front of a storage backend, if enabled with the `STORAGE_CACHE` setting
+
+    Args:
+        settings: Slack Machine settings
+        backend: the storage backend
+
+    Returns:
+        the cached storage backend, or the backend itself if caching is disabled
+    """
+    if not settings.get("STORAGE_CACHE", False):
+        return backend
+    return CachingStorage(
+        backend,
+        ttl=float(settings.get("STORAGE_CACHE_TTL", 10)),
+        max_size=int(settings.get("STORAGE_CACHE_SIZE", 10_000)),
+        invalidation=bool(settings.get("STORAGE_CACHE_INVALIDATION", True)),
+    )
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
+import asyncio
 import base64
 import calendar
 import datetime
 import typing
-from collections.abc import Mapping
+from collections.abc import Mapping, Sequence
 from contextlib import AsyncExitStack
 from typing import Any, cast
 
@@ -21,6 +22,10 @@ from machine.storage.backends.base import MachineBaseStorage
 
 logger = get_logger(__name__)
 DEFAULT_ENCODING = "utf-8"
+# BatchGetItem accepts at most 100 keys per request
+MAX_BATCH_GET_KEYS = 100
+# Number of times keys that DynamoDB couldn't process in a BatchGetItem request are requested again
+MAX_BATCH_GET_RETRIES = 8
 
 
 class DynamoDBStorage(MachineBaseStorage):
@@ -138,16 +143,46 @@ class DynamoDBStorage(MachineBaseStorage):
             logger.error("Unable to get item[%s]", self._prefix(key))
             raise e
 
-    async def set(self, key: str, value: bytes, expires: int | None = None) -> None:
+    async def get_many(self, keys: Sequence[str]) -> dict[str, bytes | None]:
         """
-        Store item data by key
+        Retrieve item data for multiple keys, using BatchGetItem
 
-        :param key: the key under which to store the data
-        :param value: data as (byte)string
-        :param expires: optional expiration time in seconds, after which the
-            data should not be returned any more
-        :raises ClientError: if the client was unable to communicate with DynamoDB
+        :param keys: the SM keys to fetch against
+        :return: the raw data per key, ``None`` for keys that are unknown or have expired
+        :raises ClientError: if the client was unable to communicate with DynamoDB, or DynamoDB
+            still couldn't process all keys after ``MAX_BATCH_GET_RETRIES`` retries
         """
+        values: dict[str, bytes | None] = dict.fromkeys(keys)
+        prefixed_keys = {self._prefix(key): key for key in values}
+        pending = list(prefixed_keys)
+        try:
+            for start in range(0, len(pending), MAX_BATCH_GET_KEYS):
+                request_keys: list[Any] = [{"sm-key": key} for key in pending[start : start + MAX_BATCH_GET_KEYS]]
+                retries = 0
+                while request_keys:
+                    r = await self._db.batch_get_item(RequestItems={self._table_name: {"Keys": request_keys}})
+                    for item in r["Responses"].get(self._table_name, []):
+                        values[prefixed_keys[cast(str, item["sm-key"])]] = base64.b64decode(
+                            cast(bytes, item["sm-value"])
+                        )
+                    # DynamoDB returns keys it couldn't process because of throughput limits, which should be retried
+                    unprocessed = r.get("UnprocessedKeys", {}).get(self._table_name)
+                    request_keys = list(unprocessed["Keys"]) if unprocessed else []
+                    if request_keys:
+                        if retries >= MAX_BATCH_GET_RETRIES:
+                            error: Any = {
+                                "Code": "ProvisionedThroughputExceededException",
+                                "Message": f"{len(request_keys)} keys still unprocessed after {retries} retries",
+                            }
+                            raise ClientError({"Error": error}, "BatchGetItem")
+                        retries += 1
+                        await asyncio.sleep(min(0.05 * 2**retries, 2))
+        except ClientError as e:
+            logger.error("Unable to get items[%s]", ", ".join(prefixed_keys))
+            raise e
+        return values
+
+    def _item(self, key: str, value: bytes, expires: int | None) -> dict[str, Any]:
         item: dict[str, Any] = {
             "sm-key": self._prefix(key),
             "sm-value": base64.b64encode(value).decode(DEFAULT_ENCODING),
@@ -155,7 +190,19 @@ class DynamoDBStorage(MachineBaseStorage):
         if expires:
             ttl = datetime.datetime.utcnow() + datetime.timedelta(seconds=expires)
             item["sm-expire"] = calendar.timegm(ttl.timetuple())
+        return item
+
+    async def set(self, key: str, value: bytes, expires: int | None = None) -> None:
+        """
+        Store item data by key
 
+        :param key: the key under which to store the data
+        :param value: data as (byte)string
+        :param expires: optional expiration time in seconds, after which the
+            data should not be returned any more
+        :raises ClientError: if the client was unable to communicate with DynamoDB
+        """
+        item = self._item(key, value, expires)
         try:
             await self._table.put_item(Item=item)
         except ClientError as e:
@@ -175,6 +222,66 @@ class DynamoDBStorage(MachineBaseStorage):
             logger.error("Unable to delete item[%s]", self._prefix(key))
             raise e
 
+    async def set_if_absent(self, key: str, value: bytes, expires: int | None = None) -> bool:
+        """
+        Store item data by key, unless the key exists, using a conditional write
+
+        :param key: the key under which to store the data
+        :param value: data as (byte)string
+        :param expires: optional expiration time in seconds, after which the
+            data should not be returned any more
+        :return: ``True`` if the data was stored, ``False`` if the key already existed
+        :raises ClientError: if the client was unable to communicate with DynamoDB
+        """
+        item = self._item(key, value, expires)
+        try:
+            # DynamoDB removes expired items lazily, so items that have expired are overwritten
+            await self._table.put_item(
+                Item=item,
+                ConditionExpression="attribute_not_exists(#key) OR #expire < :now",
+                ExpressionAttributeNames={"#key": "sm-key", "#expire": "sm-expire"},
+                ExpressionAttributeValues={":now": calendar.timegm(datetime.datetime.utcnow().timetuple())},
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                return False
+            logger.error("Unable to set item[%s]", self._prefix(key))
+            raise e
+        return True
+
+    async def set_many(self, items: Mapping[str, bytes], expires: int | None = None) -> None:
+        """
+        Store item data for multiple keys, using BatchWriteItem
+
+        :param items: data as (byte)string per key
+        :param expires: optional expiration time in seconds, after which the
+            data should not be returned any more
+        :raises ClientError: if the client was unable to communicate with DynamoDB
+        """
+        try:
+            # The batch writer sends items in batches of 25 and retries unprocessed items
+            async with self._table.batch_writer(overwrite_by_pkeys=["sm-key"]) as batch:
+                for key, value in items.items():
+                    await batch.put_item(Item=self._item(key, value, expires))
+        except ClientError as e:
+            logger.error("Unable to set items[%s]", ", ".join(self._prefix(key) for key in items))
+            raise e
+
+    async def delete_many(self, keys: Sequence[str]) -> None:
+        """
+        Delete item data for multiple keys, using BatchWriteItem
+
+        :param keys: keys for which to delete the data
+        :raises ClientError: if the client was unable to communicate with DynamoDB
+        """
+        try:
+            async with self._table.batch_writer(overwrite_by_pkeys=["sm-key"]) as batch:
+                for key in keys:
+                    await batch.delete_item(Key={"sm-key": self._prefix(key)})
+        except ClientError as e:
+            logger.error("Unable to delete items[%s]", ", ".join(self._prefix(key) for key in keys))
+            raise e
+
     async def size(self) -> int:
         """
         Calculate the total size of the storage
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import sys
-from collections.abc import Mapping
+from collections.abc import Mapping, Sequence
 from datetime import datetime, timedelta
 from typing import Any
 
@@ -42,7 +42,26 @@ class MemoryStorage(MachineBaseStorage):
                 return True
 
     async def delete(self, key: str) -> None:
-        del self._storage[key]
+        # Like the other backends, deleting an unknown key is not an error
+        self._storage.pop(key, None)
+
+    async def set_if_absent(self, key: str, value: bytes, expires: int | None = None) -> bool:
+        # There's no await between the check and the write, so this is atomic
+        if await self.has(key):
+            return False
+        await self.set(key, value, expires)
+        return True
+
+    async def get_many(self, keys: Sequence[str]) -> dict[str, bytes | None]:
+        return {key: await self.get(key) for key in keys}
+
+    async def set_many(self, items: Mapping[str, bytes], expires: int | None = None) -> None:
+        for key, value in items.items():
+            await self.set(key, value, expires)
+
+    async def delete_many(self, keys: Sequence[str]) -> None:
+        for key in keys:
+            self._storage.pop(key, None)
 
     async def size(self) -> int:
         return sys.getsizeof(self._storage)  # pragma: no cover
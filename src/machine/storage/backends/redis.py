@@ -1,7 +1,9 @@
 from __future__ import annotations
 
-from collections.abc import Mapping
-from typing import Any
+import json
+import uuid
+from collections.abc import Mapping, Sequence
+from typing import Any, Callable
 
 from redis.asyncio import Redis
 
@@ -15,6 +17,9 @@ class RedisStorage(MachineBaseStorage):
     def __init__(self, settings: Mapping[str, Any]):
         super().__init__(settings)
         self._key_prefix = settings.get("REDIS_KEY_PREFIX", "SM")
+        self._invalidation_channel = f"{self._key_prefix}:invalidations"
+        # Identifies this instance, so it can ignore the invalidations it published itself
+        self._instance_id = uuid.uuid4().hex
         redis_config = gen_config_dict(settings)
         self._redis = Redis(**redis_config)
 
@@ -33,6 +38,41 @@ class RedisStorage(MachineBaseStorage):
     async def delete(self, key: str) -> None:
         await self._redis.delete(self._prefix(key))
 
+    async def set_if_absent(self, key: str, value: bytes, expires: int | None = None) -> bool:
+        return bool(await self._redis.set(self._prefix(key), value, expires, nx=True))
+
+    async def get_many(self, keys: Sequence[str]) -> dict[str, bytes | None]:
+        if not keys:
+            return {}
+        values = await self._redis.mget([self._prefix(key) for key in keys])
+        return dict(zip(keys, values))
+
+    async def set_many(self, items: Mapping[str, bytes], expires: int | None = None) -> None:
+        if not items:
+            return
+        async with self._redis.pipeline() as pipeline:
+            for key, value in items.items():
+                pipeline.set(self._prefix(key), value, expires)
+            await pipeline.execute()
+
+    async def delete_many(self, keys: Sequence[str]) -> None:
+        if keys:
+            await self._redis.delete(*(self._prefix(key) for key in keys))
+
+    async def publish_invalidation(self, keys: Sequence[str]) -> None:
+        message = json.dumps({"source": self._instance_id, "keys": list(keys)})
+        await self._redis.publish(self._invalidation_channel, message)
+
+    async def listen_for_invalidations(self, callback: Callable[[list[str]], None]) -> None:
+        async with self._redis.pubsub() as pubsub:
+            await pubsub.subscribe(self._invalidation_channel)
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                payload = json.loads(message["data"])
+                if payload["source"] != self._instance_id:
+                    callback(payload["keys"])
+
     async def size(self) -> int:
         info = await self._redis.info("memory")
         return info["used_memory"]
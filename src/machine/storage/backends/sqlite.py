@@ -1,13 +1,16 @@
 from __future__ import annotations
 
 import time
-from collections.abc import Mapping
+from collections.abc import Mapping, Sequence
 from typing import Any
 
 import aiosqlite
 
 from machine.storage.backends.base import MachineBaseStorage
 
+# Older versions of SQLite allow at most 999 parameters per query
+_MAX_KEYS_PER_QUERY = 500
+
 
 class SQLiteStorage(MachineBaseStorage):
     def __init__(self, settings: Mapping[str, Any]):
@@ -43,6 +46,23 @@ class SQLiteStorage(MachineBaseStorage):
         )
         await self.conn.commit()
 
+    async def set_if_absent(self, key: str, value: bytes, expires: int | None = None) -> bool:
+        current_ts = int(time.time())
+        expires_at = current_ts + expires if expires is not None else None
+        # Expired rows are replaced, the statement doesn't change anything if the key exists and hasn't expired
+        await self.cursor.execute(
+            """
+            INSERT INTO sm_storage (key, value, expires_at)
+            VALUES (?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at
+            WHERE sm_storage.expires_at IS NOT NULL AND sm_storage.expires_at <= ?
+        """,
+            (key, value, expires_at, current_ts),
+        )
+        stored = self.cursor.rowcount > 0
+        await self.conn.commit()
+        return stored
+
     async def get(self, key: str) -> bytes | None:
         current_ts = int(time.time())
         await self.cursor.execute(
@@ -64,6 +84,37 @@ class SQLiteStorage(MachineBaseStorage):
         await self.cursor.execute("DELETE FROM sm_storage WHERE key = ?", (key,))
         await self.conn.commit()
 
+    async def get_many(self, keys: Sequence[str]) -> dict[str, bytes | None]:
+        current_ts = int(time.time())
+        values: dict[str, bytes | None] = dict.fromkeys(keys)
+        unique_keys = list(values)
+        for start in range(0, len(unique_keys), _MAX_KEYS_PER_QUERY):
+            chunk = unique_keys[start : start + _MAX_KEYS_PER_QUERY]
+            placeholders = ", ".join("?" * len(chunk))
+            await self.cursor.execute(
+                f"SELECT key, value FROM sm_storage WHERE key IN ({placeholders}) "
+                "AND (expires_at > ? OR expires_at IS NULL)",
+                (*chunk, current_ts),
+            )
+            for key, value in await self.cursor.fetchall():
+                # Keys are returned as bytes, because of the text factory
+                values[key.decode("utf-8")] = value
+        return values
+
+    async def set_many(self, items: Mapping[str, bytes], expires: int | None = None) -> None:
+        current_ts = int(time.time())
+        expires_at = current_ts + expires if expires is not None else None
+        # All rows are written in a single transaction
+        await self.cursor.executemany(
+            "INSERT OR REPLACE INTO sm_storage (key, value, expires_at) VALUES (?, ?, ?)",
+            [(key, value, expires_at) for key, value in items.items()],
+        )
+        await self.conn.commit()
+
+    async def delete_many(self, keys: Sequence[str]) -> None:
+        await self.cursor.executemany("DELETE FROM sm_storage WHERE key = ?", [(key,) for key in keys])
+        await self.conn.commit()
+
     async def has(self, key: str) -> bool:
         current_ts = int(time.time())
         await self.cursor.execute(
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import math
+import time
+from collections.abc import Awaitable
+from typing import Callable, Generic, TypeVar
+
+from structlog.stdlib import get_logger
+
+from machine.storage import PluginStorage
+from machine.utils.single_flight import SingleFlight
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class TTLCache(Generic[T]):
+    """Cache for the results of expensive lookups, eg. calls to external APIs, kept in plugin storage
+
+    Because results are kept in the storage backend, instances of Slack Machine that share a storage backend (eg.
+    Redis) share the cache as well.
+
+    Results are fresh for `ttl` seconds. For `stale_ttl` seconds after that, the stale result is still returned right
+    away, while a fresh result is fetched in the background (stale-while-revalidate). After that, the result has to be
+    fetched again before it's returned. Concurrent fetches of the same key are coalesced into a single fetch. `None`
+    results are never cached, so failed lookups are retried the next time.
+    """
+
+    def __init__(
+        self,
+        storage: PluginStorage,
+        namespace: str,
+        ttl: float,
+        stale_ttl: float = 0,
+        clock: Callable[[], float] = time.time,
+    ):
+        if ttl < 0 or stale_ttl < 0:
+            raise ValueError("TTLs can't be negative")
+        self._storage = storage
+        self._namespace = namespace
+        self._ttl = ttl
+        self._stale_ttl = stale_ttl
+        # Entries are compared across instances of Slack Machine, so this has to be wall clock time
+        self._clock = clock
+        self._fetches: SingleFlight[str, T | None] = SingleFlight()
+        self._refreshes: set[asyncio.Task[T | None]] = set()
+
+    def _storage_key(self, key: str) -> str:
+        # Keys can be arbitrary user input, so they're hashed to keep them short and safe for every storage backend
+        return f"{self._namespace}:{hashlib.sha256(key.encode('utf-8')).hexdigest()}"
+
+    async def get(self, key: str, fetch: Callable[[], Awaitable[T | None]]) -> T | None:
+        """Get a result from the cache, fetching it if it's not cached or expired
+
+        Args:
+            key: key that identifies the result, eg. a search query
+            fetch: function that fetches the result
+
+        Returns:
+            the (cached) result
+        """
+        if self._ttl == 0:
+            return await fetch()
+        storage_key = self._storage_key(key)
+        entry: tuple[float, T] | None = await self._storage.get(storage_key)
+        if entry is not None:
+            fetched_at, value = entry
+            age = self._clock() - fetched_at
+            if age < self._ttl:
+                return value
+            if age < self._ttl + self._stale_ttl:
+                self._refresh_in_background(storage_key, fetch)
+                return value
+        return await self._fetches.do(storage_key, lambda: self._fetch(storage_key, fetch))
+
+    def _refresh_in_background(self, storage_key: str, fetch: Callable[[], Awaitable[T | None]]) -> None:
+        if storage_key in self._fetches:
+            return
+        task = asyncio.create_task(self._fetches.do(storage_key, lambda: self._fetch(storage_key, fetch)))
+        # Keep a reference to the task, so it's not garbage collected before it's done
+        self._refreshes.add(task)
+        task.add_done_callback(self._refresh_done)
+
+    def _refresh_done(self, task: asyncio.Task[T | None]) -> None:
+        self._refreshes.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Could not refresh cached result", namespace=self._namespace, error=str(task.exception()))
+
+    async def _fetch(self, storage_key: str, fetch: Callable[[], Awaitable[T | None]]) -> T | None:
+        value = await fetch()
+        if value is not None:
+            expires = math.ceil(self._ttl + self._stale_ttl)
+            await self._storage.set(storage_key, (self._clock(), value), expires=expires)
+        return value
+
+    async def invalidate(self, key: str) -> None:
+        """Remove a result from the cache
+
+        Args:
+            key: key that identifies the result
+        """
+        await self._storage.delete(self._storage_key(key))
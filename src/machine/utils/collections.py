@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+from collections import OrderedDict
 from collections.abc import Iterable, Iterator, Mapping, MutableMapping
-from typing import TypeVar, cast
+from typing import Any, TypeVar, cast
 
 KT = TypeVar("KT", bound=str)
 VT = TypeVar("VT")
@@ -80,3 +81,38 @@ class CaseInsensitiveDict(MutableMapping[KT, VT]):
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}({dict(self.items())!r})"
+
+
+class LRUDict(OrderedDict[KT, VT]):
+    """A ``dict`` that holds at most ``max_size`` items, evicting the least recently used item first
+
+    Both reading (``d[key]`` and ``d.get(key)``) and writing an item mark it as recently used.
+    """
+
+    def __init__(self, max_size: int, data: Mapping[KT, VT] | None = None):
+        if max_size < 1:
+            raise ValueError("Maximum size must be at least 1")
+        super().__init__()
+        self.max_size = max_size
+        if data is not None:
+            self.update(data)
+
+    def __getitem__(self, key: KT) -> VT:
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def get(self, key: KT, default: Any = None) -> Any:
+        if key in self:
+            return self[key]
+        return default
+
+    def __setitem__(self, key: KT, value: VT) -> None:
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        if len(self) > self.max_size:
+            self.popitem(last=False)
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
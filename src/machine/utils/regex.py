@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import re
+from collections import deque
+from collections.abc import Iterable
+from typing import Any
+
+try:
+    from re import _parser as sre_parse  # type: ignore[attr-defined]
+except ImportError:  # pragma: no cover (Python < 3.11)
+    import sre_parse  # type: ignore[no-redef]
+
+# Characters that `re.IGNORECASE` considers equal to "i", but that don't casefold to "i"
+_FOLD_TRANSLATION = {0x131: "i", 0x307: None}
+
+
+def fold_case(text: str) -> str:
+    """Fold text for case-insensitive literal search
+
+    The result is suitable to search for literals extracted by
+    [`required_literal`][machine.utils.regex.required_literal] from case-insensitive patterns: if a case-insensitive
+    pattern matches `text`, the folded required literal of that pattern is always a substring of the folded text.
+    """
+    return text.casefold().translate(_FOLD_TRANSLATION)
+
+
+class LiteralMatcher:
+    """Find which of a fixed set of literals occur in a text
+
+    Uses an [Aho-Corasick automaton](https://en.wikipedia.org/wiki/Aho%E2%80%93Corasick_algorithm), so the text only
+    needs to be scanned once, regardless of the number of literals.
+    """
+
+    def __init__(self, literals: Iterable[str]):
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[frozenset[str]] = [frozenset()]
+        for literal in set(literals):
+            self._add(literal)
+        self._link()
+
+    def _add(self, literal: str) -> None:
+        state = 0
+        for char in literal:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(frozenset())
+                self._goto[state][char] = next_state
+            state = next_state
+        self._output[state] = self._output[state] | {literal}
+
+    def _link(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] = self._output[next_state] | self._output[self._fail[next_state]]
+
+    def search(self, text: str) -> set[str]:
+        """Find the literals that occur in a text
+
+        Args:
+            text: text to search
+
+        Returns:
+            the literals that occur in the text
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        found: set[str] = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found.update(output[state])
+        return found
+
+
+def required_literal(pattern: re.Pattern[str]) -> tuple[str, bool] | None:
+    """Find the longest literal string that must occur in every match of a regex pattern
+
+    Args:
+        pattern: compiled regex pattern
+
+    Returns:
+        a tuple of the literal and whether the pattern is case-insensitive, or `None` if no required literal could be
+            found. Literals of case-insensitive patterns are folded with
+            [`fold_case`][machine.utils.regex.fold_case].
+    """
+    if not isinstance(pattern.pattern, str) or pattern.flags & re.LOCALE:
+        return None
+    try:
+        parsed = sre_parse.parse(pattern.pattern, pattern.flags)
+    except Exception:  # pragma: no cover (pattern was already compiled, so this should never happen)
+        return None
+    # Inline global flags (eg. `(?i)`) end up in the parsed pattern state, not in `pattern.flags`
+    flags = parsed.state.flags
+    ignore_case = bool(flags & re.IGNORECASE)
+    literals = _collect_literals(parsed, ignore_case)
+    if not literals:
+        return None
+    literal = max(literals, key=len)
+    if ignore_case:
+        literal = fold_case(literal)
+    return literal, ignore_case
+
+
+def _collect_literals(subpattern: Any, ignore_case: bool) -> list[str]:
+    literals: list[str] = []
+    run: list[str] = []
+
+    def end_run() -> None:
+        if run:
+            literals.append("".join(run))
+            run.clear()
+
+    for op, av in subpattern:
+        if op is sre_parse.LITERAL and (not ignore_case or av < 128):
+            run.append(chr(av))
+            continue
+        end_run()
+        if op is sre_parse.SUBPATTERN:
+            _, add_flags, del_flags, p = av
+            # Scoped flags might change the case sensitivity of the group, so we don't look inside
+            if not add_flags and not del_flags:
+                literals.extend(_collect_literals(p, ignore_case))
+        elif op in _REPEATS:
+            min_repeat, _, p = av
+            if min_repeat >= 1:
+                literals.extend(_collect_literals(p, ignore_case))
+    end_run()
+    return literals
+
+
+_REPEATS = {
+    sre_parse.MAX_REPEAT,
+    sre_parse.MIN_REPEAT,
+    getattr(sre_parse, "POSSESSIVE_REPEAT", sre_parse.MAX_REPEAT),
+}
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Hashable
+from typing import Callable, Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class SingleFlight(Generic[K, V]):
+    """Coalesces concurrent calls for the same key into a single call
+
+    While a call for a key is in flight, other callers asking for the same key wait for its result instead of starting
+    their own call. Once the call has finished, the next caller starts a new one. Cancelling one of the waiting callers
+    does not cancel the call for the others.
+    """
+
+    def __init__(self) -> None:
+        self._in_flight: dict[K, asyncio.Task[V]] = {}
+
+    async def do(self, key: K, fn: Callable[[], Awaitable[V]]) -> V:
+        """Call `fn`, unless a call for `key` is already in flight, and return its result
+
+        Args:
+            key: key that identifies the call
+            fn: function that starts the call
+
+        Returns:
+            the result of the call
+        """
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        return await asyncio.shield(task)
+
+    def _finished(self, key: K, task: asyncio.Task[V]) -> None:
+        # A newer call might have been started for the key after this one was forgotten
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+
+    def forget(self, key: K) -> None:
+        """Let the next caller for `key` start a new call, instead of waiting for the one in flight
+
+        Callers that are already waiting still get the result of the call in flight.
+
+        Args:
+            key: key that identifies the call
+        """
+        self._in_flight.pop(key, None)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._in_flight
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from slack_sdk.web.async_client import AsyncWebClient
+
+from machine.clients.api_cache import CachingAsyncWebClient, ResponseCache, create_web_client
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(clock):
+    return ResponseCache({"users.info": 60}, max_size=2, clock=clock)
+
+
+def _request(responses, calls):
+    async def request():
+        calls.append(1)
+        await asyncio.sleep(0)
+        return responses.pop(0)
+
+    return request
+
+
+@pytest.mark.asyncio
+async def test_response_cache_caches_until_ttl_expires(cache, clock):
+    calls = []
+    request = _request(["first", "second"], calls)
+    assert await cache.get("users.info", {"user": "U1"}, request) == "first"
+    clock.now = 59
+    assert await cache.get("users.info", {"user": "U1"}, request) == "first"
+    assert len(calls) == 1
+    clock.now = 60
+    assert await cache.get("users.info", {"user": "U1"}, request) == "second"
+    assert len(calls) == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+@pytest.mark.asyncio
+async def test_response_cache_coalesces_concurrent_requests(cache):
+    calls = []
+    request = _request(["response"], calls)
+    results = await asyncio.gather(*(cache.get("users.info", {"user": "U1"}, request) for _ in range(5)))
+    assert results == ["response"] * 5
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_response_cache_does_not_cache_errors(cache):
+    async def failing():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        await cache.get("users.info", {"user": "U1"}, failing)
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_response_cache_evicts_least_recently_used(cache):
+    calls = []
+    request = _request(["u1", "u2", "u3", "u2-again"], calls)
+    await cache.get("users.info", {"user": "U1"}, request)
+    await cache.get("users.info", {"user": "U2"}, request)
+    await cache.get("users.info", {"user": "U1"}, request)
+    await cache.get("users.info", {"user": "U3"}, request)
+    assert len(cache) == 2
+    assert await cache.get("users.info", {"user": "U1"}, request) == "u1"
+    assert await cache.get("users.info", {"user": "U2"}, request) == "u2-again"
+
+
+@pytest.mark.asyncio
+async def test_response_cache_invalidate(cache):
+    calls = []
+    request = _request(["u1", "u2", "u1-again"], calls)
+    await cache.get("users.info", {"user": "U1", "include_locale": True}, request)
+    await cache.get("users.info", {"user": "U2"}, request)
+    cache.invalidate("users.info", user="U1")
+    assert len(cache) == 1
+    assert await cache.get("users.info", {"user": "U1", "include_locale": True}, request) == "u1-again"
+
+
+@pytest.mark.asyncio
+async def test_response_cache_invalidate_during_request(cache):
+    started = asyncio.Event()
+    release = asyncio.Event()
+    responses = ["stale", "fresh"]
+
+    async def request():
+        response = responses.pop(0)
+        if response == "stale":
+            started.set()
+            await release.wait()
+        return response
+
+    stale = asyncio.create_task(cache.get("users.info", {"user": "U1"}, request))
+    await started.wait()
+    cache.invalidate("users.info", user="U1")
+    # the next call does not wait for the outdated request
+    assert await cache.get("users.info", {"user": "U1"}, request) == "fresh"
+    release.set()
+    assert await stale == "stale"
+    assert await cache.get("users.info", {"user": "U1"}, request) == "fresh"
+
+
+def test_response_cache_max_size_must_be_positive():
+    with pytest.raises(ValueError, match="at least 1"):
+        ResponseCache({}, max_size=0)
+
+
+@pytest.mark.asyncio
+async def test_caching_web_client_only_caches_read_methods(mocker):
+    api_call = mocker.patch.object(AsyncWebClient, "api_call", autospec=True, return_value={"ok": True})
+    client = CachingAsyncWebClient(token="xoxb-token", cache=ResponseCache({"users.info": 60}))
+
+    await client.users_info(user="U1")
+    await client.users_info(user="U1")
+    assert api_call.call_count == 1
+
+    await client.chat_postMessage(channel="C1", text="hi")
+    await client.chat_postMessage(channel="C1", text="hi")
+    assert api_call.call_count == 3
+
+
+def test_create_web_client():
+    settings = {"SLACK_BOT_TOKEN": "xoxb-token"}
+    assert type(create_web_client(settings)) is AsyncWebClient
+
+    client = create_web_client({**settings, "WEB_API_CACHE": True, "WEB_API_CACHE_TTLS": {"team.info": 0}})
+    assert isinstance(client, CachingAsyncWebClient)
+    assert client.cache.caches("users.info")
+    assert not client.cache.caches("team.info")
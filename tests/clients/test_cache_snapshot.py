@@ -0,0 +1,98 @@
+import zlib
+
+import pytest
+
+from machine.clients.cache_snapshot import (
+    CacheSnapshot,
+    FileCacheSnapshotStore,
+    StorageCacheSnapshotStore,
+    create_cache_snapshot_store,
+)
+from machine.models import Channel, User
+from machine.storage.backends.memory import MemoryStorage
+
+USER = {
+    "id": "U1",
+    "name": "john",
+    "is_bot": False,
+    "updated": 0,
+    "is_app_user": False,
+    "profile": {
+        "avatar_hash": "abc",
+        "real_name": "John Doe",
+        "display_name": "Johnny",
+        "real_name_normalized": "John Doe",
+        "display_name_normalized": "Johnny",
+        "team": "my-team",
+        "email": "john@my-team.org",
+    },
+}
+CHANNEL = {"id": "C1", "created": 0, "is_archived": False, "is_org_shared": False, "name": "channel-1"}
+
+
+def test_encode_decode():
+    snapshot = CacheSnapshot.from_caches([User.model_validate(USER)], [Channel.model_validate(CHANNEL)])
+    decoded = CacheSnapshot.decode(snapshot.encode())
+    assert decoded is not None
+    assert decoded.created_at == snapshot.created_at
+    assert [User.model_validate(u) for u in decoded.users] == [User.model_validate(USER)]
+    assert [Channel.model_validate(c) for c in decoded.channels] == [Channel.model_validate(CHANNEL)]
+
+
+def test_decode_invalid():
+    assert CacheSnapshot.decode(b"garbage") is None
+    assert CacheSnapshot.decode(zlib.compress(b'{"version": 0}')) is None
+
+
+@pytest.mark.asyncio
+async def test_storage_store():
+    store = StorageCacheSnapshotStore(MemoryStorage({}))
+    assert await store.load() is None
+    await store.save(CacheSnapshot(users=[USER]))
+    snapshot = await store.load()
+    assert snapshot is not None
+    assert snapshot.users == [USER]
+
+
+@pytest.mark.asyncio
+async def test_storage_store_splits_snapshot_in_chunks():
+    storage = MemoryStorage({})
+    store = StorageCacheSnapshotStore(storage, chunk_size=100)
+    users = [{**USER, "id": f"U{i}", "name": f"user{i}"} for i in range(50)]
+    await store.save(CacheSnapshot(users=users))
+    first_keys = set(storage._storage)
+    assert len(first_keys) > 2
+    snapshot = await store.load()
+    assert snapshot is not None
+    assert snapshot.users == users
+
+    # the chunks of the previous snapshot are removed
+    await store.save(CacheSnapshot(channels=[CHANNEL]))
+    assert set(storage._storage) & first_keys == {"machine.slack_cache_snapshot"}
+    snapshot = await store.load()
+    assert snapshot is not None
+    assert snapshot.channels == [CHANNEL]
+
+    # incomplete snapshots are ignored
+    chunk_key = next(key for key in storage._storage if key != "machine.slack_cache_snapshot")
+    await storage.delete(chunk_key)
+    assert await store.load() is None
+
+
+@pytest.mark.asyncio
+async def test_file_store(tmp_path):
+    store = FileCacheSnapshotStore(tmp_path / "snapshot")
+    assert await store.load() is None
+    await store.save(CacheSnapshot(channels=[CHANNEL]))
+    snapshot = await store.load()
+    assert snapshot is not None
+    assert snapshot.channels == [CHANNEL]
+    assert [p.name for p in tmp_path.iterdir()] == ["snapshot"]
+
+
+def test_create_cache_snapshot_store(tmp_path):
+    storage = MemoryStorage({})
+    assert create_cache_snapshot_store({}, storage) is None
+    assert isinstance(create_cache_snapshot_store({"CACHE_SNAPSHOT": "storage"}, storage), StorageCacheSnapshotStore)
+    store = create_cache_snapshot_store({"CACHE_SNAPSHOT": str(tmp_path / "snapshot")}, storage)
+    assert isinstance(store, FileCacheSnapshotStore)
@@ -0,0 +1,81 @@
+from machine.clients.compact_cache import CHANNEL_CODEC, USER_CODEC, CompactMap, KeyIndex
+from machine.models import Channel, User
+
+AVATAR = "https://avatars.slack-edge.com/2020-01-01/1234_abcdef"
+GRAVATAR = "https://secure.gravatar.com/avatar/0a24b.jpg?s={0}&d=https%3A%2F%2Fa.slack-edge.com%2Fava_0010-{0}.png"
+
+
+def _user(**profile):
+    return User.model_validate({
+        "id": "U1",
+        "team_id": "T1",
+        "name": "john",
+        "is_bot": False,
+        "updated": 0,
+        "is_app_user": False,
+        "tz": "Europe/Amsterdam",
+        "profile": {
+            "avatar_hash": "abc",
+            "real_name": "John Doe",
+            "display_name": "Johnny",
+            "real_name_normalized": "John Doe",
+            "display_name_normalized": "Johnny",
+            "team": "T1",
+            "status_expiration": 0,
+            **profile,
+        },
+    })
+
+
+def test_user_round_trip():
+    for template in [AVATAR + "_{0}.jpg", GRAVATAR]:
+        images = {f"image_{size}": template.format(size) for size in [24, 32, 48, 72, 192, 512]}
+        user = _user(**images, image_original=AVATAR + "_original.jpg")
+        record = USER_CODEC.encode(user)
+        assert USER_CODEC.decode(record) == user
+        # only the 24px image is stored
+        assert sum(isinstance(value, str) and "24" in value for value in record[4]) == 1
+    # images that can't be derived are kept as they are
+    user = _user(image_24=AVATAR + "_24.jpg", image_48="https://example.com/other.png")
+    assert USER_CODEC.decode(USER_CODEC.encode(user)) == user
+
+
+def test_channel_round_trip():
+    channel = Channel.model_validate({
+        "id": "C1",
+        "name": "general",
+        "created": 0,
+        "is_archived": False,
+        "is_org_shared": False,
+        "topic": {"value": "Talk", "creator": "U1", "last_set": 1},
+        "previous_names": ["old"],
+    })
+    assert CHANNEL_CODEC.decode(CHANNEL_CODEC.encode(channel)) == channel
+
+
+def test_user_round_trip_keeps_false_and_zero_values():
+    user = _user(image_24=AVATAR + "_24.jpg", image_32=AVATAR + "_32.jpg", status_expiration=0)
+    decoded = USER_CODEC.decode(USER_CODEC.encode(user))
+    assert decoded == user
+    assert decoded.profile.status_expiration == 0
+    assert decoded.profile.image_48 is None
+
+
+def test_compact_map():
+    users = CompactMap(USER_CODEC)
+    user = _user()
+    users["U1"] = user
+    assert "U1" in users
+    assert users["U1"] == user
+    assert users.field("U1", "updated") == 0
+    # recently used models are kept, until they're replaced
+    assert users["U1"] is users["U1"]
+    renamed = _user(display_name="John")
+    users["U1"] = renamed
+    assert users["U1"] == renamed
+    assert users.get("U2") is None
+    assert list(users.values()) == [renamed]
+    by_email = KeyIndex(users, lambda u: u.id, {"john@example.com": renamed})
+    assert by_email["john@example.com"] == renamed
+    del users["U1"]
+    assert len(users) == 0
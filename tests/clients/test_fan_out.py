@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from machine.clients.fan_out import fan_out
+
+
+@pytest.mark.asyncio
+async def test_fan_out_limits_concurrency():
+    in_flight = 0
+    max_in_flight = 0
+
+    async def send(recipient):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.001)
+        in_flight -= 1
+        return {"ok": True, "channel": recipient}
+
+    results = await fan_out([f"U{i}" for i in range(50)], send, concurrency=5)
+    assert max_in_flight == 5
+    assert list(results) == [f"U{i}" for i in range(50)]
+    assert all(result.ok for result in results.values())
+    assert results["U7"].response == {"ok": True, "channel": "U7"}
+
+
+@pytest.mark.asyncio
+async def test_fan_out_records_failures_per_recipient():
+    async def send(recipient):
+        if recipient == "U2":
+            raise RuntimeError("user_not_found")
+        return {"ok": True}
+
+    results = await fan_out(["U1", "U2", "U3"], send)
+    assert [result.ok for result in results.values()] == [True, False, True]
+    assert isinstance(results["U2"].error, RuntimeError)
+    assert results["U2"].response is None
+
+
+@pytest.mark.asyncio
+async def test_fan_out_sends_once_per_recipient():
+    sent = []
+
+    async def send(recipient):
+        sent.append(recipient)
+        return {"ok": True}
+
+    results = await fan_out(["U1", "U2", "U1"], send)
+    assert sent == ["U1", "U2"]
+    assert list(results) == ["U1", "U2"]
+    assert await fan_out([], send) == {}
+
+
+@pytest.mark.asyncio
+async def test_fan_out_validates_concurrency():
+    async def send(recipient):
+        return {"ok": True}
+
+    with pytest.raises(ValueError, match="at least 1"):
+        await fan_out(["U1"], send, concurrency=0)
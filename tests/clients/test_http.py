@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import pytest
+
+from machine.clients.http import HttpClientPool
+
+
+@pytest.mark.asyncio
+async def test_http_client_pool_reuses_clients_per_name():
+    pool = HttpClientPool({})
+    default = pool.get()
+    assert pool.get() is default
+    assert pool.get("other") is not default
+    await pool.close()
+    assert default.is_closed
+
+
+@pytest.mark.asyncio
+async def test_http_client_pool_options():
+    pool = HttpClientPool({
+        "HTTP_TIMEOUT": 5,
+        "HTTP_CLIENTS": {"memegen": {"base_url": "https://api.memegen.link", "timeout": 2}},
+    })
+    default = pool.get()
+    memegen = pool.get("memegen")
+    assert default.timeout.read == 5
+    assert default.timeout.connect == 60
+    assert memegen.timeout.read == 2
+    assert str(memegen.base_url) == "https://api.memegen.link"
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_http_client_pool_recreates_closed_clients():
+    pool = HttpClientPool()
+    client = pool.get()
+    await client.aclose()
+    assert pool.get() is not client
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_http_client_pool_proxy(mocker):
+    client = mocker.patch("machine.clients.http.httpx.AsyncClient")
+    pool = HttpClientPool({
+        "HTTP_PROXY": "http://slack-proxy:3128",
+        "HTTP_CLIENTS_PROXY": "http://proxy:3128",
+        "HTTP_CLIENTS": {"direct": {"proxy": None}},
+    })
+    pool.get()
+    assert client.call_args.kwargs["proxy"] == "http://proxy:3128"
+    pool.get("direct")
+    assert client.call_args.kwargs["proxy"] is None
+
+
+@pytest.mark.asyncio
+async def test_http_client_pool_does_not_use_slack_proxy(mocker):
+    client = mocker.patch("machine.clients.http.httpx.AsyncClient")
+    HttpClientPool({"HTTP_PROXY": "http://slack-proxy:3128"}).get()
+    assert client.call_args.kwargs["proxy"] is None
@@ -0,0 +1,35 @@
+from types import SimpleNamespace
+
+from machine.clients.name_index import NameIndex, normalize_name
+
+
+def _entity(*names):
+    return SimpleNamespace(names=names)
+
+
+def test_normalize_name():
+    assert normalize_name("General") == "general"
+    assert normalize_name("#General") == "#general"
+
+
+def test_name_index():
+    index = NameIndex(lambda entity: entity.names, prefix="#")
+    general = _entity("general", None)
+    random = _entity("random")
+    entities = {"C1": general, "C2": random}
+    index.rebuild(entities)
+    assert index.lookup("#GENERAL", entities) is general
+    # only a single prefix is removed, and other prefixes aren't
+    assert index.lookup("##general", entities) is None
+    assert index.lookup("@general", entities) is None
+    assert index.lookup("other", entities) is None
+    # renamed entities are only found by their new name
+    renamed = _entity("off-topic")
+    index.remove("C2", random)
+    entities["C2"] = renamed
+    index.add("C2", renamed)
+    assert index.lookup("random", entities) is None
+    assert index.lookup("off-topic", entities) is renamed
+    # entities that are no longer cached are not found
+    del entities["C1"]
+    assert index.lookup("general", entities) is None
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from slack_sdk.errors import SlackApiError
+
+from machine.clients.fan_out import fan_out
+from machine.clients.rate_limit import OutboundScheduler, TokenBucket, create_outbound_scheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def sleeps(mocker, clock):
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+        clock.now += delay
+
+    mocker.patch("machine.clients.rate_limit.asyncio.sleep", side_effect=sleep)
+    return delays
+
+
+def _rate_limited_error(mocker, retry_after="2"):
+    response = mocker.MagicMock()
+    response.__getitem__.return_value = "ratelimited"
+    response.headers = {"Retry-After": retry_after}
+    return SlackApiError("rate limited", response)
+
+
+def test_token_bucket_allows_burst_then_paces():
+    bucket = TokenBucket(rate=1.0, capacity=3)
+    assert [bucket.reserve(10.0) for _ in range(5)] == [10.0, 10.0, 10.0, 11.0, 12.0]
+    # The bucket has refilled after a quiet period
+    assert bucket.reserve(20.0) == 20.0
+
+
+def test_token_bucket_not_before():
+    bucket = TokenBucket(rate=1.0, capacity=1)
+    assert bucket.reserve(10.0, not_before=15.0) == 15.0
+    assert bucket.reserve(10.0) == 16.0
+
+
+def test_token_bucket_validates_arguments():
+    with pytest.raises(ValueError, match="Rate"):
+        TokenBucket(rate=0, capacity=1)
+    with pytest.raises(ValueError, match="Capacity"):
+        TokenBucket(rate=1, capacity=0)
+
+
+@pytest.mark.asyncio
+async def test_scheduler_paces_messages_per_channel(clock, sleeps):
+    scheduler = OutboundScheduler(channel_rate=(1.0, 2), clock=clock)
+
+    async def post():
+        return "ok"
+
+    for _ in range(3):
+        assert await scheduler.call("chat.postMessage", post, channel="C1") == "ok"
+    # Other channels have their own budget
+    await scheduler.call("chat.postMessage", post, channel="C2")
+    assert sleeps == [pytest.approx(1.0)]
+    stats = scheduler.stats()
+    assert (stats.calls, stats.throttled, stats.queue_depth) == (4, 1, 0)
+    assert stats.max_wait == pytest.approx(1.0)
+
+
+@pytest.mark.asyncio
+async def test_scheduler_paces_messages_to_many_channels(clock, sleeps):
+    scheduler = OutboundScheduler(method_rates={"chat.postMessage": (1.0, 2)}, clock=clock)
+
+    async def post():
+        return "ok"
+
+    # Every channel has room for a burst, but the workspace as a whole only allows a burst of 2 messages
+    results = await fan_out(
+        [f"C{i}" for i in range(4)],
+        lambda channel_id: scheduler.call("chat.postMessage", post, channel=channel_id),
+        concurrency=4,
+    )
+    assert all(result.ok for result in results.values())
+    assert sleeps == [pytest.approx(1.0)] * 2
+    assert scheduler.stats().throttled == 2
+
+
+@pytest.mark.asyncio
+async def test_scheduler_paces_methods_by_tier(clock, sleeps):
+    scheduler = OutboundScheduler(method_tiers={"pins.add": 1}, clock=clock)
+
+    async def pin():
+        return "ok"
+
+    await scheduler.call("pins.add", pin, channel="C1")
+    await scheduler.call("pins.add", pin, channel="C2")
+    assert sleeps == [pytest.approx(60.0)]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_retries_after_rate_limit(mocker, clock, sleeps):
+    scheduler = OutboundScheduler(clock=clock)
+    responses = [_rate_limited_error(mocker), "ok"]
+
+    async def update():
+        result = responses.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    assert await scheduler.call("chat.update", update) == "ok"
+    assert sleeps == [pytest.approx(2.0)]
+    assert scheduler.stats().rate_limited == 1
+
+
+@pytest.mark.asyncio
+async def test_scheduler_gives_up_after_max_retries(mocker, clock, sleeps):
+    scheduler = OutboundScheduler(max_retries=1, clock=clock)
+
+    async def update():
+        raise _rate_limited_error(mocker)
+
+    with pytest.raises(SlackApiError):
+        await scheduler.call("chat.update", update)
+    assert scheduler.stats().calls == 2
+
+
+@pytest.mark.asyncio
+async def test_scheduler_does_not_retry_trigger_bound_methods(mocker, clock, sleeps):
+    scheduler = OutboundScheduler(clock=clock)
+
+    async def open_view():
+        raise _rate_limited_error(mocker)
+
+    with pytest.raises(SlackApiError):
+        await scheduler.call("views.open", open_view)
+    assert scheduler.stats().calls == 1
+    assert sleeps == []
+    # other calls of the method still wait until the rate limit has passed
+    with pytest.raises(SlackApiError):
+        await scheduler.call("views.open", open_view)
+    assert sleeps == [pytest.approx(2.0)]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_does_not_retry_other_errors(mocker, clock):
+    scheduler = OutboundScheduler(clock=clock)
+    response = mocker.MagicMock()
+    response.__getitem__.return_value = "channel_not_found"
+    calls = []
+
+    async def post():
+        calls.append(1)
+        raise SlackApiError("not found", response)
+
+    with pytest.raises(SlackApiError):
+        await scheduler.call("chat.postMessage", post, channel="C1")
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_scheduler_reports_queue_depth():
+    scheduler = OutboundScheduler(channel_rate=(10.0, 1))
+    started = asyncio.Event()
+
+    async def post():
+        started.set()
+        return "ok"
+
+    first = asyncio.create_task(scheduler.call("chat.postMessage", post, channel="C1"))
+    second = asyncio.create_task(scheduler.call("chat.postMessage", post, channel="C1"))
+    await started.wait()
+    assert scheduler.queue_depth == 1
+    assert scheduler.queue_depth_by_method() == {"chat.postMessage": 1}
+    await asyncio.gather(first, second)
+    assert scheduler.queue_depth == 0
+
+
+def test_create_outbound_scheduler():
+    assert isinstance(create_outbound_scheduler({}), OutboundScheduler)
+    assert create_outbound_scheduler({"OUTBOUND_RATE_LIMIT": False}) is None
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from machine.clients.send_queue import SendQueue
+
+
+class FakeSender:
+    def __init__(self, delay: float = 0.0):
+        self.sent = []
+        self.delay = delay
+
+    async def __call__(self, channel_id, text, **kwargs):
+        await asyncio.sleep(self.delay)
+        self.sent.append((channel_id, text, kwargs))
+        return {"ok": True, "ts": str(len(self.sent))}
+
+
+@pytest.mark.asyncio
+async def test_send_queue_merges_consecutive_plain_text_messages():
+    sender = FakeSender()
+    queue = SendQueue(sender, window=0.01)
+    responses = await asyncio.gather(*(queue.send("C1", f"line {i}", source="plugin") for i in range(3)))
+    assert sender.sent == [("C1", "line 0\nline 1\nline 2", {})]
+    assert responses == [{"ok": True, "ts": "1"}] * 3
+    assert queue.queue_depth() == 0
+
+
+@pytest.mark.asyncio
+async def test_send_queue_keeps_order_and_does_not_merge_other_sources_or_rich_messages():
+    sender = FakeSender()
+    queue = SendQueue(sender, window=0.01)
+    await asyncio.gather(
+        queue.send("C1", "a", source="plugin-1"),
+        queue.send("C1", "b", source="plugin-2"),
+        queue.send("C1", "c", source="plugin-2", blocks=[{"type": "divider"}]),
+        queue.send("C1", "d", source="plugin-2"),
+    )
+    assert [text for _, text, _ in sender.sent] == ["a", "b", "c", "d"]
+
+
+@pytest.mark.asyncio
+async def test_send_queue_has_a_queue_per_thread():
+    sender = FakeSender()
+    queue = SendQueue(sender, window=0.01)
+    await asyncio.gather(
+        queue.send("C1", "a", source="plugin"),
+        queue.send("C1", "b", source="plugin", thread_ts="123.456"),
+        queue.send("C1", "c", source="plugin", thread_ts="123.456"),
+    )
+    assert sorted(sender.sent, key=lambda sent: sent[1]) == [
+        ("C1", "a", {}),
+        ("C1", "b\nc", {"thread_ts": "123.456"}),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_send_queue_respects_max_text_length():
+    sender = FakeSender()
+    queue = SendQueue(sender, window=0.01, max_text_length=5)
+    await asyncio.gather(*(queue.send("C1", text, source="plugin") for text in ["ab", "cd", "ef"]))
+    assert [text for _, text, _ in sender.sent] == ["ab\ncd", "ef"]
+
+
+@pytest.mark.asyncio
+async def test_send_queue_propagates_errors_to_merged_messages():
+    async def failing(channel_id, text, **kwargs):
+        raise RuntimeError("boom")
+
+    queue = SendQueue(failing, window=0.01)
+    results = await asyncio.gather(*(queue.send("C1", "hi", source="plugin") for _ in range(2)), return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_send_queue_close_waits_for_queued_messages():
+    sender = FakeSender(delay=0.01)
+    queue = SendQueue(sender, window=0)
+    task = asyncio.create_task(queue.send("C1", "hi"))
+    await asyncio.sleep(0)
+    await queue.close()
+    assert sender.sent == [("C1", "hi", {})]
+    assert (await task)["ok"]
+
+
+def test_send_queue_window_cant_be_negative():
+    with pytest.raises(ValueError, match="negative"):
+        SendQueue(FakeSender(), window=-1)
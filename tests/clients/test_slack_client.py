@@ -1,16 +1,21 @@
 from __future__ import annotations
 
-from typing import Any
+import asyncio
 from zoneinfo import ZoneInfo
 
 import pytest
+from slack_sdk.errors import SlackApiError
 from slack_sdk.socket_mode.aiohttp import SocketModeClient
-from slack_sdk.socket_mode.request import SocketModeRequest
 from slack_sdk.web.async_client import AsyncWebClient
 
-from machine.clients.slack import SlackClient, id_for_channel, id_for_user
+from machine.clients.api_cache import CachingAsyncWebClient, ResponseCache
+from machine.clients.cache_snapshot import CacheSnapshot, StorageCacheSnapshotStore
+from machine.clients.compact_cache import CompactMap
+from machine.clients.rate_limit import OutboundScheduler
+from machine.clients.slack import _USER_LIST, SlackClient, _validate_in_chunks, id_for_channel, id_for_user
 from machine.models.channel import Channel
 from machine.models.user import User
+from machine.storage.backends.memory import MemoryStorage
 
 # TODO: more tests
 
@@ -95,10 +100,6 @@ def slack_client(mocker, socket_mode_client, web_client):
     return client
 
 
-def create_req(event: dict[str, Any]) -> SocketModeRequest:
-    return SocketModeRequest("events_api", "my_id", {"event": event})
-
-
 def test_id_for_user(user):
     assert id_for_user(user) == "U1"
     assert id_for_user("U2") == "U2"
@@ -120,19 +121,23 @@ def test_register_handler(slack_client, socket_mode_client):
     assert len(socket_mode_client.socket_mode_request_listeners) == 1
 
 
+def test_cache_event_types(slack_client):
+    assert "team_join" in slack_client.cache_event_types
+    assert "channel_rename" in slack_client.cache_event_types
+    assert "message" not in slack_client.cache_event_types
+
+
 @pytest.mark.asyncio
-async def test_process_users_channels(slack_client, socket_mode_client):
-    req = create_req({"type": "foo"})
-    await slack_client._process_users_channels(socket_mode_client, req)
-    socket_mode_client.send_socket_mode_response.assert_called_once()
+async def test_handle_cache_event_ignores_other_events(slack_client):
+    await slack_client.handle_cache_event({"type": "foo"})
+    slack_client._on_team_join.assert_not_called()
+    slack_client._on_channel_updated.assert_not_called()
 
 
 @pytest.mark.asyncio
-async def test_process_users_channels_team_join(slack_client, socket_mode_client, user_dict):
+async def test_handle_cache_event_team_join(slack_client, user_dict):
     event = {"type": "team_join", "user": user_dict}
-    req = create_req(event)
-    await slack_client._process_users_channels(socket_mode_client, req)
-    socket_mode_client.send_socket_mode_response.assert_called_once()
+    await slack_client.handle_cache_event(event)
     slack_client._on_team_join.assert_called_once_with(event)
     assert len(slack_client._users) == 1
     assert "U1" in slack_client._users
@@ -143,11 +148,9 @@ async def test_process_users_channels_team_join(slack_client, socket_mode_client
 
 
 @pytest.mark.asyncio
-async def test_process_users_channels_team_join_no_email(slack_client, socket_mode_client, user_dict_no_email):
+async def test_handle_cache_event_team_join_no_email(slack_client, user_dict_no_email):
     event = {"type": "team_join", "user": user_dict_no_email}
-    req = create_req(event)
-    await slack_client._process_users_channels(socket_mode_client, req)
-    socket_mode_client.send_socket_mode_response.assert_called_once()
+    await slack_client.handle_cache_event(event)
     slack_client._on_team_join.assert_called_once_with(event)
     assert len(slack_client._users) == 1
     assert "U1" in slack_client._users
@@ -156,11 +159,9 @@ async def test_process_users_channels_team_join_no_email(slack_client, socket_mo
 
 
 @pytest.mark.asyncio
-async def test_process_users_channels_user_change(slack_client, socket_mode_client, user_dict):
+async def test_handle_cache_event_user_change(slack_client, user_dict):
     event = {"type": "user_change", "user": user_dict}
-    req = create_req(event)
-    await slack_client._process_users_channels(socket_mode_client, req)
-    socket_mode_client.send_socket_mode_response.assert_called_once()
+    await slack_client.handle_cache_event(event)
     slack_client._on_user_change.assert_called_once_with(event)
     assert len(slack_client._users) == 1
     assert "U1" in slack_client._users
@@ -168,12 +169,10 @@ async def test_process_users_channels_user_change(slack_client, socket_mode_clie
 
 
 @pytest.mark.asyncio
-async def test_process_users_channels_channel_created(slack_client, socket_mode_client, web_client, channel_dict):
+async def test_handle_cache_event_channel_created(slack_client, web_client, channel_dict):
     web_client.conversations_info.return_value = {"channel": channel_dict}
     event = {"type": "channel_created", "channel": channel_dict}
-    req = create_req(event)
-    await slack_client._process_users_channels(socket_mode_client, req)
-    socket_mode_client.send_socket_mode_response.assert_called_once()
+    await slack_client.handle_cache_event(event)
     slack_client._on_channel_created.assert_called_once_with(event)
     assert len(slack_client._channels) == 1
     assert "C1" in slack_client._channels
@@ -181,23 +180,19 @@ async def test_process_users_channels_channel_created(slack_client, socket_mode_
 
 
 @pytest.mark.asyncio
-async def test_process_users_channels_channel_deleted(slack_client, socket_mode_client, channel):
+async def test_handle_cache_event_channel_deleted(slack_client, channel):
     slack_client._channels["C1"] = channel
     assert len(slack_client._channels) == 1
     assert "C1" in slack_client._channels
     event = {"type": "channel_deleted", "channel": "C1"}
-    req = create_req(event)
-    await slack_client._process_users_channels(socket_mode_client, req)
-    socket_mode_client.send_socket_mode_response.assert_called_once()
+    await slack_client.handle_cache_event(event)
     slack_client._on_channel_deleted.assert_called_once_with(event)
     assert len(slack_client._channels) == 0
     assert "C1" not in slack_client._channels
 
 
 @pytest.mark.asyncio
-async def test_process_users_channels_channel_rename(
-    slack_client, socket_mode_client, web_client, channel_dict, channel
-):
+async def test_handle_cache_event_channel_rename(slack_client, web_client, channel_dict, channel):
     slack_client._channels["C1"] = channel
     assert len(slack_client._channels) == 1
     assert "C1" in slack_client._channels
@@ -205,9 +200,7 @@ async def test_process_users_channels_channel_rename(
     modified_channel = {**channel_dict, **{"name": "channel-2"}}
     web_client.conversations_info.return_value = {"channel": modified_channel}
     event = {"type": "channel_rename", "channel": channel_dict}
-    req = create_req(event)
-    await slack_client._process_users_channels(socket_mode_client, req)
-    socket_mode_client.send_socket_mode_response.assert_called_once()
+    await slack_client.handle_cache_event(event)
     slack_client._on_channel_updated.assert_called_once_with(event)
     assert len(slack_client._channels) == 1
     assert "C1" in slack_client._channels
@@ -215,9 +208,7 @@ async def test_process_users_channels_channel_rename(
 
 
 @pytest.mark.asyncio
-async def test_process_users_channels_channel_archive(
-    slack_client, socket_mode_client, web_client, channel_dict, channel
-):
+async def test_handle_cache_event_channel_archive(slack_client, web_client, channel_dict, channel):
     slack_client._channels["C1"] = channel
     assert len(slack_client._channels) == 1
     assert "C1" in slack_client._channels
@@ -225,9 +216,7 @@ async def test_process_users_channels_channel_archive(
     modified_channel = {**channel_dict, **{"is_archived": True}}
     web_client.conversations_info.return_value = {"channel": modified_channel}
     event = {"type": "channel_rename", "channel": "C1"}
-    req = create_req(event)
-    await slack_client._process_users_channels(socket_mode_client, req)
-    socket_mode_client.send_socket_mode_response.assert_called_once()
+    await slack_client.handle_cache_event(event)
     slack_client._on_channel_updated.assert_called_once_with(event)
     assert len(slack_client._channels) == 1
     assert "C1" in slack_client._channels
@@ -235,16 +224,336 @@ async def test_process_users_channels_channel_archive(
 
 
 @pytest.mark.asyncio
-async def test_get_user_by_id(slack_client, socket_mode_client, user_dict):
+async def test_get_user_by_id(slack_client, user_dict):
     event = {"type": "team_join", "user": user_dict}
-    req = create_req(event)
-    await slack_client._process_users_channels(socket_mode_client, req)
+    await slack_client.handle_cache_event(event)
     assert slack_client.get_user_by_id("U1") == User.model_validate(user_dict)
 
 
 @pytest.mark.asyncio
-async def test_get_user_by_email(slack_client, socket_mode_client, user_dict):
+async def test_get_user_by_email(slack_client, user_dict):
     event_with_email = {"type": "team_join", "user": user_dict}
-    req_with_email = create_req(event_with_email)
-    await slack_client._process_users_channels(socket_mode_client, req_with_email)
+    await slack_client.handle_cache_event(event_with_email)
     assert slack_client.get_user_by_email("john@my-team.org") == User.model_validate(user_dict)
+
+
+def _paginated(key, items):
+    return {key: items, "response_metadata": {"next_cursor": ""}}
+
+
+@pytest.mark.asyncio
+async def test_cache_all_users_skips_unchanged_and_removes_stale(slack_client, web_client, user_dict, mocker):
+    slack_client._register_user({**user_dict, "id": "U2", "profile": {**user_dict["profile"], "email": "x@y.org"}})
+    slack_client._register_user(user_dict)
+    cached_user = slack_client._users["U1"]
+    web_client.users_list.return_value = _paginated("members", [user_dict])
+    await slack_client.cache_all_users()
+    assert list(slack_client._users) == ["U1"]
+    assert slack_client._users["U1"] is cached_user
+    assert list(slack_client._users_by_email) == ["john@my-team.org"]
+    web_client.users_list.return_value = _paginated("members", [{**user_dict, "name": "jon", "updated": 1}])
+    await slack_client.cache_all_users()
+    assert slack_client._users["U1"].name == "jon"
+
+
+@pytest.mark.asyncio
+async def test_setup_warm_starts_from_snapshot(socket_mode_client, web_client, user_dict, channel_dict):
+    store = StorageCacheSnapshotStore(MemoryStorage({}))
+    await store.save(CacheSnapshot(users=[user_dict], channels=[channel_dict]))
+    client = SlackClient(socket_mode_client, ZoneInfo("UTC"), store)
+    web_client.auth_test.return_value = {"bot_id": "B1"}
+    web_client.bots_info.return_value = {"bot": {"user_id": "UBOT", "name": "bot"}}
+    reconciled = asyncio.Event()
+
+    async def users_list(**kwargs):
+        await reconciled.wait()
+        return _paginated("members", [{**user_dict, "name": "jon", "updated": 1}])
+
+    web_client.users_list.side_effect = users_list
+    web_client.conversations_list.return_value = _paginated("channels", [])
+    await client.setup()
+    # the caches are served from the snapshot while reconciling in the background
+    assert client.users["U1"].name == "john"
+    assert "C1" in client.channels
+    reconciled.set()
+    await client._reconcile_task
+    assert client.users["U1"].name == "jon"
+    assert client.channels == {}
+    snapshot = await store.load()
+    assert snapshot.users[0]["name"] == "jon"
+    assert snapshot.channels == []
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_setup_cold_start_saves_snapshot(socket_mode_client, web_client, user_dict, channel_dict):
+    store = StorageCacheSnapshotStore(MemoryStorage({}))
+    client = SlackClient(socket_mode_client, ZoneInfo("UTC"), store)
+    web_client.auth_test.return_value = {"bot_id": "B1"}
+    web_client.bots_info.return_value = {"bot": {"user_id": "UBOT", "name": "bot"}}
+    web_client.users_list.return_value = _paginated("members", [user_dict])
+    web_client.conversations_list.return_value = _paginated("channels", [channel_dict])
+    await client.setup()
+    assert client._reconcile_task is None
+    snapshot = await store.load()
+    assert [u["id"] for u in snapshot.users] == ["U1"]
+    assert [c["id"] for c in snapshot.channels] == ["C1"]
+
+
+@pytest.mark.asyncio
+async def test_fetch_paginated_data_prefetches_next_page(slack_client):
+    calls = []
+
+    async def users_list(limit, cursor):
+        calls.append(cursor)
+        if cursor is None:
+            return {"members": [1, 2], "response_metadata": {"next_cursor": "page2"}}
+        return {"members": [3], "response_metadata": {"next_cursor": ""}}
+
+    items = []
+    async for item in slack_client.fetch_paginated_data(users_list, "members", "users"):
+        items.append(item)
+        await asyncio.sleep(0)
+        # the second page is requested while the first one is being processed
+        assert calls == [None, "page2"]
+    assert items == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_fetch_paginated_data_waits_for_retry_after(slack_client, mocker):
+    sleep = mocker.patch("machine.clients.slack.asyncio.sleep", autospec=True)
+    response = mocker.MagicMock()
+    response.__getitem__.return_value = "ratelimited"
+    response.headers = {"Retry-After": "3"}
+    responses = [SlackApiError("rate limited", response), {"members": [1], "response_metadata": {}}]
+
+    async def users_list(limit, cursor):
+        result = responses.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    items = [item async for item in slack_client.fetch_paginated_data(users_list, "members", "users")]
+    assert items == [1]
+    sleep.assert_called_once()
+    assert 2 < sleep.call_args.args[0] <= 3
+    assert "users_list" in slack_client._rate_limited_until
+
+
+@pytest.mark.asyncio
+async def test_cache_all_channels_fetches_conversation_types_concurrently(slack_client, web_client, channel_dict):
+    started = []
+    all_started = asyncio.Event()
+
+    async def conversations_list(types, **kwargs):
+        started.append(types)
+        if len(started) == 4:
+            all_started.set()
+        await all_started.wait()
+        channel = {**channel_dict, "id": f"C-{types}"}
+        return {"channels": [channel], "response_metadata": {"next_cursor": ""}}
+
+    web_client.conversations_list.side_effect = conversations_list
+    await asyncio.wait_for(slack_client.cache_all_channels(), 1)
+    assert sorted(started) == ["im", "mpim", "private_channel", "public_channel"]
+    assert len(slack_client.channels) == 4
+
+
+@pytest.mark.asyncio
+async def test_cache_all_channels_keeps_changes_made_during_rebuild(slack_client, web_client, channel_dict, channel):
+    slack_client._channels["C1"] = channel
+    fetching = asyncio.Event()
+    proceed = asyncio.Event()
+
+    async def conversations_list(types, **kwargs):
+        if types == "public_channel":
+            fetching.set()
+            await proceed.wait()
+            channels = [channel_dict, {**channel_dict, "id": "C2", "name": "channel-2"}]
+        else:
+            channels = []
+        return {"channels": channels, "response_metadata": {"next_cursor": ""}}
+
+    web_client.conversations_list.side_effect = conversations_list
+    rebuild = asyncio.create_task(slack_client.cache_all_channels())
+    await fetching.wait()
+    # events that arrive while the cache is rebuilt are more recent than the fetched channels
+    web_client.conversations_info.return_value = {"channel": {**channel_dict, "id": "C3", "name": "channel-3"}}
+    await slack_client.handle_cache_event({"type": "channel_created", "channel": {"id": "C3"}})
+    await slack_client.handle_cache_event({"type": "channel_deleted", "channel": "C1"})
+    # the current cache is still served during the rebuild
+    assert set(slack_client.channels) == {"C3"}
+    proceed.set()
+    await rebuild
+    assert set(slack_client.channels) == {"C2", "C3"}
+    assert slack_client._changed_channel_ids is None
+
+
+@pytest.fixture
+def lazy_slack_client(socket_mode_client):
+    return SlackClient(socket_mode_client, ZoneInfo("UTC"), lazy_cache_size=1)
+
+
+@pytest.mark.asyncio
+async def test_lazy_cache_fetches_and_coalesces_misses(lazy_slack_client, web_client, user_dict):
+    async def users_info(user):
+        await asyncio.sleep(0)
+        return {"user": user_dict}
+
+    web_client.users_info.side_effect = users_info
+    users = await asyncio.gather(lazy_slack_client.fetch_user("U1"), lazy_slack_client.fetch_user("U1"))
+    assert users[0] == users[1] == User.model_validate(user_dict)
+    web_client.users_info.assert_called_once_with(user="U1")
+    # cached now
+    assert await lazy_slack_client.fetch_user("U1") is users[0]
+    assert web_client.users_info.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_lazy_cache_is_bounded(lazy_slack_client, web_client, channel_dict):
+    web_client.conversations_info.side_effect = [
+        {"channel": channel_dict},
+        {"channel": {**channel_dict, "id": "C2"}},
+    ]
+    await lazy_slack_client.ensure_cached(channel_id="C1")
+    await lazy_slack_client.ensure_cached(channel_id="C2")
+    assert list(lazy_slack_client.channels) == ["C2"]
+    assert lazy_slack_client.lazy_cache
+
+
+@pytest.mark.asyncio
+async def test_ensure_cached_logs_failures(lazy_slack_client, web_client, mocker):
+    web_client.users_info.side_effect = RuntimeError("user_not_found")
+    await lazy_slack_client.ensure_cached(user_id="U404")
+    assert "U404" not in lazy_slack_client.users
+
+
+@pytest.mark.asyncio
+async def test_ensure_cached_noop_for_full_cache(slack_client, web_client):
+    await slack_client.ensure_cached(user_id="U1", channel_id="C1")
+    web_client.users_info.assert_not_called()
+    web_client.conversations_info.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_lazy_cache_setup_skips_full_sync(lazy_slack_client, web_client):
+    web_client.auth_test.return_value = {"bot_id": "B1"}
+    web_client.bots_info.return_value = {"bot": {"user_id": "UBOT", "name": "bot"}}
+    await lazy_slack_client.setup()
+    web_client.users_list.assert_not_called()
+    web_client.conversations_list.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_compact_cache(socket_mode_client, web_client, user_dict, channel_dict):
+    client = SlackClient(socket_mode_client, ZoneInfo("UTC"), compact_cache=True)
+    await client.handle_cache_event({"type": "team_join", "user": user_dict})
+    web_client.users_list.return_value = _paginated("members", [user_dict])
+    web_client.conversations_list.return_value = _paginated("channels", [channel_dict])
+    await client.cache_all_users()
+    await client.cache_all_channels()
+    assert isinstance(client.users, CompactMap)
+    assert client.users["U1"] == User.model_validate(user_dict)
+    assert client.get_user_by_email("john@my-team.org") == User.model_validate(user_dict)
+    assert client.channels["C1"] == Channel.model_validate(channel_dict)
+
+
+@pytest.mark.asyncio
+async def test_find_channel_by_name(slack_client, web_client, channel_dict):
+    channel_dict = {**channel_dict, "name_normalized": "channel-1"}
+    web_client.conversations_info.return_value = {"channel": channel_dict}
+    await slack_client.handle_cache_event({"type": "channel_created", "channel": channel_dict})
+    assert slack_client.find_channel_by_name("#Channel-1").id == "C1"
+    assert slack_client.find_channel_by_name("@channel-1") is None
+    web_client.conversations_info.return_value = {"channel": {**channel_dict, "name_normalized": "channel-2"}}
+    await slack_client.handle_cache_event({"type": "channel_rename", "channel": "C1"})
+    assert slack_client.find_channel_by_name("channel-1") is None
+    assert slack_client.find_channel_by_name("channel-2").id == "C1"
+    await slack_client.handle_cache_event({
+        "type": "channel_id_changed",
+        "old_channel_id": "C1",
+        "new_channel_id": "C9",
+    })
+    assert slack_client.find_channel_by_name("channel-2") is slack_client.channels["C9"]
+    await slack_client.handle_cache_event({"type": "channel_deleted", "channel": "C9"})
+    assert slack_client.find_channel_by_name("channel-2") is None
+
+
+@pytest.mark.asyncio
+async def test_find_user_by_name(slack_client, web_client, user_dict):
+    web_client.users_list.return_value = _paginated("members", [user_dict])
+    await slack_client.cache_all_users()
+    assert slack_client.find_user_by_name("@john").id == "U1"
+    assert slack_client.find_user_by_name("johnny").id == "U1"
+    assert slack_client.find_user_by_name("jane") is None
+
+
+@pytest.mark.asyncio
+async def test_cache_events_invalidate_api_cache(mocker, socket_mode_client, channel_dict):
+    api_call = mocker.patch.object(
+        AsyncWebClient, "api_call", autospec=True, return_value={"ok": True, "channel": channel_dict}
+    )
+    web_client = CachingAsyncWebClient(token="xoxb-token", cache=ResponseCache({"conversations.info": 300}))
+    socket_mode_client.web_client = web_client
+    slack_client = SlackClient(socket_mode_client, ZoneInfo("UTC"))
+
+    await web_client.conversations_info(channel="C1")
+    await web_client.conversations_info(channel="C1")
+    assert api_call.call_count == 1
+
+    # The rename must be fetched from Slack, not from the cache
+    await slack_client.handle_cache_event({"type": "channel_rename", "channel": channel_dict})
+    assert api_call.call_count == 2
+    await web_client.conversations_info(channel="C1")
+    assert api_call.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_outgoing_calls_go_through_scheduler(socket_mode_client, web_client):
+    slack_client = SlackClient(socket_mode_client, ZoneInfo("UTC"), outbound_scheduler=OutboundScheduler())
+    assert slack_client.outbound_stats.calls == 0
+    await slack_client.send("C1", "hello")
+    await slack_client.react("C1", "1234.5678", "thumbsup")
+    web_client.chat_postMessage.assert_called_once_with(channel="C1", text="hello")
+    web_client.reactions_add.assert_called_once_with(name="thumbsup", channel="C1", timestamp="1234.5678")
+    assert slack_client.outbound_stats.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_send_coalesce(socket_mode_client, web_client):
+    slack_client = SlackClient(socket_mode_client, ZoneInfo("UTC"), coalesce_window=0.01)
+    await asyncio.gather(
+        slack_client.send("C1", "hello", coalesce=True, source="plugin"),
+        slack_client.send("C1", "world", coalesce=True, source="plugin"),
+    )
+    web_client.chat_postMessage.assert_called_once_with(channel="C1", text="hello\nworld")
+
+
+@pytest.mark.asyncio
+async def test_send_dm_many(slack_client, web_client, user):
+    web_client.chat_postMessage.return_value = {"ok": True}
+    results = await slack_client.send_dm_many([user, "U2"], "hello", concurrency=2)
+    assert list(results) == ["U1", "U2"]
+    assert all(result.ok for result in results.values())
+    web_client.chat_postMessage.assert_any_call(channel="U1", text="hello", as_user=True)
+    web_client.chat_postMessage.assert_any_call(channel="U2", text="hello", as_user=True)
+
+
+@pytest.mark.asyncio
+async def test_validate_in_chunks_lets_other_tasks_run(user_dict, mocker):
+    mocker.patch("machine.clients.slack.VALIDATION_CHUNK_SIZE", 2)
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0)
+
+    ticker = asyncio.create_task(tick())
+    await asyncio.sleep(0)
+    users = await _validate_in_chunks(_USER_LIST, [{**user_dict, "id": f"U{i}"} for i in range(6)])
+    ticker.cancel()
+    assert [user.id for user in users] == ["U0", "U1", "U2", "U3", "U4", "U5"]
+    # the ticker ran once before and once after every chunk
+    assert ticks == 4
@@ -43,6 +43,9 @@ class FakePlugin(MachineBasePlugin):
 
 
 class FakePlugin2(MachineBasePlugin):
+    def __init__(self, client, settings, storage):
+        super().__init__(client, settings, storage)
+
     async def init(self):
         self.x = 42
 
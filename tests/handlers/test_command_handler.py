@@ -1,6 +1,11 @@
+import asyncio
+from inspect import Signature
+
 import pytest
 
 from machine.handlers import create_slash_command_handler
+from machine.handlers.dispatcher import Job, WorkerPoolDispatcher
+from machine.models.core import CommandHandler
 from machine.plugins.command import Command
 from tests.handlers.requests import gen_command_request
 
@@ -44,3 +49,65 @@ async def test_create_slash_command_handler_generator(plugin_actions, fake_plugi
     # SocketModeResponse will transform a string into a dict with `text` as only key
     assert resp.payload == {"text": "hello"}
     assert fake_plugin.command_function.call_count == 0
+
+
+@pytest.mark.asyncio
+async def test_create_slash_command_handler_generator_timeout(
+    plugin_actions, fake_plugin, socket_mode_client, slack_client
+):
+    async def slow_generator(command):
+        await asyncio.sleep(1)
+        yield "too late"
+
+    plugin_actions.command["/test-generator"] = CommandHandler(
+        class_=fake_plugin,
+        class_name="tests.fake_plugins.FakePlugin",
+        function=slow_generator,
+        function_signature=Signature.from_callable(slow_generator),
+        command="/test-generator",
+        is_generator=True,
+        timeout=0.01,
+    )
+    handler = create_slash_command_handler(plugin_actions, slack_client)
+    await handler(socket_mode_client, gen_command_request("/test-generator", "bar"))
+    # The request is acknowledged, even though the handler timed out before its immediate response
+    socket_mode_client.send_socket_mode_response.assert_called_once()
+    resp = socket_mode_client.send_socket_mode_response.call_args.args[0]
+    assert resp.envelope_id == "x"
+    assert resp.payload is None
+
+
+@pytest.mark.asyncio
+async def test_slash_command_is_acknowledged_before_fetching_user_and_channel(
+    plugin_actions, socket_mode_client, slack_client, mocker
+):
+    calls = mocker.Mock()
+    socket_mode_client.send_socket_mode_response.side_effect = lambda response: calls("ack")
+    slack_client.ensure_cached.side_effect = lambda **kwargs: calls("ensure_cached")
+    handler = create_slash_command_handler(plugin_actions, slack_client)
+    await handler(socket_mode_client, gen_command_request("/test", "foo"))
+    assert [call.args[0] for call in calls.call_args_list] == ["ack", "ensure_cached"]
+
+
+@pytest.mark.asyncio
+async def test_rejected_generator_slash_command_is_acknowledged(
+    plugin_actions, fake_plugin, socket_mode_client, slack_client
+):
+    dispatcher = WorkerPoolDispatcher(workers=1, max_queue_size=1, interactive_workers=1, max_waiting=0)
+    await dispatcher.start()
+    gate = asyncio.Event()
+    # keep the worker busy and the queue of the interactive lane full
+    busy = [Job(fn=gate.wait, name=f"busy-{i}", lane="interactive") for i in range(2)]
+    await dispatcher.dispatch(busy[:1])
+    await asyncio.sleep(0)
+    await dispatcher.dispatch(busy[1:])
+    handler = create_slash_command_handler(plugin_actions, slack_client, dispatcher)
+    await handler(socket_mode_client, gen_command_request("/test-generator", "bar"))
+    assert dispatcher.stats().rejected == 1
+    assert fake_plugin.generator_command_function.call_count == 0
+    socket_mode_client.send_socket_mode_response.assert_called_once()
+    resp = socket_mode_client.send_socket_mode_response.call_args.args[0]
+    assert resp.envelope_id == "x"
+    assert resp.payload is None
+    gate.set()
+    await dispatcher.close()
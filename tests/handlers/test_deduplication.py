@@ -0,0 +1,106 @@
+import pytest
+from slack_sdk.socket_mode.request import SocketModeRequest
+
+from machine.handlers.deduplication import RequestDeduplicator, create_deduplicator, request_keys
+from machine.storage import MachineBaseStorage
+from machine.storage.backends.memory import MemoryStorage
+
+
+def _gen_event_request(envelope_id: str, event: dict):
+    return SocketModeRequest(type="events_api", envelope_id=envelope_id, payload={"event": event})
+
+
+def _gen_message_event(client_msg_id: str = "msg1", event_type: str = "message"):
+    return {"type": event_type, "client_msg_id": client_msg_id, "event_ts": "1.0", "text": "hi"}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_request_keys():
+    assert request_keys(_gen_event_request("x", _gen_message_event())) == ["envelope:x", "event:message:msg1"]
+    assert request_keys(_gen_event_request("x", {"type": "team_join", "event_ts": "2.0"})) == [
+        "envelope:x",
+        "event:team_join:2.0",
+    ]
+    interactive_request = SocketModeRequest(type="interactive", envelope_id="y", payload={})
+    assert request_keys(interactive_request) == ["envelope:y"]
+
+
+@pytest.mark.asyncio
+async def test_duplicate_envelope():
+    deduplicator = RequestDeduplicator()
+    assert not await deduplicator.is_duplicate(_gen_event_request("x", _gen_message_event()))
+    assert await deduplicator.is_duplicate(_gen_event_request("x", _gen_message_event()))
+
+
+@pytest.mark.asyncio
+async def test_redelivered_event_in_new_envelope():
+    deduplicator = RequestDeduplicator()
+    assert not await deduplicator.is_duplicate(_gen_event_request("x", _gen_message_event()))
+    assert await deduplicator.is_duplicate(_gen_event_request("y", _gen_message_event()))
+    # same message, but a different event type
+    assert not await deduplicator.is_duplicate(_gen_event_request("z", _gen_message_event(event_type="app_mention")))
+
+
+@pytest.mark.asyncio
+async def test_keys_expire():
+    clock = FakeClock()
+    deduplicator = RequestDeduplicator(ttl=10, clock=clock)
+    assert not await deduplicator.is_duplicate(_gen_event_request("x", _gen_message_event()))
+    clock.now = 9
+    assert await deduplicator.is_duplicate(_gen_event_request("x", _gen_message_event()))
+    clock.now = 11
+    assert not await deduplicator.is_duplicate(_gen_event_request("x", _gen_message_event()))
+
+
+@pytest.mark.asyncio
+async def test_oldest_keys_are_evicted():
+    deduplicator = RequestDeduplicator(max_size=2)
+    interactive_requests = [SocketModeRequest(type="interactive", envelope_id=str(i), payload={}) for i in range(3)]
+    for request in interactive_requests:
+        assert not await deduplicator.is_duplicate(request)
+    assert await deduplicator.is_duplicate(interactive_requests[2])
+    assert not await deduplicator.is_duplicate(interactive_requests[0])
+
+
+@pytest.mark.asyncio
+async def test_shared_storage():
+    storage = MemoryStorage({})
+    replica_1 = RequestDeduplicator(storage=storage)
+    replica_2 = RequestDeduplicator(storage=storage)
+    assert not await replica_1.is_duplicate(_gen_event_request("x", _gen_message_event()))
+    assert await replica_2.is_duplicate(_gen_event_request("y", _gen_message_event()))
+    # Only the deduplicator's own memory is checked when requested
+    replica_3 = RequestDeduplicator(storage=storage)
+    assert not await replica_3.is_duplicate(_gen_event_request("y", _gen_message_event()), shared=False)
+
+
+@pytest.mark.asyncio
+async def test_shared_storage_errors_are_not_duplicates(mocker):
+    storage = mocker.MagicMock(spec=MachineBaseStorage)
+    storage.set_if_absent.side_effect = ConnectionError("storage down")
+    deduplicator = RequestDeduplicator(storage=storage)
+    assert not await deduplicator.is_duplicate(_gen_event_request("x", _gen_message_event()))
+
+
+@pytest.mark.parametrize("kwargs", [{"max_size": 0}, {"ttl": 0}])
+def test_invalid_arguments(kwargs):
+    with pytest.raises(ValueError):
+        RequestDeduplicator(**kwargs)
+
+
+def test_create_deduplicator():
+    storage = MemoryStorage({})
+    assert create_deduplicator({"DEDUPLICATE_REQUESTS": False}, storage) is None
+    deduplicator = create_deduplicator({}, storage)
+    assert deduplicator is not None
+    assert deduplicator._storage is None
+    deduplicator = create_deduplicator({"DEDUPLICATION_SHARED": True, "DEDUPLICATION_TTL": "60"}, storage)
+    assert deduplicator._storage is storage
+    assert deduplicator._ttl == 60
@@ -0,0 +1,262 @@
+import asyncio
+
+import pytest
+
+from machine.handlers.dispatcher import Dispatcher, Job, WorkerPoolDispatcher, create_dispatcher
+
+
+def _recording_job(
+    name: str, ran: list[str], sheddable: bool = False, gate: asyncio.Event | None = None, lane: str = "events"
+) -> Job:
+    async def run():
+        if gate is not None:
+            await gate.wait()
+        ran.append(name)
+
+    return Job(fn=run, name=name, sheddable=sheddable, lane=lane)
+
+
+async def _settle():
+    # give the workers a chance to pick up and finish jobs
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_inline_dispatcher_runs_jobs():
+    dispatcher = Dispatcher()
+    ran = []
+    await dispatcher.dispatch([_recording_job("a", ran), _recording_job("b", ran)])
+    assert sorted(ran) == ["a", "b"]
+    assert dispatcher.stats().processed == 2
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_runs_jobs():
+    dispatcher = WorkerPoolDispatcher(workers=2, max_queue_size=10)
+    await dispatcher.start()
+    ran = []
+    await dispatcher.dispatch([_recording_job("a", ran), _recording_job("b", ran), _recording_job("c", ran)])
+    await _settle()
+    assert sorted(ran) == ["a", "b", "c"]
+    stats = dispatcher.stats()
+    assert stats.processed == 3
+    assert stats.queue_depth == 0
+    assert stats.busy_workers == 0
+    await dispatcher.close()
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_survives_failing_job():
+    dispatcher = WorkerPoolDispatcher(workers=1, max_queue_size=10)
+    await dispatcher.start()
+
+    async def fail():
+        raise RuntimeError("boom")
+
+    ran = []
+    await dispatcher.dispatch([Job(fn=fail, name="fail"), _recording_job("a", ran)])
+    await _settle()
+    assert ran == ["a"]
+    assert dispatcher.stats().processed == 2
+    await dispatcher.close()
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_drop_oldest():
+    dispatcher = WorkerPoolDispatcher(workers=1, max_queue_size=1, overflow_policy="drop_oldest")
+    await dispatcher.start()
+    gate = asyncio.Event()
+    ran = []
+    await dispatcher.dispatch([_recording_job("busy", ran, gate=gate)])
+    await _settle()
+    # worker is busy, so the queue fills up
+    await dispatcher.dispatch([_recording_job("old", ran), _recording_job("new", ran)])
+    assert dispatcher.stats().dropped == 1
+    gate.set()
+    await _settle()
+    assert ran == ["busy", "new"]
+    await dispatcher.close()
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_shed_listen_to():
+    dispatcher = WorkerPoolDispatcher(workers=1, max_queue_size=1, overflow_policy="shed_listen_to")
+    await dispatcher.start()
+    gate = asyncio.Event()
+    ran = []
+    await dispatcher.dispatch([_recording_job("busy", ran, gate=gate)])
+    await _settle()
+    await dispatcher.dispatch([_recording_job("queued", ran), _recording_job("listen", ran, sheddable=True)])
+    stats = dispatcher.stats()
+    assert stats.shed == 1
+    assert stats.queue_depth == 1
+    assert stats.busy_workers == 1
+    gate.set()
+    await _settle()
+    assert ran == ["busy", "queued"]
+    await dispatcher.close()
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_block():
+    dispatcher = WorkerPoolDispatcher(workers=1, max_queue_size=1)
+    await dispatcher.start()
+    gate = asyncio.Event()
+    ran = []
+    await dispatcher.dispatch([_recording_job("busy", ran, gate=gate)])
+    await _settle()
+    await dispatcher.dispatch([_recording_job("queued", ran)])
+    blocked = asyncio.create_task(dispatcher.dispatch([_recording_job("blocked", ran, sheddable=True)]))
+    await _settle()
+    assert not blocked.done()
+    gate.set()
+    await blocked
+    await _settle()
+    assert ran == ["busy", "queued", "blocked"]
+    assert dispatcher.stats().dropped == 0
+    assert dispatcher.stats().shed == 0
+    await dispatcher.close()
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_limits_waiting_jobs():
+    dispatcher = WorkerPoolDispatcher(workers=1, max_queue_size=1, max_waiting=1)
+    await dispatcher.start()
+    gate = asyncio.Event()
+    ran = []
+    await dispatcher.dispatch([_recording_job("busy", ran, gate=gate)])
+    await _settle()
+    await dispatcher.dispatch([_recording_job("queued", ran)])
+    waiting = asyncio.create_task(dispatcher.dispatch([_recording_job("waiting", ran)]))
+    await _settle()
+    assert dispatcher.stats().waiting == 1
+    # Neither queued, nor allowed to wait for room in the queue
+    rejected = _recording_job("rejected", ran)
+    rejected.on_reject = lambda: _recording_job("on_reject", ran).fn()
+    await dispatcher.dispatch([rejected])
+    assert dispatcher.stats().rejected == 1
+    assert ran == ["on_reject"]
+    gate.set()
+    await waiting
+    await _settle()
+    assert ran == ["on_reject", "busy", "queued", "waiting"]
+    assert dispatcher.stats().waiting == 0
+    await dispatcher.close()
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_interactive_lane_not_blocked_by_events():
+    dispatcher = WorkerPoolDispatcher(workers=1, max_queue_size=1, interactive_workers=1)
+    await dispatcher.start()
+    gate = asyncio.Event()
+    ran = []
+    await dispatcher.dispatch([_recording_job("busy", ran, gate=gate), _recording_job("queued", ran)])
+    await _settle()
+    # the events lane is saturated, but interactive jobs run on their own workers
+    await dispatcher.dispatch([_recording_job("modal", ran, lane="interactive")])
+    await _settle()
+    assert ran == ["modal"]
+    gate.set()
+    await _settle()
+    assert ran == ["modal", "busy", "queued"]
+    await dispatcher.close()
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_events_workers_prefer_interactive_jobs():
+    dispatcher = WorkerPoolDispatcher(workers=1, max_queue_size=10, interactive_workers=1)
+    await dispatcher.start()
+    events_gate = asyncio.Event()
+    interactive_gate = asyncio.Event()
+    ran = []
+    await dispatcher.dispatch([_recording_job("busy-event", ran, gate=events_gate)])
+    await _settle()
+    await dispatcher.dispatch([_recording_job("busy-interactive", ran, gate=interactive_gate, lane="interactive")])
+    await _settle()
+    await dispatcher.dispatch([
+        _recording_job("message", ran),
+        _recording_job("command", ran, lane="interactive"),
+    ])
+    stats = dispatcher.stats()
+    assert stats.queue_depth == 1
+    assert stats.interactive_queue_depth == 1
+    events_gate.set()
+    await _settle()
+    assert ran == ["busy-event", "command", "message"]
+    interactive_gate.set()
+    await _settle()
+    await dispatcher.close()
+
+
+async def _hang():
+    await asyncio.sleep(10)
+
+
+@pytest.mark.asyncio
+async def test_inline_dispatcher_cancels_job_after_timeout(mocker):
+    job_logger = mocker.MagicMock()
+    dispatcher = Dispatcher(default_timeout=10)
+    ran = []
+    await dispatcher.dispatch([Job(fn=_hang, name="hang", timeout=0.01, logger=job_logger), _recording_job("a", ran)])
+    assert ran == ["a"]
+    stats = dispatcher.stats()
+    assert stats.timed_out == 1
+    assert stats.processed == 2
+    job_logger.warning.assert_called_once_with("Handler exceeded its timeout and was cancelled", timeout=0.01)
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_cancels_job_after_default_timeout():
+    dispatcher = WorkerPoolDispatcher(workers=1, max_queue_size=10, default_timeout=0.01)
+    await dispatcher.start()
+    ran = []
+    await dispatcher.dispatch([Job(fn=_hang, name="hang"), _recording_job("a", ran)])
+    await asyncio.sleep(0.1)
+    # the worker is free again to run other jobs
+    assert ran == ["a"]
+    stats = dispatcher.stats()
+    assert stats.timed_out == 1
+    assert stats.busy_workers == 0
+    await dispatcher.close()
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_not_started():
+    dispatcher = WorkerPoolDispatcher(workers=1, max_queue_size=1)
+    with pytest.raises(RuntimeError):
+        await dispatcher.dispatch([_recording_job("a", [])])
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"workers": 0, "max_queue_size": 1},
+        {"workers": 1, "max_queue_size": 0},
+        {"workers": 1, "max_queue_size": 1, "overflow_policy": "ignore"},
+        {"workers": 1, "max_queue_size": 1, "interactive_workers": 0},
+        {"workers": 1, "max_queue_size": 1, "default_timeout": 0},
+        {"workers": 1, "max_queue_size": 1, "max_waiting": -1},
+    ],
+)
+def test_worker_pool_invalid_arguments(kwargs):
+    with pytest.raises(ValueError):
+        WorkerPoolDispatcher(**kwargs)
+
+
+def test_create_dispatcher():
+    assert type(create_dispatcher({})) is Dispatcher
+    dispatcher = create_dispatcher({
+        "EVENT_WORKERS": "4",
+        "EVENT_QUEUE_SIZE": "20",
+        "EVENT_OVERFLOW_POLICY": "drop_oldest",
+    })
+    assert isinstance(dispatcher, WorkerPoolDispatcher)
+    stats = dispatcher.stats()
+    assert stats.workers == 4
+    assert stats.interactive_workers == 4
+    assert stats.queue_capacity == 20
+    dispatcher = create_dispatcher({"EVENT_WORKERS": 4, "INTERACTIVE_WORKERS": 2})
+    assert dispatcher.stats().interactive_workers == 2
+    assert create_dispatcher({"EVENT_WORKERS": 4, "EVENT_MAX_WAITING": "0"})._max_waiting == 0
+    assert create_dispatcher({"HANDLER_TIMEOUT": "30"})._default_timeout == 30
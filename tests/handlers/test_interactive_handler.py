@@ -1,8 +1,12 @@
 import re
+from inspect import Signature
 
 import pytest
+from slack_sdk.socket_mode.request import SocketModeRequest
 
-from machine.handlers.interactive_handler import _matches, create_interactive_handler
+from machine.handlers.interactive_handler import create_interactive_handler
+from machine.models.core import ModalHandler, _matches
+from machine.models.interactive import InteractivePayload
 from machine.plugins.block_action import BlockAction
 from machine.plugins.modals import ModalClosure, ModalSubmission
 from tests.handlers.requests import _gen_block_action_request, _gen_view_closed_request, _gen_view_submission_request
@@ -34,6 +38,18 @@ async def test_create_interactive_handler_for_block_actions(
     assert resp.payload is None
 
 
+@pytest.mark.asyncio
+async def test_block_actions_are_acknowledged_before_fetching_user_and_channel(
+    plugin_actions, socket_mode_client, slack_client, mocker
+):
+    calls = mocker.Mock()
+    socket_mode_client.send_socket_mode_response.side_effect = lambda response: calls("ack")
+    slack_client.ensure_cached.side_effect = lambda **kwargs: calls("ensure_cached")
+    handler = create_interactive_handler(plugin_actions, slack_client)
+    await handler(socket_mode_client, _gen_block_action_request("my_action_1", "my_block"))
+    assert [call.args[0] for call in calls.call_args_list] == ["ack", "ensure_cached"]
+
+
 @pytest.mark.asyncio
 async def test_create_interactive_handler_for_view_submission(
     plugin_actions, fake_plugin, socket_mode_client, slack_client
@@ -70,6 +86,32 @@ async def test_create_interactive_handler_for_view_submission_generator(
     assert fake_plugin.modal_function.call_count == 0
 
 
+@pytest.mark.asyncio
+async def test_create_interactive_handler_for_view_submission_generator_error(
+    plugin_actions, fake_plugin, socket_mode_client, slack_client
+):
+    async def failing_generator(submission):
+        raise RuntimeError("boom")
+        yield {}
+
+    plugin_actions.modal["TestPlugin.generator_modal_function-my_generator_modal"] = ModalHandler(
+        class_=fake_plugin,
+        class_name="tests.fake_plugins.FakePlugin",
+        function=failing_generator,
+        function_signature=Signature.from_callable(failing_generator),
+        callback_id_matcher="my_generator_modal",
+        is_generator=True,
+    )
+    handler = create_interactive_handler(plugin_actions, slack_client)
+    with pytest.raises(RuntimeError):
+        await handler(socket_mode_client, _gen_view_submission_request("my_generator_modal"))
+    # The submission is acknowledged, even though the handler failed before its immediate response
+    socket_mode_client.send_socket_mode_response.assert_called_once()
+    resp = socket_mode_client.send_socket_mode_response.call_args.args[0]
+    assert resp.envelope_id == "x"
+    assert resp.payload is None
+
+
 @pytest.mark.asyncio
 async def test_create_interactive_handler_for_view_closed(
     plugin_actions, fake_plugin, socket_mode_client, slack_client
@@ -87,3 +129,21 @@ async def test_create_interactive_handler_for_view_closed(
     assert resp.payload is None
     assert fake_plugin.modal_function.call_count == 0
     assert fake_plugin.generator_modal_function.call_count == 0
+
+
+@pytest.mark.asyncio
+async def test_create_interactive_handler_drops_payloads_without_consumers(
+    plugin_actions, fake_plugin, socket_mode_client, slack_client, mocker
+):
+    validate = mocker.spy(InteractivePayload, "validate_python")
+    handler = create_interactive_handler(plugin_actions, slack_client)
+    await handler(socket_mode_client, _gen_block_action_request("other_action", "other_block"))
+    await handler(socket_mode_client, _gen_view_closed_request("other_modal"))
+    await handler(
+        socket_mode_client, SocketModeRequest(type="interactive", envelope_id="x", payload={"type": "shortcut"})
+    )
+    # payloads are acknowledged, but never parsed
+    assert socket_mode_client.send_socket_mode_response.call_count == 3
+    assert validate.call_count == 0
+    assert fake_plugin.block_action_function.call_count == 0
+    assert fake_plugin.modal_closed_function.call_count == 0
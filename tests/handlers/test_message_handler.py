@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 import re
+from inspect import Signature
 
 import pytest
 
+from machine.clients.send_queue import SendQueue
 from machine.handlers.message_handler import _check_bot_mention, generate_message_matcher, handle_message
+from machine.models.core import MessageHandler, RegisteredActions
 from machine.plugins.message import Message
 
 
@@ -132,3 +135,73 @@ async def test_handle_message_changed(plugin_actions, fake_plugin, slack_client,
     assert fake_plugin.listen_function.call_count == 1
     args = fake_plugin.listen_function.call_args
     _assert_message(args, "hi")
+
+
+@pytest.mark.asyncio
+async def test_handle_message_shares_message(plugin_actions, fake_plugin, slack_client, message_matcher):
+    bot_name = "superbot"
+    bot_id = "123"
+    msg_event = _gen_msg_event("<@123> hello hi")
+    await handle_message(msg_event, bot_name, bot_id, plugin_actions, message_matcher, slack_client, False)
+    assert fake_plugin.respond_function.call_count == 1
+    assert fake_plugin.listen_function.call_count == 1
+    listen_message = fake_plugin.listen_function.call_args[0][0]
+    respond_message = fake_plugin.respond_function.call_args[0][0]
+    assert listen_message is respond_message
+    # the sender is only looked up when needed
+    assert slack_client.users.__getitem__.call_count == 0
+    assert listen_message.sender is respond_message.sender
+    assert slack_client.users.__getitem__.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_handle_message_ensures_sender_and_channel_are_cached(
+    plugin_actions, fake_plugin, slack_client, message_matcher
+):
+    msg_event = _gen_msg_event("hi")
+    await handle_message(msg_event, "superbot", "123", plugin_actions, message_matcher, slack_client, False)
+    slack_client.ensure_cached.assert_awaited_once_with(user_id="user1", channel_id=None)
+    # nothing is fetched for messages without matching handlers
+    msg_event = _gen_msg_event("good day")
+    await handle_message(msg_event, "superbot", "123", plugin_actions, message_matcher, slack_client, False)
+    assert slack_client.ensure_cached.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_handle_message_does_not_merge_replies_of_different_plugins(fake_plugin, slack_client, message_matcher):
+    sent = []
+
+    async def post(channel_id, text, **kwargs):
+        sent.append(text)
+        return {"ok": True}
+
+    send_queue = SendQueue(post, window=0.01)
+
+    async def send(channel_id, text=None, coalesce=False, source=None, **kwargs):
+        return await send_queue.send(channel_id, text, source=source, **kwargs)
+
+    slack_client.send.side_effect = send
+
+    def reply(text):
+        async def handler(msg):
+            await msg.say(text, coalesce=True)
+
+        return handler
+
+    listen_to = {}
+    for plugin, texts in [("plugins.First", ["first 1", "first 2"]), ("plugins.Second", ["second"])]:
+        for text in texts:
+            function = reply(text)
+            listen_to[f"{plugin}.{text}"] = MessageHandler(
+                class_=fake_plugin,
+                class_name=plugin,
+                function=function,
+                function_signature=Signature.from_callable(function),
+                regex=re.compile("hi"),
+                handle_message_changed=False,
+            )
+    plugin_actions = RegisteredActions(listen_to=listen_to)
+    msg_event = {**_gen_msg_event("hi"), "channel": "C1"}
+    await handle_message(msg_event, "superbot", "123", plugin_actions, message_matcher, slack_client, False)
+    assert sent == ["first 1\nfirst 2", "second"]
+    await send_queue.close()
@@ -0,0 +1,114 @@
+import pytest
+from slack_sdk.socket_mode.request import SocketModeRequest
+
+from machine.handlers import create_request_router
+from machine.handlers.deduplication import RequestDeduplicator
+from machine.models.core import RegisteredActions
+from tests.handlers.requests import _gen_block_action_request, gen_command_request
+
+
+def _gen_event_request(event: dict):
+    return SocketModeRequest(type="events_api", envelope_id="x", payload={"event": event})
+
+
+@pytest.fixture
+def router(plugin_actions, slack_client):
+    slack_client.cache_event_types = frozenset({"team_join"})
+    return create_request_router(plugin_actions, {"LOG_HANDLED_MESSAGES": False}, "123", "superbot", slack_client)
+
+
+@pytest.mark.asyncio
+async def test_router_acks_events_once(router, socket_mode_client, slack_client, fake_plugin):
+    await router(socket_mode_client, _gen_event_request({"type": "some_event", "foo": "bar"}))
+    socket_mode_client.send_socket_mode_response.assert_called_once()
+    assert socket_mode_client.send_socket_mode_response.call_args.args[0].envelope_id == "x"
+    assert fake_plugin.process_function.call_count == 1
+    slack_client.handle_cache_event.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_router_dispatches_by_event_type(router, socket_mode_client, slack_client, fake_plugin):
+    event = {"type": "team_join", "user": {}}
+    await router(socket_mode_client, _gen_event_request(event))
+    socket_mode_client.send_socket_mode_response.assert_called_once()
+    slack_client.handle_cache_event.assert_called_once_with(event)
+    assert fake_plugin.process_function.call_count == 0
+    assert fake_plugin.listen_function.call_count == 0
+
+
+@pytest.mark.asyncio
+async def test_router_acks_unknown_events(router, socket_mode_client, slack_client, fake_plugin):
+    await router(socket_mode_client, _gen_event_request({"type": "reaction_added"}))
+    socket_mode_client.send_socket_mode_response.assert_called_once()
+    slack_client.handle_cache_event.assert_not_called()
+    assert fake_plugin.process_function.call_count == 0
+
+
+@pytest.mark.asyncio
+async def test_router_dispatches_messages(router, socket_mode_client, fake_plugin):
+    event = {"type": "message", "text": "hi", "channel_type": "channel", "channel": "C1", "user": "user1"}
+    await router(socket_mode_client, _gen_event_request(event))
+    socket_mode_client.send_socket_mode_response.assert_called_once()
+    assert fake_plugin.listen_function.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_router_isolates_failing_subsystems(router, socket_mode_client, slack_client):
+    slack_client.handle_cache_event.side_effect = RuntimeError("boom")
+    await router(socket_mode_client, _gen_event_request({"type": "team_join", "user": {}}))
+    socket_mode_client.send_socket_mode_response.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_router_dispatches_other_request_types(router, socket_mode_client, fake_plugin):
+    await router(socket_mode_client, gen_command_request("/test", "foo"))
+    assert fake_plugin.command_function.call_count == 1
+    await router(socket_mode_client, _gen_block_action_request("my_action_1", "my_block"))
+    assert fake_plugin.block_action_function.call_count == 1
+    assert socket_mode_client.send_socket_mode_response.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_router_drops_duplicate_requests(plugin_actions, slack_client, socket_mode_client, fake_plugin):
+    slack_client.cache_event_types = frozenset()
+    router = create_request_router(
+        plugin_actions,
+        {"LOG_HANDLED_MESSAGES": False},
+        "123",
+        "superbot",
+        slack_client,
+        deduplicator=RequestDeduplicator(),
+    )
+    event = {"type": "some_event", "event_ts": "1.0"}
+    await router(socket_mode_client, _gen_event_request(event))
+    await router(socket_mode_client, _gen_event_request(event))
+    # duplicates are acknowledged, but not processed
+    assert socket_mode_client.send_socket_mode_response.call_count == 2
+    assert fake_plugin.process_function.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_router_acks_events_before_deduplicating(plugin_actions, slack_client, socket_mode_client, mocker):
+    slack_client.cache_event_types = frozenset()
+    deduplicator = RequestDeduplicator()
+    calls = mocker.Mock()
+    socket_mode_client.send_socket_mode_response.side_effect = lambda response: calls("ack")
+    mocker.patch.object(deduplicator, "is_duplicate", side_effect=lambda request, **kwargs: calls("deduplicate"))
+    router = create_request_router(
+        plugin_actions, {"LOG_HANDLED_MESSAGES": False}, "123", "superbot", slack_client, deduplicator=deduplicator
+    )
+    await router(socket_mode_client, _gen_event_request({"type": "some_event", "event_ts": "1.0"}))
+    assert [call.args[0] for call in calls.call_args_list] == ["ack", "deduplicate"]
+
+
+@pytest.mark.asyncio
+async def test_router_drops_messages_without_message_handlers(slack_client, socket_mode_client, mocker):
+    slack_client.cache_event_types = frozenset()
+    handle_message = mocker.patch("machine.handlers.message_handler.handle_message")
+    router = create_request_router(
+        RegisteredActions(), {"LOG_HANDLED_MESSAGES": False}, "123", "superbot", slack_client
+    )
+    event = {"type": "message", "text": "hi", "channel_type": "channel", "channel": "C1", "user": "user1"}
+    await router(socket_mode_client, _gen_event_request(event))
+    socket_mode_client.send_socket_mode_response.assert_called_once()
+    handle_message.assert_not_called()
@@ -0,0 +1,150 @@
+import re
+from inspect import Signature
+
+from machine.models.core import (
+    BlockActionHandler,
+    BlockActionHandlerIndex,
+    MessageHandler,
+    MessageHandlerIndex,
+    ModalHandler,
+    ModalHandlerIndex,
+    RegisteredActions,
+)
+from tests.utils.test_regex import PATTERNS, TEXTS
+
+
+async def _handler_fn(msg):
+    pass
+
+
+def _gen_handler(regex: re.Pattern[str]) -> MessageHandler:
+    return MessageHandler(
+        class_=None,
+        class_name="tests.fake_plugins.FakePlugin",
+        function=_handler_fn,
+        function_signature=Signature.from_callable(_handler_fn),
+        regex=regex,
+        handle_message_changed=False,
+    )
+
+
+def test_message_handler_index_mapping():
+    index = MessageHandlerIndex()
+    handler = _gen_handler(re.compile("hi"))
+    index["hi"] = handler
+    assert "hi" in index
+    assert index["hi"] is handler
+    assert list(index.values()) == [handler]
+    assert index.candidates("oh hi") == [handler]
+    assert index.candidates("oh hello") == []
+    del index["hi"]
+    assert len(index) == 0
+    assert index.candidates("oh hi") == []
+
+
+def test_message_handler_index_candidates_match_full_scan():
+    index = MessageHandlerIndex({p.pattern: _gen_handler(p) for p in PATTERNS})
+    all_handlers = list(index.values())
+    for text in TEXTS:
+        candidates = index.candidates(text)
+        expected = [h for h in all_handlers if h.regex.search(text)]
+        assert [h for h in candidates if h.regex.search(text)] == expected
+    # Handlers without a required literal are always candidates
+    catch_all = _gen_handler(re.compile(r"\w+"))
+    index["catch_all"] = catch_all
+    assert catch_all in index.candidates("nothing to see here")
+
+
+def test_registered_actions_converts_dicts_to_index():
+    handler = _gen_handler(re.compile("hi"))
+    actions = RegisteredActions(listen_to={"hi": handler})
+    assert isinstance(actions.listen_to, MessageHandlerIndex)
+    assert isinstance(actions.respond_to, MessageHandlerIndex)
+    assert actions.listen_to.candidates("hi") == [handler]
+    assert isinstance(actions.block_actions, BlockActionHandlerIndex)
+    assert isinstance(actions.modal, ModalHandlerIndex)
+    assert isinstance(actions.modal_closed, ModalHandlerIndex)
+
+
+def _gen_block_action_handler(action_id, block_id) -> BlockActionHandler:
+    return BlockActionHandler(
+        class_=None,
+        class_name="tests.fake_plugins.FakePlugin",
+        function=_handler_fn,
+        function_signature=Signature.from_callable(_handler_fn),
+        action_id_matcher=action_id,
+        block_id_matcher=block_id,
+    )
+
+
+def test_block_action_handler_index_matching():
+    exact = _gen_block_action_handler("my_action", "my_block")
+    any_block = _gen_block_action_handler("my_action", None)
+    any_action = _gen_block_action_handler(None, "my_block")
+    regex = _gen_block_action_handler(re.compile("my_action.*"), "my_block")
+    regex_block = _gen_block_action_handler("other_action", re.compile("my_.*"))
+    index = BlockActionHandlerIndex({
+        "exact": exact,
+        "any_block": any_block,
+        "any_action": any_action,
+        "regex": regex,
+        "regex_block": regex_block,
+    })
+    # Matching handlers are returned in order of registration
+    assert index.matching("my_action", "my_block") == [exact, any_block, any_action, regex]
+    assert index.matching("my_action_2", "my_block") == [any_action, regex]
+    assert index.matching("my_action", "other_block") == [any_block]
+    assert index.matching("other_action", "my_block2") == [regex_block]
+    assert index.matching("unknown", "unknown") == []
+    del index["exact"]
+    assert index.matching("my_action", "my_block") == [any_block, any_action, regex]
+
+
+def _gen_modal_handler(callback_id) -> ModalHandler:
+    return ModalHandler(
+        class_=None,
+        class_name="tests.fake_plugins.FakePlugin",
+        function=_handler_fn,
+        function_signature=Signature.from_callable(_handler_fn),
+        callback_id_matcher=callback_id,
+        is_generator=False,
+    )
+
+
+def test_modal_handler_index_matching():
+    regex = _gen_modal_handler(re.compile("my_modal.*"))
+    exact = _gen_modal_handler("my_modal")
+    index = ModalHandlerIndex({"regex": regex, "exact": exact})
+    assert index.matching("my_modal") == [regex, exact]
+    assert index.matching("my_modal_2") == [regex]
+    assert index.matching("other_modal") == []
+    other = _gen_modal_handler("other_modal")
+    index["other"] = other
+    assert index.matching("other_modal") == [other]
+
+
+async def _handler_fn_with_logger(msg, logger):
+    pass
+
+
+def test_invocation_plan():
+    handler = _gen_handler(re.compile("hi"))
+    plan = handler.plan
+    assert plan.name == "tests.fake_plugins.FakePlugin._handler_fn"
+    assert not plan.injects_logger
+    assert plan.function is _handler_fn
+    call = plan.bind("msg", {})
+    assert call.args == ("msg",)
+    assert call.keywords == {}
+    call = plan.bind("msg", {"name": "world"})
+    assert call.keywords == {"name": "world"}
+
+    handler_with_logger = MessageHandler(
+        class_=None,
+        class_name="tests.fake_plugins.FakePlugin",
+        function=_handler_fn_with_logger,
+        function_signature=Signature.from_callable(_handler_fn_with_logger),
+        regex=re.compile("hi"),
+        handle_message_changed=False,
+    )
+    assert handler_with_logger.plan.injects_logger
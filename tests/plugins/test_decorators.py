@@ -370,6 +370,33 @@ def test_modal_closed_generator():
             yield "hello"
 
 
+def test_timeout():
+    @listen_to(r"hello", timeout=5)
+    @respond_to(r"hi", timeout=2.5)
+    @command("/timeout", timeout=10)
+    @action(action_id="my_action", timeout=1)
+    @modal("modal_1", timeout=3)
+    @modal_closed("modal_1", timeout=4)
+    async def f(payload):
+        pass
+
+    plugin_actions = f.metadata.plugin_actions
+    assert plugin_actions.listen_to[0].timeout == 5
+    assert plugin_actions.respond_to[0].timeout == 2.5
+    assert plugin_actions.commands[0].timeout == 10
+    assert plugin_actions.actions[0].timeout == 1
+    assert plugin_actions.modal_submissions[0].timeout == 3
+    assert plugin_actions.modal_closures[0].timeout == 4
+
+
+def test_timeout_not_positive():
+    with pytest.raises(ValueError, match="timeout must be a positive number of seconds"):
+
+        @listen_to(r"hello", timeout=0)
+        async def f(msg):
+            pass
+
+
 def test_required_settings_list(required_settings_list_f):
     assert hasattr(required_settings_list_f, "metadata")
     assert hasattr(required_settings_list_f.metadata, "required_settings")
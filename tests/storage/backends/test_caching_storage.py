@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from machine.storage.backends.caching import CachingStorage, SupportsInvalidation, create_caching_storage
+from machine.storage.backends.memory import MemoryStorage
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class InvalidationBus:
+    def __init__(self):
+        self.listeners = []
+
+
+class InvalidatingMemoryStorage(MemoryStorage):
+    """Memory storage that shares its data and invalidations with other instances, like Redis would"""
+
+    def __init__(self, data, bus):
+        super().__init__({})
+        self._storage = data
+        self._bus = bus
+
+    async def publish_invalidation(self, keys):
+        for listener in self._bus.listeners:
+            if listener is not self:
+                listener.callback(list(keys))
+
+    async def listen_for_invalidations(self, callback):
+        self.callback = callback
+        self._bus.listeners.append(self)
+        await asyncio.Event().wait()
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def backend():
+    return MemoryStorage({})
+
+
+@pytest.fixture
+def storage(backend, clock):
+    return CachingStorage(backend, ttl=10, max_size=3, clock=clock)
+
+
+@pytest.mark.asyncio
+async def test_reads_are_cached(storage, backend, clock, mocker):
+    await backend.set("key1", b"value1")
+    get = mocker.spy(backend, "get")
+    assert await storage.get("key1") == b"value1"
+    assert await storage.get("key1") == b"value1"
+    assert await storage.has("key1")
+    assert get.call_count == 1
+    assert storage.hits == 2
+    clock.now += 10
+    assert await storage.get("key1") == b"value1"
+    assert get.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_unknown_keys_are_cached(storage, backend, mocker):
+    get = mocker.spy(backend, "get")
+    assert await storage.get("unknown") is None
+    assert not await storage.has("unknown")
+    assert get.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_writes_invalidate(storage, backend):
+    await storage.set("key1", b"value1")
+    assert await storage.get("key1") == b"value1"
+    await storage.set("key1", b"value2")
+    assert await storage.get("key1") == b"value2"
+    await storage.delete("key1")
+    assert await storage.get("key1") is None
+    await storage.set_many({"key1": b"value3", "key2": b"value4"})
+    assert await storage.get_many(["key1", "key2"]) == {"key1": b"value3", "key2": b"value4"}
+    await storage.delete_many(["key1", "key2"])
+    assert await storage.get_many(["key1", "key2"]) == {"key1": None, "key2": None}
+
+
+@pytest.mark.asyncio
+async def test_get_many_only_reads_missing_keys(storage, backend, mocker):
+    await backend.set_many({"key1": b"value1", "key2": b"value2"})
+    await storage.get("key1")
+    get_many = mocker.spy(backend, "get_many")
+    assert await storage.get_many(["key1", "key2", "key3"]) == {"key1": b"value1", "key2": b"value2", "key3": None}
+    get_many.assert_called_once_with(["key2", "key3"])
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_keys_are_evicted(storage, backend):
+    await storage.get_many(["key1", "key2", "key3"])
+    await storage.get("key1")
+    await storage.get("key4")
+    assert len(storage) == 3
+    assert list(storage._entries) == ["key3", "key1", "key4"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_reads_are_coalesced(storage, backend, mocker):
+    await backend.set("key1", b"value1")
+    get = mocker.spy(backend, "get")
+    assert await asyncio.gather(*(storage.get("key1") for _ in range(3))) == [b"value1"] * 3
+    assert get.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_reads_that_overlap_a_write_are_not_cached(storage, backend, mocker):
+    await backend.set("key1", b"old")
+    read_started = asyncio.Event()
+    finish_read = asyncio.Event()
+    original_get = backend.get
+
+    async def slow_get(key):
+        value = await original_get(key)
+        read_started.set()
+        await finish_read.wait()
+        return value
+
+    mocker.patch.object(backend, "get", side_effect=slow_get)
+    read = asyncio.create_task(storage.get("key1"))
+    await read_started.wait()
+    await storage.set("key1", b"new")
+    finish_read.set()
+    assert await read == b"old"
+    mocker.patch.object(backend, "get", side_effect=original_get)
+    assert await storage.get("key1") == b"new"
+
+
+@pytest.mark.asyncio
+async def test_invalidations_are_shared_between_instances():
+    data = {}
+    bus = InvalidationBus()
+    storage1 = CachingStorage(InvalidatingMemoryStorage(data, bus))
+    storage2 = CachingStorage(InvalidatingMemoryStorage(data, bus))
+    await storage1.init()
+    await storage2.init()
+    await asyncio.sleep(0)
+
+    await storage1.set("key1", b"value1")
+    assert await storage2.get("key1") == b"value1"
+    await storage1.set("key1", b"value2")
+    assert await storage2.get("key1") == b"value2"
+
+    await storage1.close()
+    await storage2.close()
+    assert storage1._listener is None
+
+
+def test_create_caching_storage(backend):
+    assert isinstance(InvalidatingMemoryStorage({}, InvalidationBus()), SupportsInvalidation)
+    assert not isinstance(backend, SupportsInvalidation)
+    assert create_caching_storage({}, backend) is backend
+    storage = create_caching_storage({"STORAGE_CACHE": True, "STORAGE_CACHE_TTL": 30}, backend)
+    assert isinstance(storage, CachingStorage)
+    assert storage.backend is backend
+    assert storage._ttl == 30
+    with pytest.raises(ValueError, match="positive"):
+        CachingStorage(backend, ttl=0)
@@ -0,0 +1,82 @@
+import base64
+from unittest.mock import AsyncMock, MagicMock, call
+
+import pytest
+from botocore.exceptions import ClientError
+
+from machine.storage.backends.dynamodb import MAX_BATCH_GET_RETRIES, DynamoDBStorage
+
+
+def _item(key, value):
+    return {"sm-key": f"SM:{key}", "sm-value": base64.b64encode(value).decode("utf-8")}
+
+
+@pytest.fixture
+def batch():
+    batch = MagicMock()
+    batch.__aenter__.return_value = batch
+    batch.put_item = AsyncMock()
+    batch.delete_item = AsyncMock()
+    return batch
+
+
+@pytest.fixture
+def dynamodb_storage(mocker, batch):
+    mocker.patch("machine.storage.backends.dynamodb.asyncio.sleep", new_callable=AsyncMock)
+    storage = DynamoDBStorage({})
+    storage._db = MagicMock()
+    storage._db.batch_get_item = AsyncMock()
+    storage._table = MagicMock()
+    storage._table.batch_writer = MagicMock(return_value=batch)
+    return storage
+
+
+@pytest.mark.asyncio
+async def test_get_many(dynamodb_storage):
+    dynamodb_storage._db.batch_get_item.side_effect = [
+        {
+            "Responses": {"slack-machine-state": [_item("key1", b"value1")]},
+            "UnprocessedKeys": {"slack-machine-state": {"Keys": [{"sm-key": "SM:key2"}]}},
+        },
+        {"Responses": {"slack-machine-state": [_item("key2", b"value2")]}},
+    ]
+    assert await dynamodb_storage.get_many(["key1", "key2", "key3"]) == {
+        "key1": b"value1",
+        "key2": b"value2",
+        "key3": None,
+    }
+    assert dynamodb_storage._db.batch_get_item.call_args_list == [
+        call(
+            RequestItems={
+                "slack-machine-state": {"Keys": [{"sm-key": "SM:key1"}, {"sm-key": "SM:key2"}, {"sm-key": "SM:key3"}]}
+            }
+        ),
+        call(RequestItems={"slack-machine-state": {"Keys": [{"sm-key": "SM:key2"}]}}),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_get_many_gives_up_on_unprocessed_keys(dynamodb_storage):
+    dynamodb_storage._db.batch_get_item.return_value = {
+        "Responses": {},
+        "UnprocessedKeys": {"slack-machine-state": {"Keys": [{"sm-key": "SM:key1"}]}},
+    }
+    with pytest.raises(ClientError):
+        await dynamodb_storage.get_many(["key1"])
+    assert dynamodb_storage._db.batch_get_item.call_count == MAX_BATCH_GET_RETRIES + 1
+
+
+@pytest.mark.asyncio
+async def test_set_many(dynamodb_storage, batch):
+    await dynamodb_storage.set_many({"key1": b"value1", "key2": b"value2"})
+    dynamodb_storage._table.batch_writer.assert_called_with(overwrite_by_pkeys=["sm-key"])
+    assert batch.put_item.call_args_list == [
+        call(Item=_item("key1", b"value1")),
+        call(Item=_item("key2", b"value2")),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_delete_many(dynamodb_storage, batch):
+    await dynamodb_storage.delete_many(["key1", "key2"])
+    assert batch.delete_item.call_args_list == [call(Key={"sm-key": "SM:key1"}), call(Key={"sm-key": "SM:key2"})]
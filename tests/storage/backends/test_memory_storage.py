@@ -26,6 +26,8 @@ async def test_delete_values(memory_storage):
     assert memory_storage._storage == {"key1": ("value1", None), "key2": ("value2", None)}
     await memory_storage.delete("key2")
     assert memory_storage._storage == {"key1": ("value1", None)}
+    await memory_storage.delete("unknown")
+    assert memory_storage._storage == {"key1": ("value1", None)}
 
 
 @pytest.mark.asyncio
@@ -47,3 +49,18 @@ async def test_inclusion(memory_storage):
     assert await memory_storage.has("key1") is True
     await memory_storage.delete("key1")
     assert await memory_storage.has("key1") is False
+
+
+@pytest.mark.asyncio
+async def test_batch_operations(memory_storage):
+    await memory_storage.set_many({"key1": "value1", "key2": "value2"})
+    assert await memory_storage.get_many(["key1", "key2", "key3"]) == {"key1": "value1", "key2": "value2", "key3": None}
+    await memory_storage.delete_many(["key1", "key3"])
+    assert memory_storage._storage == {"key2": ("value2", None)}
+
+
+@pytest.mark.asyncio
+async def test_set_if_absent(memory_storage):
+    assert await memory_storage.set_if_absent("key1", "value1")
+    assert not await memory_storage.set_if_absent("key1", "value2")
+    assert await memory_storage.get("key1") == "value1"
@@ -1,3 +1,6 @@
+import json
+from unittest.mock import AsyncMock, MagicMock, call
+
 import pytest
 
 from machine.storage.backends.redis import RedisStorage
@@ -54,3 +57,45 @@ async def test_delete(redis_storage, redis_client):
 async def test_size(redis_storage, redis_client):
     await redis_storage.size()
     redis_client.info.assert_called_with("memory")
+
+
+@pytest.mark.asyncio
+async def test_get_many(redis_storage, redis_client):
+    redis_client.mget = AsyncMock(return_value=[b"value1", None])
+    assert await redis_storage.get_many(["key1", "key2"]) == {"key1": b"value1", "key2": None}
+    redis_client.mget.assert_called_with(["SM:key1", "SM:key2"])
+
+
+@pytest.mark.asyncio
+async def test_set_many(redis_storage, redis_client):
+    pipeline = MagicMock()
+    pipeline.__aenter__.return_value = pipeline
+    pipeline.execute = AsyncMock()
+    redis_client.pipeline = MagicMock(return_value=pipeline)
+    await redis_storage.set_many({"key1": b"value1", "key2": b"value2"}, 42)
+    assert pipeline.set.call_args_list == [call("SM:key1", b"value1", 42), call("SM:key2", b"value2", 42)]
+    pipeline.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_delete_many(redis_storage, redis_client):
+    await redis_storage.delete_many(["key1", "key2"])
+    redis_client.delete.assert_called_with("SM:key1", "SM:key2")
+
+
+@pytest.mark.asyncio
+async def test_publish_invalidation(redis_storage, redis_client):
+    redis_client.publish = AsyncMock()
+    await redis_storage.publish_invalidation(["key1"])
+    channel, message = redis_client.publish.call_args.args
+    assert channel == "SM:invalidations"
+    assert json.loads(message) == {"source": redis_storage._instance_id, "keys": ["key1"]}
+
+
+@pytest.mark.asyncio
+async def test_set_if_absent(redis_storage, redis_client):
+    redis_client.set.return_value = True
+    assert await redis_storage.set_if_absent("key1", b"value1", 42)
+    redis_client.set.assert_called_with("SM:key1", b"value1", 42, nx=True)
+    redis_client.set.return_value = None
+    assert not await redis_storage.set_if_absent("key1", b"value1")
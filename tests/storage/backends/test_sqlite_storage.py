@@ -69,3 +69,27 @@ async def test_size(sqlite_storage: SQLiteStorage):
     await sqlite_storage.set("test_key_1", b"test_value_1")
     await sqlite_storage.set("test_key_2", b"test_value_2")
     assert await sqlite_storage.size() > 44  # number of characters in both columns for both rows
+
+
+@pytest.mark.asyncio
+async def test_batch_operations(sqlite_storage: SQLiteStorage, mocker):
+    mocker.patch("machine.storage.backends.sqlite._MAX_KEYS_PER_QUERY", 2)
+    items = {f"key{i}": f"value{i}".encode() for i in range(5)}
+    await sqlite_storage.set_many(items, expires=15)
+    assert await sqlite_storage.get_many([*items, "unknown"]) == {**items, "unknown": None}
+    await sqlite_storage.delete_many(["key0", "key3"])
+    assert await sqlite_storage.get_many(["key0", "key1", "key3"]) == {"key0": None, "key1": b"value1", "key3": None}
+
+
+@pytest.mark.asyncio
+async def test_set_if_absent(sqlite_storage: SQLiteStorage, mocker):
+    mocked_time = mocker.patch("machine.storage.backends.sqlite.time", autospec=True)
+    mocked_time.time.return_value = 44046732
+    assert await sqlite_storage.set_if_absent("key1", b"value1", expires=15)
+    assert not await sqlite_storage.set_if_absent("key1", b"value2")
+    assert await sqlite_storage.get("key1") == b"value1"
+    # expired keys are replaced
+    mocked_time.time.return_value = 44046732 + 20
+    assert await sqlite_storage.set_if_absent("key1", b"value3")
+    assert await sqlite_storage.get("key1") == b"value3"
+    assert not await sqlite_storage.set_if_absent("key1", b"value4")
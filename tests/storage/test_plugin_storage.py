@@ -54,3 +54,26 @@ async def test_delete(plugin_storage, storage_backend):
     await plugin_storage.delete("key1")
     assert await plugin_storage.has("key1") is False
     assert expected_key not in storage_backend._storage
+
+
+@pytest.mark.asyncio
+async def test_batch_operations(plugin_storage, storage_backend):
+    await plugin_storage.set_many({"key1": "value1", "key2": {"nested": 2}})
+    assert "tests.fake_plugin.FakePlugin:key1" in storage_backend._storage
+    assert await plugin_storage.get_many(["key1", "key2", "key3"]) == {
+        "key1": "value1",
+        "key2": {"nested": 2},
+        "key3": None,
+    }
+    await plugin_storage.delete_many(["key1"])
+    assert await plugin_storage.get_many(["key1", "key2"]) == {"key1": None, "key2": {"nested": 2}}
+
+
+@pytest.mark.asyncio
+async def test_batch_operations_shared(plugin_storage, storage_backend):
+    await plugin_storage.set_many({"key1": "value1"}, shared=True)
+    assert "key1" in storage_backend._storage
+    assert await plugin_storage.get_many(["key1"]) == {"key1": None}
+    assert await plugin_storage.get_many(["key1"], shared=True) == {"key1": "value1"}
+    await plugin_storage.delete_many(["key1"], shared=True)
+    assert "key1" not in storage_backend._storage
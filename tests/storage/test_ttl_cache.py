@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from machine.storage import PluginStorage
+from machine.storage.backends.memory import MemoryStorage
+from machine.storage.ttl_cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def plugin_storage():
+    return PluginStorage("tests.fake_plugin.FakePlugin", MemoryStorage({}))
+
+
+def _fetcher(values):
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0)
+        return values.pop(0)
+
+    return fetch, calls
+
+
+@pytest.mark.asyncio
+async def test_ttl_cache_returns_fresh_results_from_storage(plugin_storage, clock):
+    cache = TTLCache(plugin_storage, "search", ttl=60, clock=clock)
+    fetch, calls = _fetcher(["first", "second"])
+    assert await cache.get("cats", fetch) == "first"
+    clock.now += 59
+    assert await cache.get("cats", fetch) == "first"
+    assert len(calls) == 1
+    clock.now += 1
+    assert await cache.get("cats", fetch) == "second"
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_ttl_cache_is_shared_through_storage(plugin_storage, clock):
+    fetch, calls = _fetcher(["first"])
+    await TTLCache(plugin_storage, "search", ttl=60, clock=clock).get("cats", fetch)
+    other_instance = TTLCache(plugin_storage, "search", ttl=60, clock=clock)
+    assert await other_instance.get("cats", fetch) == "first"
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_ttl_cache_stale_while_revalidate(plugin_storage, clock):
+    cache = TTLCache(plugin_storage, "search", ttl=60, stale_ttl=60, clock=clock)
+    fetch, calls = _fetcher(["first", "second"])
+    await cache.get("cats", fetch)
+    clock.now += 90
+    # The stale result is returned right away, and refreshed in the background
+    assert await cache.get("cats", fetch) == "first"
+    await asyncio.sleep(0.01)
+    assert len(calls) == 2
+    assert await cache.get("cats", fetch) == "second"
+
+
+@pytest.mark.asyncio
+async def test_ttl_cache_coalesces_concurrent_fetches(plugin_storage, clock):
+    cache = TTLCache(plugin_storage, "search", ttl=60, clock=clock)
+    fetch, calls = _fetcher(["first"])
+    results = await asyncio.gather(*(cache.get("cats", fetch) for _ in range(3)))
+    assert results == ["first"] * 3
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_ttl_cache_does_not_cache_none(plugin_storage, clock):
+    cache = TTLCache(plugin_storage, "search", ttl=60, clock=clock)
+    fetch, calls = _fetcher([None, "second"])
+    assert await cache.get("cats", fetch) is None
+    assert await cache.get("cats", fetch) == "second"
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_ttl_cache_invalidate_and_disable(plugin_storage, clock):
+    cache = TTLCache(plugin_storage, "search", ttl=60, clock=clock)
+    fetch, calls = _fetcher(["first", "second", "third"])
+    await cache.get("cats", fetch)
+    await cache.invalidate("cats")
+    assert await cache.get("cats", fetch) == "second"
+
+    disabled = TTLCache(plugin_storage, "other", ttl=0, clock=clock)
+    assert await disabled.get("cats", fetch) == "third"
+
+
+def test_ttl_cache_validates_ttls(plugin_storage):
+    with pytest.raises(ValueError, match="negative"):
+        TTLCache(plugin_storage, "search", ttl=-1)
@@ -8,6 +8,7 @@ from machine.models.core import BlockActionHandler, CommandHandler, MessageHandl
 from machine.plugins.decorators import required_settings
 from machine.utils.collections import CaseInsensitiveDict
 from machine.utils.logging import configure_logging
+from tests.fake_plugins import FakePlugin
 
 
 @pytest.fixture(scope="module")
@@ -147,6 +148,26 @@ async def test_plugin_init(settings, slack_client):
     assert plugin_cls.x == 42
 
 
+@pytest.mark.asyncio
+async def test_plugins_share_http_clients(settings, slack_client):
+    machine = Machine(settings=settings)
+    machine._client = slack_client
+    await machine._setup_storage()
+    await machine._load_plugins()
+    actions = machine._registered_actions
+    plugin1_cls = actions.respond_to["tests.fake_plugins.FakePlugin.respond_function-hello"].class_
+    # FakePlugin2 overrides __init__ with the original signature
+    plugin2_cls = actions.listen_to["tests.fake_plugins.FakePlugin2.another_listen_function-doit"].class_
+    assert plugin1_cls.http() is plugin2_cls.http()
+    await machine._http_clients.close()
+
+
+def test_http_clients_require_machine(settings, slack_client):
+    plugin = FakePlugin(slack_client, settings, None)
+    with pytest.raises(RuntimeError):
+        plugin.http()
+
+
 def test_required_settings(settings_with_required, required_settings_class):
     machine = Machine(settings=settings_with_required)
     missing = machine._check_missing_settings(required_settings_class)
@@ -0,0 +1,20 @@
+import pytest
+
+from machine.utils.collections import LRUDict
+
+
+def test_lru_dict_evicts_least_recently_used():
+    d = LRUDict(2, {"a": 1, "b": 2})
+    assert d["a"] == 1
+    d["c"] = 3
+    assert list(d) == ["a", "c"]
+    assert d.get("a") == 1
+    assert d.get("b") is None
+    d["d"] = 4
+    assert list(d) == ["a", "d"]
+    assert isinstance(d, dict)
+
+
+def test_lru_dict_invalid_size():
+    with pytest.raises(ValueError):
+        LRUDict(0)
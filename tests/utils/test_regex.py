@@ -0,0 +1,73 @@
+import re
+
+import pytest
+
+from machine.utils.regex import LiteralMatcher, fold_case, required_literal
+
+PATTERNS = [
+    re.compile(r"hi", re.IGNORECASE),
+    re.compile(r"(?:image|img)(?: me)? (?P<query>.+)", re.IGNORECASE),
+    re.compile(r"meme (?P<meme>\S+) (?P<top>.+);(?P<bottom>.+)", re.IGNORECASE),
+    re.compile(r"^grant\s+role\s+(?P<role>\w+)\s+to\s+<@(?P<user_id>\w+)>$", re.IGNORECASE),
+    re.compile(r"(?i)Hello"),
+    re.compile(r"ab(?i:CDEFG)"),
+    re.compile(r"x{0,3}yy(zzz)+"),
+    re.compile(r"İstanbul", re.IGNORECASE),
+    re.compile(r"Ping"),
+]
+
+TEXTS = [
+    "hi there",
+    "HI",
+    "ıt's HİGH time",
+    "img me a cat",
+    "IMAGE ME cats",
+    "meme doge such;wow",
+    "grant role admin to <@U123>",
+    "GRANT  ROLE admin TO <@U123>",
+    "hello",
+    "hELLo",
+    "abcdefg",
+    "abCDEFG",
+    "yyzzzzzz",
+    "İSTANBUL",
+    "istanbul",
+    "ping",
+    "Ping",
+    "",
+]
+
+
+def test_required_literal():
+    assert required_literal(re.compile("hi", re.IGNORECASE)) == ("hi", True)
+    assert required_literal(re.compile("Hi")) == ("Hi", False)
+    assert required_literal(re.compile(r"(?i)Hello")) == ("hello", True)
+    assert required_literal(re.compile(r"meme (?P<meme>\S+) (?P<top>.+)", re.IGNORECASE)) == ("meme ", True)
+    assert required_literal(re.compile(r"x{0,3}yy(zzz)+")) == ("zzz", False)
+    # scoped flags are not looked into
+    assert required_literal(re.compile(r"ab(?i:CDEFG)")) == ("ab", False)
+    assert required_literal(re.compile(r"\w+")) is None
+    assert required_literal(re.compile(r"foo|bar")) is None
+    assert required_literal(re.compile(r"(?:foo)?")) is None
+
+
+def test_fold_case():
+    assert fold_case("HeLLo") == "hello"
+    assert fold_case("İı") == "ii"
+
+
+@pytest.mark.parametrize("pattern", PATTERNS, ids=lambda p: p.pattern)
+def test_required_literal_present_in_every_match(pattern):
+    literal = required_literal(pattern)
+    for text in TEXTS:
+        if pattern.search(text) and literal is not None:
+            value, ignore_case = literal
+            assert value in (fold_case(text) if ignore_case else text)
+
+
+def test_literal_matcher():
+    matcher = LiteralMatcher(["he", "she", "his", "hers", "ushers"])
+    assert matcher.search("ushers") == {"he", "she", "hers", "ushers"}
+    assert matcher.search("this") == {"his"}
+    assert matcher.search("nothing") == set()
+    assert LiteralMatcher([]).search("anything") == set()
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from machine.utils.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_single_flight_coalesces_concurrent_calls():
+    single_flight = SingleFlight()
+    calls = []
+    release = asyncio.Event()
+
+    async def fetch(key):
+        calls.append(key)
+        await release.wait()
+        return key.upper()
+
+    waiters = [asyncio.create_task(single_flight.do(key, lambda key=key: fetch(key))) for key in ["a", "a", "b"]]
+    await asyncio.sleep(0)
+    release.set()
+    assert await asyncio.gather(*waiters) == ["A", "A", "B"]
+    assert calls == ["a", "b"]
+    await asyncio.sleep(0)
+    assert len(single_flight) == 0
+    # once a call has finished, the next call for the same key starts a new one
+    assert await single_flight.do("a", lambda: fetch("a")) == "A"
+    assert calls == ["a", "b", "a"]
+
+
+@pytest.mark.asyncio
+async def test_single_flight_cancelled_waiter_does_not_cancel_call():
+    single_flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def fetch():
+        await release.wait()
+        return 1
+
+    first = asyncio.create_task(single_flight.do("a", fetch))
+    second = asyncio.create_task(single_flight.do("a", fetch))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+    assert await second == 1
+
+
+@pytest.mark.asyncio
+async def test_single_flight_forget_starts_new_call():
+    single_flight = SingleFlight()
+    started = asyncio.Event()
+    release = asyncio.Event()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        call = len(calls)
+        if call == 1:
+            started.set()
+            await release.wait()
+        return call
+
+    first = asyncio.create_task(single_flight.do("a", fetch))
+    await started.wait()
+    single_flight.forget("a")
+    second = asyncio.create_task(single_flight.do("a", fetch))
+    assert await second == 2
+    release.set()
+    assert await first == 1
+    assert len(calls) == 2